@@ -0,0 +1,118 @@
+# adaptive_inference.py
+# 추론 시간에 맞춰 N 프레임마다 한 번만 포즈 추론을 하고, 사이 프레임은 등속 모델로 랜드마크를 예측합니다.
+import math
+import threading
+import time
+
+# --- 추론 간격 결정 ---
+
+class AdaptiveInferenceScheduler:
+    """측정된 추론 시간과 목표 fps로 몇 프레임마다 추론할지(interval) 정합니다."""
+    def __init__(self, target_fps=30, max_interval=4, smoothing=0.2):
+        self.target_fps = target_fps
+        self.max_interval = max_interval
+        self.smoothing = smoothing
+        self.avg_inference_time = None
+        self.interval = 1
+        self.frames_since_inference = 0
+
+    def should_infer(self):
+        self.frames_since_inference += 1
+        if self.frames_since_inference >= self.interval:
+            self.frames_since_inference = 0
+            return True
+        return False
+
+    def record(self, inference_time):
+        """실제 추론에 걸린 시간(초)을 반영해 interval을 다시 계산합니다."""
+        if self.avg_inference_time is None:
+            self.avg_inference_time = inference_time
+        else:
+            self.avg_inference_time += self.smoothing * (inference_time - self.avg_inference_time)
+        needed = math.ceil(self.avg_inference_time * self.target_fps)
+        self.interval = min(max(needed, 1), self.max_interval)
+
+# --- 등속 모델 예측 ---
+
+class LandmarkPredictor:
+    """최근 두 번의 실제 추론 결과로 (33, 4) 랜드마크의 속도를 구해 중간 프레임 위치를 예측합니다."""
+    def __init__(self, max_horizon=0.25, smoothing=0.5):
+        self.max_horizon = max_horizon  # 마지막 추론 이후 이 시간(초)까지만 외삽
+        self.smoothing = smoothing
+        self.landmarks = None
+        self.velocity = None
+        self.timestamp = None
+
+    def reset(self):
+        self.landmarks = self.velocity = self.timestamp = None
+
+    def update(self, landmarks, timestamp):
+        if landmarks is None:
+            self.reset()
+            return
+        if self.landmarks is not None and timestamp > self.timestamp:
+            velocity = (landmarks[:, :3] - self.landmarks[:, :3]) / (timestamp - self.timestamp)
+            if self.velocity is None:
+                self.velocity = velocity
+            else:
+                self.velocity += self.smoothing * (velocity - self.velocity)
+        self.landmarks, self.timestamp = landmarks, timestamp
+
+    def is_fresh(self, timestamp):
+        return self.landmarks is not None and timestamp - self.timestamp <= self.max_horizon
+
+    def predict(self, timestamp):
+        predicted = self.landmarks.copy()
+        if self.velocity is not None:
+            predicted[:, :3] += self.velocity * (timestamp - self.timestamp)
+        return predicted
+
+# --- 트레이너 루프용 ---
+
+class AdaptiveInference:
+    """
+    실제 추론과, 추론 사이 프레임의 랜드마크 예측을 관리합니다.
+    process_fn(image, pose_model)은 실제 추론을, build_fn(results, landmarks, timestamp)는 랜드마크로부터
+    각도/막대 값을 계산하는 트레이너의 함수입니다. 반복 횟수 판정은 실제 추론 프레임에서만 해야 합니다.
+    단일 루프에서는 매 프레임 step()을 호출합니다. 파이프라인에서는 추론 스레드가 infer()를, 렌더링 스레드가 predict()를 호출합니다.
+    (파이프라인의 추론 스레드는 이미 가장 최근 프레임만 가져가므로 N 프레임 건너뛰기는 단일 루프에서만 함)
+    """
+    def __init__(self, process_fn, build_fn, target_fps=30, max_interval=4, enabled=True):
+        self.process_fn, self.build_fn = process_fn, build_fn
+        self.enabled = enabled
+        self.scheduler = AdaptiveInferenceScheduler(target_fps, max_interval)
+        self.predictor = LandmarkPredictor()
+        self.last_data = None
+        self._lock = threading.Lock()  # 추론 스레드의 predictor 갱신과 렌더링 스레드의 예측이 겹치지 않도록
+
+    def infer(self, image, pose_model, now=None):
+        """실제 추론을 하고 추론 시간과 예측 모델을 갱신합니다. now는 프레임 시각(perf_counter 기준)입니다."""
+        if now is None: now = time.perf_counter()
+        landmarks_data = self.process_fn(image, pose_model)
+        self.scheduler.record(time.perf_counter() - now)
+        self.scheduler.frames_since_inference = 0
+        with self._lock:
+            self.predictor.update(landmarks_data["landmarks"], now)
+            self.last_data = landmarks_data
+        return landmarks_data
+
+    def predict(self, now):
+        """마지막 실제 추론 결과로 now 시각의 랜드마크 데이터를 예측합니다. 예측할 수 없으면 None을 반환합니다."""
+        if not self.enabled: return None
+        with self._lock:
+            if self.last_data is None or self.last_data["landmarks"] is None or not self.predictor.is_fresh(now): return None
+            landmarks = self.predictor.predict(now)
+        landmarks_data = self.build_fn(None, landmarks, now)
+        landmarks_data["predicted"] = True
+        return landmarks_data
+
+    def step(self, image, pose_model):
+        """단일 루프용: 이번 프레임에 추론할 차례면 추론하고, 아니면 예측합니다. (landmarks_data, 실제 추론 여부)를 반환합니다."""
+        now = time.perf_counter()
+        if self.enabled and self.last_data is not None and not self.scheduler.should_infer():
+            if self.last_data["landmarks"] is None:
+                return self.last_data, False
+            landmarks_data = self.predict(now)
+            if landmarks_data is not None:
+                return landmarks_data, False
+        return self.infer(image, pose_model, now), True
@@ -0,0 +1,182 @@
+# batch_analyzer.py
+# 녹화된 운동 영상을 화면 없이 분석하여 반복/세트 결과를 JSON Lines로 저장하는 명령줄 도구
+#
+# 사용 예:
+#   python batch_analyzer.py pushup videos/*.mp4 --reps 10 --sets 3 -o results.jsonl
+import argparse
+import importlib
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from exercises import EXERCISES
+from roi_tracker import PoseRoiTracker
+import shared_pose
+
+FEEDBACK_DURATION = 2  # 트레이너 화면에서 피드백 문구가 유지되는 시간(초)
+
+# 워커 프로세스마다 한 번만 import되는 트레이너 모듈 (Pose 모델은 영상마다 새로 만듦, analyze_video 참고)
+_trainer = None
+
+# --- 워커 프로세스 ---
+
+def init_worker(exercise, set_goal, total_sets, rest_duration):
+    """워커 프로세스를 초기화합니다. 오디오 장치 없이 트레이너 모듈을 불러오고 목표값을 적용합니다."""
+    global _trainer
+    os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+    module_name, _ = EXERCISES[exercise]
+    _trainer = importlib.import_module(module_name)
+    if set_goal is not None: _trainer.SET_GOAL = set_goal
+    if total_sets is not None: _trainer.TOTAL_SETS_GOAL = total_sets
+    if rest_duration is not None: _trainer.REST_DURATION = rest_duration
+
+class OfflineSession:
+    """
+    트레이너의 반복 판정을 실시간 대기 없이 영상 시간(또는 기록된 시각) 기준으로 진행합니다.
+    휴식 시간과 피드백 유지 시간은 벽시계가 아닌 주어진 시각으로 흉내 내고, 반복/세트가 끝날 때마다 records에 기록을 더합니다.
+    (영상 분석과 landmark_replay.py의 기록 재생에서 함께 사용)
+    """
+    def __init__(self, trainer, source):
+        self.trainer, self.source = trainer, source
+        self.app_state = trainer.new_app_state()
+        self.records = []
+        self.feedback_time, self.last_feedback_start = 0.0, self.app_state["feedback_start_time"]
+        self.rest_until = None
+
+    def resting(self, video_time):
+        """휴식 중이면 True를 반환합니다. 휴식 시간(REST_DURATION)이 지나면 다음 세트로 넘어갑니다. (트레이너 render_frame과 동일)"""
+        if self.rest_until is None: return False
+        if video_time < self.rest_until: return True
+        self.rest_until = None
+        self.app_state.update({"workout_state": 'workout', "counter": 0, "good_counter": 0, "bad_counter": 0, "set_counter": self.app_state["set_counter"] + 1, "stage": 'up', "feedback": ""})
+        self.app_state["rep_detector"].reset()
+        return False
+
+    def step(self, landmarks_data, video_time):
+        """프레임 하나의 판정 결과를 반영합니다. 모든 세트가 끝났으면 True를 반환합니다."""
+        app_state = self.app_state
+        prev_counter, prev_sets = app_state["counter"], len(app_state["set_results"])
+        self.trainer.update_state_and_counters(app_state, landmarks_data)
+
+        # 피드백이 새로 설정되면 영상 시간을 기록하고, 2초 뒤에 지움
+        if app_state["feedback_start_time"] != self.last_feedback_start:
+            self.last_feedback_start, self.feedback_time = app_state["feedback_start_time"], video_time
+        elif app_state["feedback"] and video_time - self.feedback_time > FEEDBACK_DURATION:
+            app_state["feedback"] = ""
+
+        if app_state["counter"] != prev_counter:
+            # 반복 기록의 시각은 process_pose_landmarks에 넘긴 영상 시간 기준
+            rep = app_state["last_rep"]
+            self.records.append({
+                "type": "rep", "video": self.source, "set": app_state["set_counter"], "rep": app_state["counter"],
+                "good": rep["good"], "feedback": rep["feedback"],
+                "start": round(rep["start"], 3), "end": round(rep["end"], 3), "duration": round(rep["duration"], 3),
+                "eccentric": round(rep["eccentric"], 3), "concentric": round(rep["concentric"], 3),
+                "min_angle": round(float(rep["min_angle"]), 1), "max_angle": round(float(rep["max_angle"]), 1),
+            })
+
+        if len(app_state["set_results"]) != prev_sets:
+            result = app_state["set_results"][-1]
+            self.records.append({"type": "set", "video": self.source, "set": app_state["set_counter"], "good": result["good"], "bad": result["bad"], "end": round(video_time, 3)})
+
+        if app_state["workout_state"] == 'rest':
+            self.rest_until = video_time + self.trainer.REST_DURATION
+        elif app_state["workout_state"] == 'finished':
+            app_state["workout_completed"] = True
+            return True
+        return False
+
+    def summary(self):
+        return {
+            "type": "summary", "video": self.source, "completed": self.app_state["workout_completed"],
+            "sets": [{"good": r["good"], "bad": r["bad"]} for r in self.app_state["set_results"]],
+        }
+
+def analyze_video(video_path):
+    """
+    영상 한 개를 실시간 대기 없이 끝까지 분석합니다. (OfflineSession 참고)
+    MediaPipe Pose는 이전 프레임의 결과로 다음 프레임을 추적하므로, 앞 영상의 추적 상태가 넘어오지 않도록 영상마다 새 모델을 씁니다.
+    (기록 리스트, 통계 딕셔너리)를 반환합니다.
+    """
+    import cv2
+    cap = cv2.VideoCapture(video_path)
+    if not cap.isOpened():
+        return [{"type": "error", "video": video_path, "message": "영상을 열 수 없습니다."}], None
+
+    video_fps = cap.get(cv2.CAP_PROP_FPS) or 30.0
+    pose = shared_pose.create_pose()
+    pose_model = PoseRoiTracker(pose) if _trainer.USE_ROI_TRACKING else pose
+    _trainer.landmark_filter.reset()
+    session = OfflineSession(_trainer, video_path)
+    frame_index, inferred = 0, 0
+    started = time.perf_counter()
+
+    try:
+        while True:
+            success, image = cap.read()
+            if not success: break
+            video_time = frame_index / video_fps
+            frame_index += 1
+            if session.resting(video_time): continue
+
+            if _trainer.FLIP_FRAME: image = cv2.flip(image, 1)
+            landmarks_data = _trainer.process_pose_landmarks(image, pose_model, video_time)
+            inferred += 1
+            if session.step(landmarks_data, video_time): break
+    finally:
+        cap.release()
+        pose.close()
+    elapsed = max(time.perf_counter() - started, 1e-6)
+    stats = {"pid": os.getpid(), "frames": frame_index, "inferred": inferred, "seconds": elapsed}
+    records = session.records
+    records.append({
+        **session.summary(), "frames": frame_index, "inferred_frames": inferred,
+        "video_seconds": round(frame_index / video_fps, 3), "processing_seconds": round(elapsed, 3),
+        "fps": round(inferred / elapsed, 1), "worker_pid": stats["pid"],
+    })
+    return records, stats
+
+# --- 명령줄 진입점 ---
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="녹화된 운동 영상을 화면 없이 분석하여 반복/세트 결과를 JSON Lines로 기록합니다.")
+    parser.add_argument("exercise", choices=sorted(EXERCISES), help="분석할 운동 종류")
+    parser.add_argument("videos", nargs="+", help="분석할 영상 파일 경로")
+    parser.add_argument("--reps", type=int, help="세트당 목표 횟수 (기본값: 트레이너 기본값)")
+    parser.add_argument("--sets", type=int, help="목표 세트 수 (기본값: 트레이너 기본값)")
+    parser.add_argument("--rest", type=int, help="세트 사이 휴식 시간(초), 영상 시간 기준")
+    parser.add_argument("-j", "--workers", type=int, default=os.cpu_count(), help="워커 프로세스 수")
+    parser.add_argument("-o", "--output", help="결과 JSON Lines 파일 (기본값: 표준 출력)")
+    args = parser.parse_args(argv)
+
+    workers = max(1, min(args.workers or 1, len(args.videos)))
+    out = open(args.output, 'w', encoding='utf-8') if args.output else sys.stdout
+    worker_stats = {}
+    try:
+        with ProcessPoolExecutor(max_workers=workers, initializer=init_worker,
+                                 initargs=(args.exercise, args.reps, args.sets, args.rest)) as executor:
+            futures = {executor.submit(analyze_video, path): path for path in args.videos}
+            for future in as_completed(futures):
+                try:
+                    records, stats = future.result()
+                except Exception as e:
+                    # 영상 하나(손상된 파일, 워커의 추론 오류 등)가 실패해도 나머지 결과와 처리 속도 보고는 계속
+                    records, stats = [{"type": "error", "video": futures[future], "message": str(e)}], None
+                for record in records:
+                    out.write(json.dumps(record, ensure_ascii=False) + "\n")
+                out.flush()
+                if stats:
+                    total = worker_stats.setdefault(stats["pid"], {"frames": 0, "seconds": 0.0})
+                    total["frames"] += stats["inferred"]
+                    total["seconds"] += stats["seconds"]
+    finally:
+        if out is not sys.stdout: out.close()
+
+    # 하드웨어 산정을 위한 워커별 처리 속도 (결과와 섞이지 않도록 stderr로 출력)
+    for pid, total in sorted(worker_stats.items()):
+        fps = total["frames"] / max(total["seconds"], 1e-6)
+        print(f"워커 {pid}: {total['frames']} 프레임, {total['seconds']:.1f}초, {fps:.1f} fps", file=sys.stderr)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,165 @@
+# camera_service.py
+# 카메라 장치 목록과 지원 해상도/FPS를 백그라운드 스레드에서 한 번 조사해 캐시하고, 세션에 열린 캡처를 빌려줍니다.
+#
+# - 조사는 시작할 때, 장치 연결/해제가 감지될 때(notify_hotplug 또는 리눅스의 /dev/video* 변화), 캡처가 실패했을 때만 다시 합니다.
+# - 조사하면서 연 기본 장치는 닫지 않고 보관(park)해 두었다가 acquire()에서 그대로 넘겨주므로, 닫았다가 다시 여는 비용이 없습니다.
+#   세션이 끝나 release()된 캡처도 다음 운동을 위해 PARK_TIMEOUT 동안 보관합니다.
+import glob
+import sys
+import threading
+import time
+import cv2
+
+MAX_DEVICES = 4
+DEFAULT_DEVICE = 0
+CANDIDATE_RESOLUTIONS = [(1920, 1080), (1280, 720), (640, 480)]
+CANDIDATE_FPS = [60, 30]
+WATCH_INTERVAL = 2.0   # 장치 변화 / 보관 시간 확인 간격(초)
+PARK_TIMEOUT = 120.0   # 쓰지 않는 캡처를 열어 둘 최대 시간(초), 지나면 닫아서 카메라를 놓아줌
+
+# --- 장치 조사 ---
+
+def read_mode(cap):
+    return (int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)), int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)), round(cap.get(cv2.CAP_PROP_FPS)))
+
+def set_mode(cap, mode):
+    width, height, fps = mode
+    cap.set(cv2.CAP_PROP_FRAME_WIDTH, width)
+    cap.set(cv2.CAP_PROP_FRAME_HEIGHT, height)
+    if fps: cap.set(cv2.CAP_PROP_FPS, fps)
+
+def probe_modes(cap):
+    """열린 장치에 후보 해상도/FPS를 차례로 설정해 실제로 적용된 모드를 모읍니다. 끝나면 원래 모드로 되돌립니다."""
+    default = read_mode(cap)
+    modes = [default]
+    for width, height in CANDIDATE_RESOLUTIONS:
+        for fps in CANDIDATE_FPS:
+            set_mode(cap, (width, height, fps))
+            mode = read_mode(cap)
+            if mode not in modes: modes.append(mode)
+    set_mode(cap, default)
+    return default, sorted(modes, reverse=True)
+
+def device_nodes():
+    """리눅스에서는 /dev/video* 목록으로 연결/해제를 감지합니다. 다른 플랫폼은 None (notify_hotplug 사용)."""
+    if not sys.platform.startswith('linux'): return None
+    return tuple(sorted(glob.glob('/dev/video*')))
+
+# --- 카메라 서비스 ---
+
+class CameraService:
+    def __init__(self, max_devices=MAX_DEVICES, park=True):
+        """park=False이면 조사에 쓴 캡처를 바로 닫습니다. (다른 프로세스가 장치를 열어야 할 때)"""
+        self.max_devices, self.park = max_devices, park
+        self.version = 0  # 조사가 끝날 때마다 증가
+        self._devices = {}
+        self._probed = False
+        self._parked = {}      # 장치 번호 → (캡처, 보관 시작 시각)
+        self._in_use = set()
+        self._lock = threading.Lock()         # 캐시/보관 목록 보호
+        self._device_lock = threading.Lock()  # 장치 열기(조사, acquire)는 한 번에 하나만
+        self._wake = threading.Event()
+        self._closed = False
+        self._thread = None
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+
+    def devices(self):
+        """캐시된 장치 목록 [{"index", "default_mode", "modes"}]을 반환합니다. 조사 전이면 빈 목록입니다."""
+        with self._lock:
+            return [dict(info) for _, info in sorted(self._devices.items())]
+
+    def is_available(self, index=DEFAULT_DEVICE):
+        """캐시만 확인하므로 GUI 스레드에서 불러도 됩니다. 아직 조사 중이면 None을 반환합니다."""
+        with self._lock:
+            return (index in self._devices) if self._probed else None
+
+    def notify_hotplug(self):
+        """장치 연결/해제 알림을 받으면 백그라운드에서 다시 조사합니다."""
+        self._wake.set()
+
+    def acquire(self, index=DEFAULT_DEVICE):
+        """보관 중인 캡처가 있으면 그대로, 없으면 새로 열어서 반환합니다. 열 수 없으면 None을 반환하고 다시 조사합니다."""
+        with self._device_lock:
+            with self._lock:
+                entry = self._parked.pop(index, None)
+                info = self._devices.get(index)
+                self._in_use.add(index)
+            if entry is not None and entry[0].isOpened(): return entry[0]
+            if entry is not None: entry[0].release()
+            cap = cv2.VideoCapture(index)
+            if cap.isOpened() and info and info["default_mode"]: set_mode(cap, info["default_mode"])
+        if cap.isOpened(): return cap
+        cap.release()
+        self.release(None, index, failed=True)
+        return None
+
+    def release(self, cap, index=DEFAULT_DEVICE, failed=False):
+        """세션이 끝난 캡처를 돌려받습니다. failed=True이면 닫고 장치를 다시 조사합니다."""
+        with self._lock:
+            self._in_use.discard(index)
+            keep = cap is not None and not failed and self.park and not self._closed and cap.isOpened()
+            if keep: self._parked[index] = (cap, time.monotonic())
+        if cap is not None and not keep: cap.release()
+        if failed: self.notify_hotplug()
+
+    def release_parked(self):
+        """보관 중인 캡처를 모두 닫습니다. 다른 프로세스가 카메라를 열기 전에 호출합니다."""
+        with self._lock:
+            parked, self._parked = self._parked, {}
+        for cap, _ in parked.values(): cap.release()
+
+    def close(self):
+        self._closed = True
+        self._wake.set()
+        self.release_parked()
+
+    # --- 백그라운드 스레드 ---
+
+    def _run(self):
+        nodes = device_nodes()
+        self._probe_all()
+        while not self._closed:
+            woke = self._wake.wait(WATCH_INTERVAL)
+            self._wake.clear()
+            if self._closed: break
+            current = device_nodes()
+            if woke or current != nodes:
+                nodes = current
+                self._probe_all()
+            self._expire_parked()
+
+    def _probe_all(self):
+        # 뽑힌 장치의 캡처는 열린 것처럼 보일 수 있으므로, 보관 중인 캡처도 닫고 새로 열어서 확인한다
+        self.release_parked()
+        found = {}
+        with self._device_lock:
+            for index in range(self.max_devices):
+                with self._lock:
+                    if index in self._in_use:  # 세션이 쓰는 중인 장치는 있는 것으로 보고 이전 정보를 유지
+                        found[index] = self._devices.get(index) or {"index": index, "default_mode": None, "modes": []}
+                        continue
+                cap = cv2.VideoCapture(index)
+                if not cap.isOpened():
+                    cap.release()
+                    continue
+                default_mode, modes = probe_modes(cap)
+                found[index] = {"index": index, "default_mode": default_mode, "modes": modes}
+                if self.park and index == DEFAULT_DEVICE and not self._closed:
+                    with self._lock: self._parked[index] = (cap, time.monotonic())
+                else:
+                    cap.release()
+        with self._lock:
+            self._devices, self._probed = found, True
+            self.version += 1
+        print(f"카메라 장치 {len(found)}개 확인: " + ", ".join(f"#{i} {info['default_mode']}" for i, info in found.items()))
+
+    def _expire_parked(self):
+        now = time.monotonic()
+        with self._lock:
+            expired = [index for index, (_, since) in self._parked.items() if now - since > PARK_TIMEOUT]
+            caps = [self._parked.pop(index)[0] for index in expired]
+        for cap in caps: cap.release()
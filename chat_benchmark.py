@@ -0,0 +1,83 @@
+# chat_benchmark.py
+# 네트워크 없이 FakeChatClient로 챗봇 대화 턴을 반복해서 첫 토큰까지의 시간과 턴당 CPU 시간을 측정합니다.
+#   persistent : chat_session.ChatSession 하나를 계속 쓰는 현재 방식
+#   rebuild    : 예전 방식처럼 매 메시지마다 클라이언트를 새로 만들고 전체 기록으로 채팅 세션을 다시 시작
+#
+# 사용 예:
+#   python chat_benchmark.py --turns 50 --mode persistent -o profiles/chat_persistent.json
+#   python chat_benchmark.py --turns 50 --mode rebuild --first-token-delay 0
+import argparse
+import json
+import os
+import sys
+import time
+from chat_session import TOKEN_BUDGET, ChatSession, FakeChatClient, measure_turn
+from frame_profiler import StageHistogram
+
+QUESTION = "스쿼트할 때 무릎이 발끝을 넘어가도 괜찮나요? 허리가 자꾸 굽는데 어떻게 고쳐야 할까요?"
+GREETING = [('user', "안녕하세요! 어떤 운동에 대해 알려드릴까요?"), ('model', "저는 당신의 AI 헬스 트레이너입니다. 운동이나 건강에 대해 무엇이든 물어보세요.")]
+
+def run_persistent(turns, client_options, token_budget):
+    client = FakeChatClient(**client_options)
+    session = ChatSession(client, GREETING, token_budget)
+    results = [measure_turn(session, QUESTION, lambda text: None) for _ in range(turns)]
+    return results, client.sent_chars, session.trimmed_turns
+
+def run_rebuild(turns, client_options, token_budget):
+    """예전 방식은 기록을 자르지 않으므로 token_budget은 쓰지 않습니다. 세션 준비 시간도 턴에 포함합니다."""
+    history, results, sent_chars = list(GREETING), [], 0
+    for _ in range(turns):
+        start, cpu_start = time.perf_counter(), time.thread_time()
+        client = FakeChatClient(**client_options)
+        session = ChatSession(client, history, token_budget=float('inf'))
+        setup = time.perf_counter() - start
+        stats = measure_turn(session, QUESTION, lambda text: None)
+        if stats["first_token_s"] is not None: stats["first_token_s"] += setup
+        stats["total_s"] += setup
+        stats["cpu_s"] = time.thread_time() - cpu_start
+        history = session.history
+        sent_chars += client.sent_chars
+        results.append(stats)
+    return results, sent_chars, 0
+
+def summarize(results, key):
+    histogram = StageHistogram()
+    for stats in results:
+        if stats[key] is not None: histogram.record(int(stats[key] * 1e9))
+    return histogram.summary_ms()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="가짜 클라이언트로 챗봇 턴의 첫 토큰 시간과 CPU 시간을 측정합니다.")
+    parser.add_argument("--mode", choices=["persistent", "rebuild"], default="persistent", help="대화 세션 방식")
+    parser.add_argument("--turns", type=int, default=30, help="보낼 메시지 수")
+    parser.add_argument("--reply-chars", type=int, default=400, help="답변 길이(글자)")
+    parser.add_argument("--chunk-chars", type=int, default=40, help="스트리밍 조각 크기(글자)")
+    parser.add_argument("--first-token-delay", type=float, default=0.2, help="가짜 서버의 첫 조각 지연(초)")
+    parser.add_argument("--chunk-delay", type=float, default=0.0, help="가짜 서버의 조각 사이 지연(초)")
+    parser.add_argument("--token-budget", type=int, default=TOKEN_BUDGET, help="대화 기록 토큰 예산")
+    parser.add_argument("-o", "--output", help="결과 JSON 파일")
+    args = parser.parse_args(argv)
+
+    client_options = {"reply_chars": args.reply_chars, "chunk_chars": args.chunk_chars,
+                      "first_token_delay": args.first_token_delay, "chunk_delay": args.chunk_delay}
+    run = run_persistent if args.mode == "persistent" else run_rebuild
+    results, sent_chars, trimmed_turns = run(args.turns, client_options, args.token_budget)
+    report = {
+        "mode": args.mode, "turns": args.turns, "client": client_options, "token_budget": args.token_budget,
+        "first_token": summarize(results, "first_token_s"),
+        "cpu": summarize(results, "cpu_s"),
+        "sent_chars": sent_chars,
+        "final_history_tokens": results[-1]["history_tokens"] if results else 0,
+        "trimmed_turns": trimmed_turns,
+    }
+    print(f"[{args.mode}] {args.turns}턴, 첫 토큰 p50 {report['first_token']['p50_ms']}ms / p95 {report['first_token']['p95_ms']}ms, "
+          f"CPU p50 {report['cpu']['p50_ms']}ms / p95 {report['cpu']['p95_ms']}ms")
+    print(f"클라이언트로 보낸 글자 수 {sent_chars}, 마지막 기록 토큰 {report['final_history_tokens']}, 잘라낸 턴 {trimmed_turns}")
+    if args.output:
+        if os.path.dirname(args.output): os.makedirs(os.path.dirname(args.output), exist_ok=True)
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,170 @@
+# chat_history.py
+# 챗봇 대화를 workout_records.db 옆의 chat_history.db에 저장하고, FTS5 색인으로 지난 대화를 검색합니다.
+# 메시지 저장은 GUI를 막지 않도록 ChatHistoryWriter가 모아 두었다가 백그라운드에서 한 트랜잭션으로 씁니다(write-behind).
+# 조회는 모두 인덱스를 타는 LIMIT 쿼리라서 대화가 몇 달치 쌓여도 창을 여는 비용은 늘지 않습니다.
+import queue
+import threading
+import time
+from datetime import datetime
+from db_connection import get_connection, connection_lock
+
+DB_NAME = 'chat_history.db'
+BATCH_SIZE = 50        # 이만큼 모이면 바로 씀
+FLUSH_INTERVAL = 1.0   # 첫 메시지가 들어온 뒤 이 시간(초) 안에는 씀
+TITLE_LENGTH = 40
+
+def _create_schema(conn):
+    # 트리거 본문에 ';'가 들어 있어 문자열 마이그레이션(';'로 나눠 실행) 대신 문장 단위로 실행한다
+    for statement in SCHEMA_STATEMENTS: conn.execute(statement)
+
+SCHEMA_STATEMENTS = [
+    '''
+        CREATE TABLE IF NOT EXISTS conversations (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            title TEXT NOT NULL,
+            created_at TEXT NOT NULL,
+            updated_at TEXT NOT NULL
+        )
+    ''',
+    "CREATE INDEX IF NOT EXISTS idx_conversations_updated ON conversations (updated_at)",
+    '''
+        CREATE TABLE IF NOT EXISTS messages (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            conversation_id INTEGER NOT NULL REFERENCES conversations (id) ON DELETE CASCADE,
+            role TEXT NOT NULL,
+            content TEXT NOT NULL,
+            created_at TEXT NOT NULL
+        )
+    ''',
+    "CREATE INDEX IF NOT EXISTS idx_messages_conversation ON messages (conversation_id, id)",
+    # 본문은 messages에만 두고 색인만 따로 유지하는 external content FTS5 테이블 (한국어 조사 때문에 검색은 접두어로)
+    "CREATE VIRTUAL TABLE IF NOT EXISTS messages_fts USING fts5(content, content='messages', content_rowid='id', tokenize='unicode61')",
+    '''
+        CREATE TRIGGER IF NOT EXISTS messages_fts_insert AFTER INSERT ON messages BEGIN
+            INSERT INTO messages_fts (rowid, content) VALUES (new.id, new.content);
+        END
+    ''',
+    '''
+        CREATE TRIGGER IF NOT EXISTS messages_fts_delete AFTER DELETE ON messages BEGIN
+            INSERT INTO messages_fts (messages_fts, rowid, content) VALUES ('delete', old.id, old.content);
+        END
+    ''',
+]
+
+# 스키마 마이그레이션: i번째 항목이 user_version을 i+1로 올림 (이미 배포된 항목은 수정하지 말고 뒤에 추가)
+MIGRATIONS = [
+    # 1: 대화/메시지 테이블과 전문 검색 색인
+    _create_schema,
+]
+
+INSERT_CONVERSATION_SQL = "INSERT INTO conversations (title, created_at, updated_at) VALUES (?, ?, ?)"
+INSERT_MESSAGE_SQL = "INSERT INTO messages (conversation_id, role, content, created_at) VALUES (?, ?, ?, ?)"
+TOUCH_CONVERSATION_SQL = "UPDATE conversations SET updated_at = ? WHERE id = ?"
+SELECT_RECENT_SQL = "SELECT id, title, updated_at FROM conversations ORDER BY updated_at DESC, id DESC LIMIT ?"
+# 키셋 페이지네이션: 이전 페이지의 가장 오래된 메시지 id보다 작은 행만 (conversation_id, id) 인덱스를 거꾸로 읽음
+SELECT_MESSAGES_PAGE_SQL = '''
+    SELECT id, role, content, created_at FROM messages
+    WHERE conversation_id = ? AND id < ?
+    ORDER BY id DESC LIMIT ?
+'''
+SEARCH_SQL = '''
+    SELECT m.id, m.conversation_id, c.title, m.role, snippet(messages_fts, 0, '[', ']', '…', 12), m.created_at
+    FROM messages_fts JOIN messages m ON m.id = messages_fts.rowid JOIN conversations c ON c.id = m.conversation_id
+    WHERE messages_fts MATCH ?
+    ORDER BY bm25(messages_fts), m.id DESC LIMIT ?
+'''
+
+def _connect():
+    """프로세스 전역 연결을 가져옵니다. 처음 호출될 때 스키마 마이그레이션이 적용됩니다."""
+    return get_connection(DB_NAME, MIGRATIONS)
+
+def _now():
+    return datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+def create_conversation(first_message):
+    """새 대화를 만들고 id를 반환합니다. 제목은 첫 사용자 메시지의 앞부분입니다."""
+    conn = _connect()
+    title = " ".join(first_message.split())[:TITLE_LENGTH]
+    timestamp = _now()
+    with connection_lock(), conn:
+        return conn.execute(INSERT_CONVERSATION_SQL, (title, timestamp, timestamp)).lastrowid
+
+def get_recent_conversations(limit=20):
+    """최근에 이어 간 순서로 (id, 제목, 마지막 시각) 목록을 반환합니다."""
+    conn = _connect()
+    with connection_lock():
+        return conn.execute(SELECT_RECENT_SQL, (limit,)).fetchall()
+
+def get_messages_page(conversation_id, before_id=None, limit=50):
+    """
+    대화의 메시지를 최신 쪽부터 한 페이지 가져옵니다. 행은 오래된 순서의 (id, role, content, created_at)입니다.
+    (행 목록, 다음(더 오래된) 페이지 cursor)를 반환하며, 마지막 페이지이면 cursor는 None입니다.
+    """
+    conn = _connect()
+    with connection_lock():
+        rows = conn.execute(SELECT_MESSAGES_PAGE_SQL, (conversation_id, before_id or 2**63 - 1, limit)).fetchall()
+    next_cursor = rows[-1][0] if len(rows) == limit else None
+    return rows[::-1], next_cursor
+
+def to_match_query(text):
+    """검색어를 FTS5 질의로 바꿉니다. 단어마다 큰따옴표로 감싸 특수문자를 무시하고, 조사가 붙은 말도 찾도록 접두어로 검색합니다."""
+    terms = [term.replace('"', '""') for term in text.split()]
+    return " ".join(f'"{term}"*' for term in terms)
+
+def search_messages(text, limit=50):
+    """모든 대화에서 검색어가 들어간 메시지를 관련도순으로 (id, 대화 id, 대화 제목, role, 일치 부분, created_at) 목록으로 반환합니다."""
+    query = to_match_query(text)
+    if not query: return []
+    conn = _connect()
+    with connection_lock():
+        return conn.execute(SEARCH_SQL, (query, limit)).fetchall()
+
+class ChatHistoryWriter:
+    """
+    append()는 큐에 넣고 바로 반환합니다. 백그라운드 스레드가 BATCH_SIZE개가 모이거나 FLUSH_INTERVAL이 지나면
+    모인 메시지를 executemany 한 번, 트랜잭션 한 번으로 쓰고 대화의 마지막 시각을 갱신합니다.
+    """
+    def __init__(self):
+        self.queue = queue.Queue()
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def append(self, conversation_id, role, content):
+        self.queue.put((conversation_id, role, content, _now()))
+
+    def flush(self, timeout=5.0):
+        """지금까지 append()한 메시지가 모두 쓰일 때까지 기다립니다. (검색 전에 호출)"""
+        done = threading.Event()
+        self.queue.put(done)
+        return done.wait(timeout)
+
+    def close(self):
+        self.queue.put(None)
+        self.thread.join()
+
+    def _run(self):
+        batch, deadline = [], None
+        while True:
+            try:
+                item = self.queue.get(timeout=None if deadline is None else max(0.0, deadline - time.monotonic()))
+            except queue.Empty:
+                item = False  # 시간이 지남
+            if isinstance(item, tuple):
+                batch.append(item)
+                if deadline is None: deadline = time.monotonic() + FLUSH_INTERVAL
+                if len(batch) < BATCH_SIZE: continue
+            if batch: self._write(batch)
+            batch, deadline = [], None
+            if isinstance(item, threading.Event): item.set()
+            if item is None: break
+
+    def _write(self, batch):
+        updated = {}
+        for conversation_id, _, _, created_at in batch: updated[conversation_id] = created_at
+        try:
+            conn = _connect()
+            with connection_lock(), conn:
+                conn.executemany(INSERT_MESSAGE_SQL, batch)
+                conn.executemany(TOUCH_CONVERSATION_SQL, [(timestamp, conversation_id) for conversation_id, timestamp in updated.items()])
+        except Exception as e:
+            print(f"대화 기록 저장 실패 ({len(batch)}개): {e}")
@@ -0,0 +1,188 @@
+# chat_session.py
+# 챗봇의 대화 세션을 창이 닫힐 때까지 유지하는 백그라운드 워커
+# 모델과 채팅 세션은 한 번만 만들고, 메시지는 큐에 넣어 순서대로 보내며 매 턴에는 새 사용자 메시지만 넘깁니다.
+# 대화 기록이 토큰 예산을 넘으면 오래된 턴부터 잘라내고, 그때만 같은 모델로 채팅 세션을 다시 만듭니다.
+#
+# 클라이언트는 start_chat(history) / stream(chat, message) 두 메소드만 있으면 됩니다.
+# 네트워크 없이 확인하고 측정할 수 있도록 같은 인터페이스의 FakeChatClient를 함께 둡니다. (chat_benchmark.py 참고)
+import os
+import queue
+import time
+from PyQt6.QtCore import QThread, pyqtSignal
+
+MODEL_NAME = 'gemini-1.5-flash-latest'
+TOKEN_BUDGET = int(os.getenv("AIHT_CHAT_TOKEN_BUDGET", "6000"))  # 대화 기록에 쓸 최대 토큰 수(추정치)
+TRIM_TARGET = 0.75    # 예산을 넘으면 이 비율까지 줄여서, 매 턴마다 다시 자르지 않게 함
+MIN_KEEP_TURNS = 2    # 예산과 상관없이 남겨 두는 최근 (사용자, 모델) 턴 수
+CHARS_PER_TOKEN = 2   # 한국어 문장 기준의 대략적인 추정
+
+def estimate_tokens(text):
+    """API를 부르지 않고 글자 수로 토큰 수를 어림합니다."""
+    return len(text) // CHARS_PER_TOKEN + 1
+
+# --- 클라이언트 ---
+
+class GeminiChatClient:
+    """google.generativeai를 감쌉니다. configure와 GenerativeModel 생성은 여기서 한 번만 합니다."""
+    def __init__(self, api_key, system_instruction=None, model_name=MODEL_NAME):
+        import google.generativeai as genai
+        genai.configure(api_key=api_key)
+        self.model = genai.GenerativeModel(model_name, system_instruction=system_instruction)
+
+    def start_chat(self, history):
+        """history는 [(role, text)]이며 role은 'user' 또는 'model'입니다."""
+        return self.model.start_chat(history=[{'role': role, 'parts': [text]} for role, text in history])
+
+    def stream(self, chat, message):
+        for chunk in chat.send_message(message, stream=True):
+            yield chunk.text
+
+class FakeChatClient:
+    """정해진 지연으로 같은 답변을 조각내어 흘려보내는 가짜 클라이언트입니다. (오프라인 확인, 벤치마크용)"""
+    REPLY = "좋은 질문이에요. 운동 전에는 5분 정도 가볍게 몸을 풀고, 자세가 무너지지 않는 범위에서 천천히 반복하세요. "
+
+    def __init__(self, reply_chars=400, chunk_chars=40, first_token_delay=0.2, chunk_delay=0.02):
+        self.reply_chars, self.chunk_chars = reply_chars, chunk_chars
+        self.first_token_delay, self.chunk_delay = first_token_delay, chunk_delay
+        self.chats_started = 0
+        self.sent_chars = 0  # 클라이언트에 넘긴 글자 수 합계 (기록을 매번 다시 보내는지 확인용)
+
+    def start_chat(self, history):
+        self.chats_started += 1
+        self.sent_chars += sum(len(text) for _, text in history)
+        return list(history)
+
+    def stream(self, chat, message):
+        self.sent_chars += len(message)
+        time.sleep(self.first_token_delay)
+        reply = (self.REPLY * (self.reply_chars // len(self.REPLY) + 1))[:self.reply_chars]
+        for start in range(0, len(reply), self.chunk_chars):
+            if start: time.sleep(self.chunk_delay)
+            yield reply[start:start + self.chunk_chars]
+        chat += [('user', message), ('model', reply)]
+
+# --- 대화 세션 ---
+
+class ChatSession:
+    """클라이언트의 채팅 세션 하나와, 토큰 예산 안으로 잘라낸 대화 기록을 함께 관리합니다."""
+    def __init__(self, client, history=(), token_budget=TOKEN_BUDGET):
+        self.client, self.token_budget = client, token_budget
+        self.trimmed_turns = 0
+        self.reset(history)
+
+    def reset(self, history):
+        """다른 대화(예: 저장된 지난 대화)로 바꿉니다. 예산을 넘는 오래된 턴은 잘라낸 뒤 세션을 새로 시작합니다."""
+        self.history = list(history)
+        self.history_tokens = sum(estimate_tokens(text) for _, text in self.history)
+        self.trimmed_turns += self.drop_old_turns()
+        self.chat = self.client.start_chat(self.history)
+
+    def stream_reply(self, message):
+        """새 메시지 하나만 보내고 답변 조각을 차례로 반환합니다. 끝까지 받으면 기록에 더하고 필요하면 자릅니다."""
+        parts = []
+        try:
+            for text in self.client.stream(self.chat, message):
+                parts.append(text)
+                yield text
+        except Exception:
+            # 중간에 끊긴 턴이 채팅 세션에 반쯤 남지 않도록 마지막으로 완료된 기록에서 다시 시작한다
+            self.chat = self.client.start_chat(self.history)
+            raise
+        self.add_turn(message, "".join(parts))
+
+    def add_turn(self, message, reply):
+        self.history += [('user', message), ('model', reply)]
+        self.history_tokens += estimate_tokens(message) + estimate_tokens(reply)
+        if self.history_tokens > self.token_budget: self.trim()
+
+    def drop_old_turns(self):
+        """예산을 넘었으면 오래된 턴부터 예산의 TRIM_TARGET 비율까지 잘라내고, 잘라낸 턴 수를 반환합니다."""
+        if self.history_tokens <= self.token_budget: return 0
+        dropped = 0
+        while self.history_tokens > self.token_budget * TRIM_TARGET and len(self.history) > MIN_KEEP_TURNS * 2:
+            for _, text in self.history[:2]: self.history_tokens -= estimate_tokens(text)
+            del self.history[:2]
+            dropped += 1
+        return dropped
+
+    def trim(self):
+        """기록을 예산 안으로 잘라내고, 잘라낸 기록으로 채팅 세션을 다시 만듭니다."""
+        dropped = self.drop_old_turns()
+        if dropped:
+            self.trimmed_turns += dropped
+            self.chat = self.client.start_chat(self.history)
+
+def measure_turn(session, message, on_chunk, cancelled=lambda: False):
+    """
+    한 턴을 보내고 조각마다 on_chunk를 부릅니다. cancelled()가 True가 되면 남은 조각을 버립니다.
+    {"first_token_s", "total_s", "cpu_s", "chunks", "chars", "history_tokens"}를 반환합니다.
+    cpu_s는 이 스레드가 쓴 CPU 시간이라 응답을 기다리는 시간은 포함하지 않습니다.
+    """
+    start, cpu_start = time.perf_counter(), time.thread_time()
+    first_token, chunks, chars = None, 0, 0
+    for text in session.stream_reply(message):
+        if cancelled(): break
+        if first_token is None: first_token = time.perf_counter() - start
+        chunks += 1
+        chars += len(text)
+        on_chunk(text)
+    return {
+        "first_token_s": first_token, "total_s": time.perf_counter() - start, "cpu_s": time.thread_time() - cpu_start,
+        "chunks": chunks, "chars": chars, "history_tokens": session.history_tokens,
+    }
+
+# --- Qt 워커 스레드 ---
+
+class ChatWorker(QThread):
+    """
+    ChatSession 하나를 스레드에 두고 submit()으로 받은 메시지와 reset()으로 받은 대화 전환을 순서대로 처리합니다.
+    클라이언트는 client_factory로 이 스레드에서 만들므로 모델 준비가 GUI를 막지 않습니다.
+    """
+    chunk_received = pyqtSignal(str)
+    stream_finished = pyqtSignal()
+    error_occurred = pyqtSignal(str)
+    turn_measured = pyqtSignal(dict)  # measure_turn()의 결과
+
+    def __init__(self, client_factory, history=(), token_budget=TOKEN_BUDGET, parent=None):
+        super().__init__(parent)
+        self.client_factory, self.history, self.token_budget = client_factory, history, token_budget
+        self.messages = queue.Queue()
+        self.session = None
+        self.stopping = False
+
+    def submit(self, message):
+        self.messages.put(("send", message))
+
+    def reset(self, history):
+        """이후 메시지는 history [(role, text)]에 이어서 보냅니다."""
+        self.messages.put(("reset", list(history)))
+
+    def stop(self):
+        """진행 중인 답변은 다음 조각에서 끊고 스레드를 끝냅니다."""
+        self.stopping = True
+        self.messages.put(None)
+
+    def run(self):
+        setup_error = None
+        try:
+            self.session = ChatSession(self.client_factory(), self.history, self.token_budget)
+        except Exception as e:
+            setup_error = f"API 오류: {e}"
+        while True:
+            item = self.messages.get()
+            if item is None or self.stopping: break
+            command, message = item
+            if command == "reset":
+                if self.session is not None: self.session.reset(message)
+                continue
+            if setup_error:
+                self.error_occurred.emit(setup_error)
+                continue
+            try:
+                stats = measure_turn(self.session, message, self.chunk_received.emit, lambda: self.stopping)
+            except Exception as e:
+                self.error_occurred.emit(f"API 오류: {e}")
+                continue
+            if self.stopping: break
+            self.turn_measured.emit(stats)
+            self.stream_finished.emit()
@@ -3,14 +3,22 @@ import sys
 import os
 import json
 import re
-import google.generativeai as genai
+import math
+import sqlite3
+from collections import OrderedDict
+from chat_session import ChatWorker, GeminiChatClient, FakeChatClient
+import chat_history
 from PyQt6.QtWidgets import (
     QApplication, QMainWindow, QWidget, QVBoxLayout,
-    QPushButton, QLabel, QMessageBox, QHBoxLayout,
-    QLineEdit, QTextEdit, QScrollArea, QInputDialog
+    QPushButton, QMessageBox, QHBoxLayout,
+    QTextEdit, QInputDialog, QListView, QStyledItemDelegate,
+    QComboBox, QLineEdit, QListWidget, QListWidgetItem
 )
-from PyQt6.QtGui import QFont, QPixmap
-from PyQt6.QtCore import Qt, QObject, QThread, pyqtSignal
+from PyQt6.QtGui import (
+    QFont, QPixmap, QTextCursor, QTextDocument, QAbstractTextDocumentLayout,
+    QPainter, QPainterPath, QColor, QPalette, QKeySequence
+)
+from PyQt6.QtCore import Qt, QTimer, QSize, QRect, QRectF, QModelIndex, QAbstractListModel, pyqtSignal
 
 # --- UI 스타일 중앙 관리 설정 (변경 없음) ---
 STYLE_CONFIG = {
@@ -20,67 +28,229 @@ STYLE_CONFIG = {
     "spacing": 18, "bubble_radius": 16,
 }
 
-# --- 설정 파일 이름 및 API 키 변수 (변경 없음) ---
+# --- 설정 파일 이름 및 API 키 변수 ---
 CONFIG_FILE = "config_gemini.json"
 API_KEY = None
+# AIHT_CHAT_FAKE=1 이면 API 키 없이 가짜 클라이언트로 실행 (화면/성능 확인용)
+CHAT_FAKE = os.getenv("AIHT_CHAT_FAKE") == "1"
 
-# --- [수정] 채팅 버블 위젯 (더 안정적인 크기 조절 방식으로 변경) ---
-class MessageBubble(QWidget):
-    def __init__(self, text, is_user):
-        super().__init__()
-        self.is_user = is_user
+# 스트리밍 답변은 조각을 모아 두었다가 화면 한 프레임에 한 번만 반영하고, 맨 아래로 스크롤도 이 간격 이상으로는 하지 않음
+FLUSH_INTERVAL_MS = 16
+SCROLL_INTERVAL_MS = 50
+BOTTOM_FOLLOW_MARGIN = 40  # 스크롤이 맨 아래에서 이 픽셀 안에 있으면 새 내용을 따라 내려감
 
-        main_layout = QVBoxLayout(self)
-        main_layout.setContentsMargins(0, 0, 0, 0)
-        main_layout.setSpacing(5)
-
-        padding = STYLE_CONFIG['padding']
-        radius = STYLE_CONFIG['bubble_radius']
-
-        # QLabel에서는 max-width를 제거하여 부모 위젯의 크기에 따라 자연스럽게 줄바꿈되도록 함
-        if is_user:
-            self.label = QLabel(text)
-            self.label.setWordWrap(True)
-            self.label.setTextInteractionFlags(Qt.TextInteractionFlag.TextSelectableByMouse)
-            self.label.setStyleSheet(f"""
-                QLabel {{
-                    background-color: #1de9b6; color: #1e1e2f; padding: {padding}px {padding+2}px;
-                    border-radius: {radius}px; border-bottom-right-radius: 4px;
-                }}""")
-            main_layout.addWidget(self.label)
-        else:
-            header_layout = QHBoxLayout()
-            header_layout.setContentsMargins(0, 0, 0, 0); header_layout.setSpacing(10)
-            icon_label = QLabel()
+# 저장된 대화 (chat_history.db): 목록에는 최근 대화만, 메시지는 최신 쪽부터 페이지 단위로 불러옴
+RECENT_CONVERSATIONS = 20
+MESSAGE_PAGE_SIZE = 50
+SEARCH_RESULT_LIMIT = 50
+
+# --- 대화 목록 (모델/뷰) ---
+# 메시지마다 위젯을 만들지 않고 QListView 하나에 델리게이트가 말풍선을 직접 그린다.
+# 화면에 보이는 행만 그리며, 줄바꿈 결과(가장 긴 줄 너비, 높이)는 메시지와 줄바꿈 너비별로 캐시한다.
+MESSAGE_ROLE = Qt.ItemDataRole.UserRole.value  # 행의 메시지 딕셔너리
+BUBBLE_WIDTH_RATIO = 0.75   # 말풍선이 차지할 최대 너비 비율
+WIDTH_STEP = 16             # 창 크기를 바꾸는 동안 줄바꿈을 다시 계산하는 너비 단위(px)
+MIN_TEXT_WIDTH = 120
+DOCUMENT_CACHE_SIZE = 200   # 텍스트 문서를 들고 있는 최근 메시지 수 (나머지는 크기만 캐시)
+ERROR_COLOR = "#e74c3c"
+BUBBLE_COLORS = {True: ("#1de9b6", "#1e1e2f"), False: ("#2a2a40", "#ffffff")}  # 사용자 여부 → (배경, 글자)
+AVATAR_PATH = os.path.join('images', 'icon', 'hticon03.png')
+AI_NAME = "AI-HomeTrainer"
+
+_avatar = None
+
+def avatar_pixmap():
+    """AI 아이콘은 처음 한 번만 디코딩/축소해서 모든 말풍선이 함께 씁니다."""
+    global _avatar
+    if _avatar is None:
+        icon_size = STYLE_CONFIG['icon_size']
+        _avatar = QPixmap(AVATAR_PATH)
+        if not _avatar.isNull():
+            _avatar = _avatar.scaled(icon_size, icon_size, Qt.AspectRatioMode.KeepAspectRatio, Qt.TransformationMode.SmoothTransformation)
+    return _avatar
+
+class ChatTranscriptModel(QAbstractListModel):
+    """
+    메시지 목록. 각 행은 {"id", "key", "text", "is_user", "error", "revision"}입니다.
+    revision은 내용을 통째로 바꿀 때만 증가하고, key는 저장된 메시지의 DB id(없으면 None)입니다.
+    """
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.rows = []
+        self.next_id = 0
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.rows)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid(): return None
+        message = self.rows[index.row()]
+        if role == Qt.ItemDataRole.DisplayRole: return message["text"]
+        if role == MESSAGE_ROLE: return message
+        return None
+
+    def new_row(self, text, is_user, key=None):
+        self.next_id += 1
+        return {"id": self.next_id, "key": key, "text": text, "is_user": is_user, "error": False, "revision": 0}
+
+    def add_message(self, text, is_user, key=None):
+        row = len(self.rows)
+        self.beginInsertRows(QModelIndex(), row, row)
+        self.rows.append(self.new_row(text, is_user, key))
+        self.endInsertRows()
+        return row
+
+    def prepend_messages(self, items):
+        """items [(text, is_user, key)]를 맨 앞에 끼워 넣습니다. (더 오래된 페이지)"""
+        if not items: return
+        self.beginInsertRows(QModelIndex(), 0, len(items) - 1)
+        self.rows[:0] = [self.new_row(*item) for item in items]
+        self.endInsertRows()
+
+    def clear(self):
+        self.beginResetModel()
+        self.rows = []
+        self.endResetModel()
+
+    def find_key(self, key):
+        return next((row for row, message in enumerate(self.rows) if message["key"] == key), None)
+
+    def text(self, row): return self.rows[row]["text"]
+
+    def set_text(self, row, text):
+        message = self.rows[row]
+        message["text"] = text; message["revision"] += 1
+        self.changed(row)
+
+    def append_text(self, row, text):
+        self.rows[row]["text"] += text
+        self.changed(row)
+
+    def mark_error(self, row):
+        self.rows[row]["error"] = True
+        self.changed(row)
+
+    def changed(self, row):
+        index = self.index(row)
+        self.dataChanged.emit(index, index)
+
+class BubbleDelegate(QStyledItemDelegate):
+    """
+    말풍선을 그립니다. 메시지마다 QTextDocument를 하나 두고, 스트리밍으로 늘어난 부분만 문서 끝에 덧붙입니다.
+    크기는 (메시지, 줄바꿈 너비)별로 캐시하므로 같은 너비로 돌아오거나 다른 행이 바뀔 때는 다시 배치하지 않습니다.
+    """
+    def __init__(self, view):
+        super().__init__(view)
+        self.view = view
+        self.documents = OrderedDict()  # 메시지 id → [문서, 반영한 글자 수, revision] (최근에 쓴 순서)
+        self.sizes = {}                 # 메시지 id → (글자 수, revision, {줄바꿈 너비: (가장 긴 줄 너비, 높이)})
+
+    def clear_cache(self):
+        self.documents.clear()
+        self.sizes.clear()
+
+    def text_width(self):
+        width = int(self.view.viewport().width() * BUBBLE_WIDTH_RATIO)
+        return max(MIN_TEXT_WIDTH, width // WIDTH_STEP * WIDTH_STEP)
+
+    def document(self, message):
+        entry = self.documents.pop(message["id"], None)
+        text = message["text"]
+        if entry is None or entry[2] != message["revision"] or entry[1] > len(text):
+            document = QTextDocument()
+            document.setDefaultFont(self.view.font())
+            document.setDocumentMargin(STYLE_CONFIG['padding'])
+            document.setPlainText(text)
+            entry = [document, len(text), message["revision"]]
+        elif entry[1] < len(text):
+            cursor = QTextCursor(entry[0])
+            cursor.movePosition(QTextCursor.MoveOperation.End)
+            cursor.insertText(text[entry[1]:])
+            entry[1] = len(text)
+        self.documents[message["id"]] = entry
+        if len(self.documents) > DOCUMENT_CACHE_SIZE: self.documents.popitem(last=False)
+        return entry[0]
+
+    def measure(self, message, width):
+        key = (len(message["text"]), message["revision"])
+        cached = self.sizes.get(message["id"])
+        if cached is None or cached[:2] != key:
+            cached = key + ({},)
+            self.sizes[message["id"]] = cached
+        size = cached[2].get(width)
+        if size is None:
+            document = self.document(message)
+            document.setTextWidth(width)
+            size = cached[2][width] = (math.ceil(document.idealWidth()), math.ceil(document.size().height()))
+        return size
+
+    def header_height(self, message):
+        return 0 if message["is_user"] else STYLE_CONFIG['icon_size'] + 5
+
+    def sizeHint(self, option, index):
+        message = index.data(MESSAGE_ROLE)
+        _, height = self.measure(message, self.text_width())
+        return QSize(self.view.viewport().width(), self.header_height(message) + height + STYLE_CONFIG['spacing'])
+
+    def paint(self, painter, option, index):
+        message = index.data(MESSAGE_ROLE)
+        width = self.text_width()
+        ideal_width, height = self.measure(message, width)
+        document = self.document(message)
+        if document.textWidth() != width: document.setTextWidth(width)
+        rect, is_user = option.rect, message["is_user"]
+        painter.save()
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+        if not is_user:
             icon_size = STYLE_CONFIG['icon_size']
-            pixmap = QPixmap('images\icon\hticon03.png')
-            icon_label.setPixmap(pixmap.scaled(icon_size, icon_size, Qt.AspectRatioMode.KeepAspectRatio, Qt.TransformationMode.SmoothTransformation))
-            icon_label.setFixedSize(icon_size, icon_size)
-            name_label = QLabel("AI-HomeTrainer")
-            name_label.setStyleSheet("font-weight: bold; color: #f5f5f5;")
-            header_layout.addWidget(icon_label); header_layout.addWidget(name_label); header_layout.addStretch()
-            self.label = QLabel(text)
-            self.label.setWordWrap(True)
-            self.label.setTextInteractionFlags(Qt.TextInteractionFlag.TextSelectableByMouse)
-            self.label.setStyleSheet(f"""
-                QLabel {{
-                    background-color: #2a2a40; color: #ffffff; padding: {padding}px {padding+2}px;
-                    border-radius: {radius}px; border-bottom-left-radius: 4px;
-                }}""")
-            main_layout.addLayout(header_layout)
-            main_layout.addWidget(self.label)
-
-        self.setLayout(main_layout)
-
-    def text(self): return self.label.text()
-    def set_text(self, text): self.label.setText(text)
-    def append_text(self, text): self.label.setText(self.label.text() + text)
-
-    # 위젯 자체의 최대 너비를 업데이트하는 방식으로 변경
-    def update_width(self, parent_width):
-        max_w = int(parent_width * 0.75) # 버블이 차지할 최대 너비 (조금 더 넉넉하게)
-        self.setMaximumWidth(max_w)
+            painter.drawPixmap(rect.left(), rect.top(), avatar_pixmap())
+            font = QFont(self.view.font()); font.setBold(True)
+            painter.setFont(font); painter.setPen(QColor("#f5f5f5"))
+            painter.drawText(QRect(rect.left() + icon_size + 10, rect.top(), rect.width(), icon_size), Qt.AlignmentFlag.AlignVCenter | Qt.AlignmentFlag.AlignLeft, AI_NAME)
+        bubble_width = min(ideal_width, width)
+        left = rect.right() - bubble_width if is_user else rect.left()
+        bubble = QRectF(left, rect.top() + self.header_height(message), bubble_width, height)
+        background, color = BUBBLE_COLORS[is_user]
+        painter.fillPath(self.bubble_path(bubble, is_user), QColor(background))
+        painter.translate(bubble.topLeft())
+        context = QAbstractTextDocumentLayout.PaintContext()
+        context.palette.setColor(QPalette.ColorRole.Text, QColor(ERROR_COLOR if message["error"] else color))
+        document.documentLayout().draw(painter, context)
+        painter.restore()
 
+    @staticmethod
+    def bubble_path(rect, is_user):
+        """둥근 말풍선에서 말하는 쪽 아래 모서리만 덜 둥글게 만듭니다."""
+        radius, corner = STYLE_CONFIG['bubble_radius'], 4
+        path = QPainterPath()
+        path.addRoundedRect(rect, radius, radius)
+        size = min(radius * 2, rect.width(), rect.height())
+        x = rect.right() - size if is_user else rect.left()
+        tail = QPainterPath()
+        tail.addRoundedRect(QRectF(x, rect.bottom() - size, size, size), corner, corner)
+        return path.united(tail)
+
+class ChatTranscriptView(QListView):
+    """대화 목록 뷰. 행을 선택하고 Ctrl+C를 누르면 그 메시지를 복사합니다."""
+    def __init__(self, model, parent=None):
+        super().__init__(parent)
+        self.setModel(model)
+        self.setItemDelegate(BubbleDelegate(self))
+        self.setFrameShape(QListView.Shape.NoFrame)
+        self.setVerticalScrollMode(QListView.ScrollMode.ScrollPerPixel)
+        self.setHorizontalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAlwaysOff)
+        self.setResizeMode(QListView.ResizeMode.Adjust)
+        self.setSelectionMode(QListView.SelectionMode.SingleSelection)
+        self.setStyleSheet("QListView { border: none; background-color: #1e1e2f; } QListView::item:selected { background: transparent; }")
+        # 메시지 내용이 바뀌면 그 행의 크기를 다시 묻도록 (레이아웃은 다음 이벤트 루프에서 한 번만 다시 함)
+        model.dataChanged.connect(lambda top_left, *_: self.itemDelegate().sizeHintChanged.emit(top_left))
+        model.modelReset.connect(self.itemDelegate().clear_cache)
+
+    def keyPressEvent(self, event):
+        if event.matches(QKeySequence.StandardKey.Copy) and self.currentIndex().isValid():
+            QApplication.clipboard().setText(self.currentIndex().data())
+        else:
+            super().keyPressEvent(event)
 
 # --- 입력창 위젯 (변경 없음) ---
 class ChatInputTextEdit(QTextEdit):
@@ -100,24 +270,7 @@ class ChatInputTextEdit(QTextEdit):
         max_height = 150; new_height = min(doc_height + 15, max_height)
         self.setFixedHeight(new_height)
 
-# --- Gemini API Worker (변경 없음) ---
-class GeminiWorker(QObject):
-    chunk_received = pyqtSignal(str); stream_finished = pyqtSignal(); error_occurred = pyqtSignal(str)
-    def __init__(self, message_history):
-        super().__init__(); self.message_history = message_history
-    def run(self):
-        try:
-            genai.configure(api_key=API_KEY)
-            model = genai.GenerativeModel('gemini-1.5-flash-latest')
-            history_for_gemini = [{'role': msg['role'], 'parts': [msg['content']]} for msg in self.message_history if msg['role'] != 'system']
-            last_user_message = history_for_gemini.pop()['parts'][0]
-            chat = model.start_chat(history=history_for_gemini)
-            response_stream = chat.send_message(last_user_message, stream=True)
-            for chunk in response_stream: self.chunk_received.emit(chunk.text)
-            self.stream_finished.emit()
-        except Exception as e: self.error_occurred.emit(f"API 오류: {e}")
-
-# --- 챗봇 메인 위젯 (add_message_bubble 수정) ---
+# --- 챗봇 메인 위젯 (대화 세션은 ChatWorker가 유지) ---
 class ChatbotWidget(QWidget):
     def __init__(self, parent=None):
         super().__init__(parent)
@@ -128,61 +281,194 @@ class ChatbotWidget(QWidget):
         ]
         main_layout = QVBoxLayout(self)
         main_layout.setContentsMargins(10, 10, 10, 10); main_layout.setSpacing(10)
-        self.scroll_area = QScrollArea(); self.scroll_area.setWidgetResizable(True)
-        self.scroll_area.setStyleSheet("QScrollArea { border: none; }")
-        self.chat_container = QWidget()
-        self.chat_layout = QVBoxLayout(self.chat_container)
-        self.chat_layout.setAlignment(Qt.AlignmentFlag.AlignTop)
-        self.chat_layout.setSpacing(STYLE_CONFIG['spacing'])
-        self.scroll_area.setWidget(self.chat_container)
+
+        # 대화는 chat_history.db에 저장한다. 메시지는 history_writer가 모아서 백그라운드에서 쓴다
+        self.history_writer = chat_history.ChatHistoryWriter()
+        self.conversation_id, self.older_cursor = None, None
+        self.keep_bottom_offset = None  # 더 오래된 페이지를 위에 붙인 뒤 보던 위치를 유지하기 위한 값
+        history_layout = QHBoxLayout()
+        self.conversation_box = QComboBox()
+        self.search_box = QLineEdit(); self.search_box.setPlaceholderText("지난 대화 검색...")
+        history_layout.addWidget(self.conversation_box, 1); history_layout.addWidget(self.search_box, 1)
+        self.search_results = QListWidget(); self.search_results.setMaximumHeight(220); self.search_results.hide()
+        main_layout.addLayout(history_layout); main_layout.addWidget(self.search_results)
+        self.load_conversation_list()
+        self.conversation_box.activated.connect(self.on_conversation_selected)
+        self.search_box.returnPressed.connect(self.run_search)
+        self.search_box.textChanged.connect(lambda text: None if text.strip() else self.search_results.hide())
+        self.search_results.itemClicked.connect(self.on_search_result_clicked)
+
+        self.transcript = ChatTranscriptModel(self)
+        self.transcript_view = ChatTranscriptView(self.transcript)
+
+        # 스트리밍 조각은 pending_chunks에 모았다가 flush_timer가 한 프레임에 한 번 말풍선에 덧붙인다
+        self.current_ai_row, self.waiting_first_chunk = None, False
+        self.pending_chunks = []
+        self.flush_timer = QTimer(self)
+        self.flush_timer.setSingleShot(True)
+        self.flush_timer.setInterval(FLUSH_INTERVAL_MS)
+        self.flush_timer.timeout.connect(self.flush_pending_chunks)
+        # 내용이 늘어 스크롤 범위가 바뀌면 (맨 아래를 보고 있을 때만) 간격을 두고 한 번 내려간다
+        self.follow_bottom = True
+        self.scroll_timer = QTimer(self)
+        self.scroll_timer.setSingleShot(True)
+        self.scroll_timer.setInterval(SCROLL_INTERVAL_MS)
+        self.scroll_timer.timeout.connect(self.scroll_to_bottom)
+        scroll_bar = self.transcript_view.verticalScrollBar()
+        scroll_bar.rangeChanged.connect(self.on_scroll_range_changed)
+        scroll_bar.valueChanged.connect(self.update_follow_bottom)
         input_layout = QHBoxLayout()
         self.input_box = ChatInputTextEdit()
         self.send_button = QPushButton("➤")
         button_size = STYLE_CONFIG['send_button_size']
         self.send_button.setFixedSize(button_size, button_size)
         input_layout.addWidget(self.input_box); input_layout.addWidget(self.send_button)
-        main_layout.addWidget(self.scroll_area); main_layout.addLayout(input_layout)
+        main_layout.addWidget(self.transcript_view); main_layout.addLayout(input_layout)
         self.send_button.clicked.connect(self.send_message)
         self.input_box.send_message_signal.connect(self.send_message)
         self.load_initial_message()
 
-    def resizeEvent(self, event):
-        super().resizeEvent(event)
-        self.update_all_bubble_widths()
+        # 모델과 채팅 세션은 창이 열려 있는 동안 하나만 유지하고, 메시지는 워커의 큐로 보낸다
+        self.chat_worker = ChatWorker(self.create_chat_client, history=self.chat_history_for(self.messages), parent=self)
+        self.chat_worker.chunk_received.connect(self.update_ai_bubble)
+        self.chat_worker.stream_finished.connect(self.finish_stream)
+        self.chat_worker.error_occurred.connect(self.handle_error)
+        self.chat_worker.start()
+
+    def create_chat_client(self):
+        if CHAT_FAKE: return FakeChatClient()
+        return GeminiChatClient(API_KEY, system_instruction=self.messages[0]['content'])
+
+    def shutdown(self):
+        self.chat_worker.stop()
+        self.chat_worker.wait(3000)
+        self.history_writer.close()  # 아직 쓰지 않은 메시지를 모두 저장
+
+    @staticmethod
+    def chat_history_for(messages):
+        """메시지 목록을 워커용 [(role, text)]로 바꿉니다. 답을 받지 못한 사용자 메시지처럼 짝이 없는 턴은 뺍니다."""
+        history = []
+        for question, answer in zip(messages, messages[1:]):
+            if question["role"] == "user" and answer["role"] == "assistant":
+                history += [('user', question["content"]), ('model', answer["content"])]
+        return history
+
+    # --- 저장된 대화 ---
+    def load_conversation_list(self):
+        self.conversation_box.clear()
+        self.conversation_box.addItem("새 대화", None)
+        try:
+            conversations = chat_history.get_recent_conversations(RECENT_CONVERSATIONS)
+        except sqlite3.Error as e:
+            print(f"대화 목록을 불러올 수 없습니다: {e}")
+            return
+        for conversation_id, title, updated_at in conversations:
+            self.conversation_box.addItem(f"{title} ({updated_at[5:16]})", conversation_id)
+        index = self.conversation_box.findData(self.conversation_id)
+        self.conversation_box.setCurrentIndex(max(index, 0))
+
+    def on_conversation_selected(self, index):
+        conversation_id = self.conversation_box.itemData(index)
+        if conversation_id == self.conversation_id: return
+        if conversation_id is None: self.start_new_conversation()
+        else: self.open_conversation(conversation_id)
+
+    def start_new_conversation(self):
+        self.conversation_id, self.older_cursor = None, None
+        self.messages = self.messages[:3]
+        self.transcript.clear()
+        self.load_initial_message()
+        self.chat_worker.reset(self.chat_history_for(self.messages))
+
+    def open_conversation(self, conversation_id, anchor_key=None):
+        """저장된 대화의 최신 페이지를 열고 그 대화에 이어서 보내도록 워커를 바꿉니다. anchor_key가 있으면 그 메시지가 보일 때까지 더 불러옵니다."""
+        self.history_writer.flush()  # 방금 나눈 대화도 목록/본문에 보이도록
+        try:
+            rows, self.older_cursor = chat_history.get_messages_page(conversation_id, None, MESSAGE_PAGE_SIZE)
+        except sqlite3.Error as e:
+            self.show_history_error(e)
+            return
+        self.conversation_id = conversation_id
+        self.messages = self.messages[:3] + [{"role": role, "content": content} for _, role, content, _ in rows]
+        self.transcript.clear()
+        for key, role, content, _ in rows: self.transcript.add_message(content, role == "user", key)
+        self.chat_worker.reset(self.chat_history_for(self.messages[3:]))
+        self.load_conversation_list()
+        if anchor_key is None:
+            self.follow_bottom = True
+            return
+        while self.transcript.find_key(anchor_key) is None and self.load_older_page(): pass
+        self.keep_bottom_offset, self.follow_bottom = None, False
+        row = self.transcript.find_key(anchor_key)
+        if row is not None:
+            QTimer.singleShot(0, lambda: self.transcript_view.scrollTo(self.transcript.index(row), QListView.ScrollHint.PositionAtTop))
+
+    def load_older_page(self):
+        """더 오래된 메시지 한 페이지를 맨 위에 붙입니다. 붙였으면 True를 반환합니다."""
+        # 답변을 받는 중에는 행 번호가 바뀌면 안 되므로 불러오지 않는다
+        if self.conversation_id is None or self.older_cursor is None or self.current_ai_row is not None: return False
+        try:
+            rows, self.older_cursor = chat_history.get_messages_page(self.conversation_id, self.older_cursor, MESSAGE_PAGE_SIZE)
+        except sqlite3.Error as e:
+            self.older_cursor = None
+            self.show_history_error(e)
+            return False
+        scroll_bar = self.transcript_view.verticalScrollBar()
+        self.keep_bottom_offset = scroll_bar.maximum() - scroll_bar.value()
+        self.messages[3:3] = [{"role": role, "content": content} for _, role, content, _ in rows]
+        self.transcript.prepend_messages([(content, role == "user", key) for key, role, content, _ in rows])
+        return bool(rows)
 
-    def update_all_bubble_widths(self):
-        # 스크롤 영역의 너비를 기준으로 자식 위젯들의 너비를 업데이트
-        content_width = self.scroll_area.width() - 30
-        if content_width <= 0: return
-        for i in range(self.chat_layout.count()):
-            widget = self.chat_layout.itemAt(i).widget()
-            if isinstance(widget, MessageBubble):
-                widget.update_width(content_width)
+    def run_search(self):
+        text = self.search_box.text().strip()
+        if not text: return
+        self.history_writer.flush()
+        try:
+            results = chat_history.search_messages(text, SEARCH_RESULT_LIMIT)
+        except sqlite3.Error as e:
+            self.show_history_error(e)
+            return
+        self.search_results.clear()
+        for message_id, conversation_id, title, role, snippet, created_at in results:
+            speaker = "나" if role == "user" else AI_NAME
+            item = QListWidgetItem(f"{title} · {created_at[:16]}\n{speaker}: {snippet}")
+            item.setData(Qt.ItemDataRole.UserRole, (conversation_id, message_id))
+            self.search_results.addItem(item)
+        if not results: self.search_results.addItem("검색 결과가 없습니다.")
+        self.search_results.show()
+
+    def on_search_result_clicked(self, item):
+        target = item.data(Qt.ItemDataRole.UserRole)
+        if target is None or self.current_ai_row is not None: return
+        self.search_results.hide()
+        self.open_conversation(*target)
+
+    def show_history_error(self, error):
+        QMessageBox.warning(self, "대화 기록", f"대화 기록을 읽는 중 오류가 발생했습니다: {error}")
 
     def add_message_bubble(self, text, is_user):
-        bubble = MessageBubble(text, is_user)
-        # 버블을 추가한 후, 현재 창 크기에 맞게 너비를 즉시 업데이트
-        content_width = self.scroll_area.width() - 30
-        if content_width > 0:
-            bubble.update_width(content_width)
-            
-        # 사용자 메시지는 오른쪽, AI 메시지는 왼쪽에 정렬되도록 컨테이너 추가
-        container = QWidget()
-        container_layout = QHBoxLayout(container)
-        container_layout.setContentsMargins(0,0,0,0)
-        if is_user:
-            container_layout.addStretch()
-            container_layout.addWidget(bubble)
-        else:
-            container_layout.addWidget(bubble)
-            container_layout.addStretch()
+        row = self.transcript.add_message(text, is_user)
+        # 새 메시지를 보내거나 받으면 맨 아래로 (실제 스크롤은 레이아웃이 갱신되어 범위가 바뀐 뒤에)
+        self.follow_bottom = True
+        return row
+
+    def on_scroll_range_changed(self, _, maximum):
+        if self.keep_bottom_offset is not None:
+            # 위에 더 오래된 메시지가 붙었으면 아래에서부터의 거리를 유지해 보던 메시지가 그대로 보이게 한다
+            self.transcript_view.verticalScrollBar().setValue(maximum - self.keep_bottom_offset)
+            self.keep_bottom_offset = None
+        elif self.follow_bottom and not self.scroll_timer.isActive(): self.scroll_timer.start()
 
-        self.chat_layout.addWidget(container)
-        
-        QApplication.processEvents()
-        scroll_bar = self.scroll_area.verticalScrollBar()
+    def scroll_to_bottom(self):
+        scroll_bar = self.transcript_view.verticalScrollBar()
         scroll_bar.setValue(scroll_bar.maximum())
-        return bubble
+
+    def update_follow_bottom(self, value):
+        # 사용자가 위로 스크롤해서 이전 대화를 보고 있으면 따라 내려가지 않는다
+        if self.scroll_timer.isActive(): return
+        self.follow_bottom = value >= self.transcript_view.verticalScrollBar().maximum() - BOTTOM_FOLLOW_MARGIN
+        # 맨 위까지 올라가면 더 오래된 페이지를 불러온다
+        if value == 0 and self.older_cursor is not None and self.keep_bottom_offset is None: QTimer.singleShot(0, self.load_older_page)
     
     def load_initial_message(self): self.add_message_bubble(self.messages[2]['content'], is_user=False)
 
@@ -191,41 +477,62 @@ class ChatbotWidget(QWidget):
         if not user_message: return
         self.add_message_bubble(user_message, is_user=True)
         self.messages.append({"role": "user", "content": user_message})
+        self.save_message("user", user_message)
         self.input_box.clear(); self.input_box.setFixedHeight(STYLE_CONFIG['send_button_size'])
         self.set_input_enabled(False)
-        self.current_ai_bubble = self.add_message_bubble("...", is_user=False)
-        self.thread = QThread(); self.worker = GeminiWorker(self.messages)
-        self.worker.moveToThread(self.thread)
-        self.worker.chunk_received.connect(self.update_ai_bubble)
-        self.worker.stream_finished.connect(self.finish_stream)
-        self.worker.error_occurred.connect(self.handle_error)
-        self.thread.started.connect(self.worker.run)
-        self.thread.finished.connect(self.thread.deleteLater)
-        self.worker.stream_finished.connect(self.thread.quit)
-        self.worker.error_occurred.connect(self.thread.quit)
-        self.thread.start()
+        self.current_ai_row = self.add_message_bubble("...", is_user=False)
+        self.waiting_first_chunk = True
+        self.chat_worker.submit(user_message)
 
     def update_ai_bubble(self, chunk):
-        if self.current_ai_bubble.text() == "...": self.current_ai_bubble.set_text(chunk)
-        else: self.current_ai_bubble.append_text(chunk)
+        self.pending_chunks.append(chunk)
+        if not self.flush_timer.isActive(): self.flush_timer.start()
+    def flush_pending_chunks(self):
+        if not self.pending_chunks: return
+        text = "".join(self.pending_chunks); self.pending_chunks.clear()
+        if self.waiting_first_chunk:
+            self.transcript.set_text(self.current_ai_row, text); self.waiting_first_chunk = False
+        else: self.transcript.append_text(self.current_ai_row, text)
     def finish_stream(self):
-        self.messages.append({"role": "assistant", "content": self.current_ai_bubble.text()})
+        self.flush_timer.stop(); self.flush_pending_chunks()
+        self.messages.append({"role": "assistant", "content": self.transcript.text(self.current_ai_row)})
+        self.save_message("assistant", self.messages[-1]["content"])
+        self.current_ai_row = None
         self.set_input_enabled(True)
     def handle_error(self, error_message):
-        self.current_ai_bubble.set_text(error_message)
-        self.current_ai_bubble.setStyleSheet("QLabel { color: #e74c3c; }")
+        self.flush_timer.stop(); self.pending_chunks.clear()
+        self.waiting_first_chunk = False
+        self.transcript.set_text(self.current_ai_row, error_message)
+        self.transcript.mark_error(self.current_ai_row)
+        self.current_ai_row = None
         self.set_input_enabled(True)
+    def save_message(self, role, content):
+        """대화의 첫 메시지에서 대화를 만들고, 메시지는 write-behind로 저장합니다. (오류 메시지는 저장하지 않음)"""
+        try:
+            if self.conversation_id is None:
+                self.conversation_id = chat_history.create_conversation(content)
+                self.load_conversation_list()
+        except sqlite3.Error as e:
+            print(f"대화를 저장할 수 없습니다: {e}")
+            return
+        self.history_writer.append(self.conversation_id, role, content)
     def set_input_enabled(self, enabled):
+        # 답변을 받는 동안에는 다른 대화로 바꾸지 않는다 (행 번호가 바뀌지 않도록)
         self.input_box.setEnabled(enabled); self.send_button.setEnabled(enabled)
+        self.conversation_box.setEnabled(enabled)
         if enabled: self.input_box.setFocus()
 
-# --- 메인 윈도우 (변경 없음) ---
+# --- 메인 윈도우 ---
 class ChatbotWindow(QMainWindow):
     def __init__(self):
         super().__init__()
         self.setWindowTitle("AI 챗봇 트레이너"); self.resize(STYLE_CONFIG['window_width'], STYLE_CONFIG['window_height'])
         self.central_widget = ChatbotWidget(); self.setCentralWidget(self.central_widget)
 
+    def closeEvent(self, event):
+        self.central_widget.shutdown()
+        super().closeEvent(event)
+
 # --- API 키 로드/저장 (변경 없음) ---
 def load_api_key():
     global API_KEY; API_KEY = os.getenv("GOOGLE_API_KEY")
@@ -245,7 +552,7 @@ def save_api_key(key):
 # --- main 실행 (변경 없음) ---
 if __name__ == "__main__":
     app = QApplication(sys.argv)
-    if not load_api_key():
+    if not CHAT_FAKE and not load_api_key():
         text, ok = QInputDialog.getText(None, "API 키 입력", "Google AI Studio에서 발급받은 API 키를 입력해주세요.")
         if ok and text: save_api_key(text); API_KEY = text
         else: QMessageBox.critical(None, "오류", "API 키가 없어 챗봇을 실행할 수 없습니다."); sys.exit(1)
@@ -1,15 +1,26 @@
 # database_manager.py
-import sqlite3
 import json
 from datetime import datetime
+from db_connection import get_connection, connection_lock
 
 DB_NAME = 'workout_records.db'
 
-def init_db():
-    """데이터베이스를 초기화하고 'records' 테이블을 생성합니다."""
-    conn = sqlite3.connect(DB_NAME)
-    cursor = conn.cursor()
-    cursor.execute('''
+def _convert_set_details(conn):
+    """기존 records.set_details(JSON)를 sets 테이블 행으로 옮깁니다. 반복별 상세 정보는 예전 기록에 없으므로 세트 단위만 옮깁니다."""
+    rows = conn.execute("SELECT id, set_details FROM records WHERE id NOT IN (SELECT record_id FROM sets)").fetchall()
+    set_rows = []
+    for record_id, details_json in rows:
+        try:
+            details_list = json.loads(details_json)
+            set_rows.extend((record_id, i + 1, int(item['good']), int(item['bad'])) for i, item in enumerate(details_list))
+        except (json.JSONDecodeError, TypeError, KeyError, ValueError):
+            print(f"기록 {record_id}의 세트 정보를 변환할 수 없습니다. 건너뜁니다.")
+    conn.executemany(INSERT_SET_SQL, set_rows)
+
+# 스키마 마이그레이션: i번째 항목이 user_version을 i+1로 올림 (이미 배포된 항목은 수정하지 말고 뒤에 추가)
+MIGRATIONS = [
+    # 1: 'records' 테이블 생성
+    '''
         CREATE TABLE IF NOT EXISTS records (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
             exercise_type TEXT NOT NULL,
@@ -19,34 +30,150 @@ def init_db():
             rest_time INTEGER NOT NULL,
             set_details TEXT NOT NULL
         )
-    ''')
-    conn.commit()
-    conn.close()
+    ''',
+    # 2: 운동별 최신순 조회가 전체 스캔/정렬 없이 인덱스만 타도록 복합 인덱스 추가
+    '''
+        CREATE INDEX IF NOT EXISTS idx_records_exercise_timestamp ON records (exercise_type, timestamp)
+    ''',
+    # 3: 세트/반복 단위 정규화 테이블 (records.set_details는 이전 버전 호환용으로만 계속 기록)
+    '''
+        CREATE TABLE IF NOT EXISTS sets (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            record_id INTEGER NOT NULL REFERENCES records (id) ON DELETE CASCADE,
+            set_number INTEGER NOT NULL,
+            good_count INTEGER NOT NULL,
+            bad_count INTEGER NOT NULL,
+            UNIQUE (record_id, set_number)
+        );
+        CREATE TABLE IF NOT EXISTS reps (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            set_id INTEGER NOT NULL REFERENCES sets (id) ON DELETE CASCADE,
+            rep_number INTEGER NOT NULL,
+            timestamp REAL NOT NULL,
+            duration REAL,
+            min_angle REAL,
+            is_good INTEGER NOT NULL,
+            feedback TEXT NOT NULL DEFAULT ''
+        );
+        CREATE INDEX IF NOT EXISTS idx_reps_set ON reps (set_id)
+    ''',
+    # 4: 기존 JSON 세트 정보를 sets 테이블로 변환
+    _convert_set_details,
+    # 5: 반복별 최고 각도와 템포(내려가는/올라오는 시간, 초) (rep_detector 참고, 이전 기록은 NULL)
+    '''
+        ALTER TABLE reps ADD COLUMN max_angle REAL;
+        ALTER TABLE reps ADD COLUMN eccentric REAL;
+        ALTER TABLE reps ADD COLUMN concentric REAL
+    ''',
+]
+
+INSERT_RECORD_SQL = '''
+    INSERT INTO records (exercise_type, timestamp, target_reps, total_sets, rest_time, set_details)
+    VALUES (?, ?, ?, ?, ?, ?)
+'''
+INSERT_SET_SQL = "INSERT INTO sets (record_id, set_number, good_count, bad_count) VALUES (?, ?, ?, ?)"
+INSERT_REP_SQL = '''
+    INSERT INTO reps (set_id, rep_number, timestamp, duration, min_angle, max_angle, eccentric, concentric, is_good, feedback)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+'''
+RECORD_COLUMNS_SQL = '''
+    SELECT r.id, r.timestamp, r.exercise_type, r.target_reps, r.total_sets, r.rest_time,
+           (SELECT SUM(s.good_count) FROM sets s WHERE s.record_id = r.id), r.set_details
+    FROM records r
+'''
+SELECT_RECORDS_SQL = RECORD_COLUMNS_SQL + "WHERE r.exercise_type = ? ORDER BY r.timestamp DESC"
+# 키셋 페이지네이션: (timestamp, id)가 이전 페이지 마지막 행보다 작은 행만 인덱스 순서대로 읽음
+SELECT_RECORDS_PAGE_SQL = RECORD_COLUMNS_SQL + '''
+    WHERE r.exercise_type = ? AND (r.timestamp, r.id) < (?, ?)
+    ORDER BY r.timestamp DESC, r.id DESC LIMIT ?
+'''
+SELECT_SETS_SQL = "SELECT record_id, good_count, bad_count FROM sets WHERE record_id IN ({}) ORDER BY record_id, set_number"
+SELECT_SUMMARY_SQL = '''
+    SELECT COUNT(DISTINCT r.id), SUM(s.good_count), SUM(s.bad_count)
+    FROM records r JOIN sets s ON s.record_id = r.id
+    WHERE r.exercise_type = ? AND r.timestamp >= ?
+'''
+SELECT_REP_STATS_SQL = '''
+    SELECT AVG(p.duration), AVG(p.min_angle), AVG(p.is_good)
+    FROM records r JOIN sets s ON s.record_id = r.id JOIN reps p ON p.set_id = s.id
+    WHERE r.exercise_type = ? AND r.timestamp >= ?
+'''
+
+def _connect():
+    """프로세스 전역 연결을 가져옵니다. 처음 호출될 때 스키마 마이그레이션이 적용됩니다."""
+    return get_connection(DB_NAME, MIGRATIONS)
+
+def init_db():
+    """데이터베이스를 초기화하고 스키마를 최신 버전으로 마이그레이션합니다."""
+    _connect()
+
+def _insert_set(conn, record_id, set_number, set_result):
+    """세트 한 개와 그 세트의 반복 기록을 추가합니다. 반복 기록은 executemany로 한 번에 넣습니다."""
+    cursor = conn.execute(INSERT_SET_SQL, (record_id, set_number, set_result["good"], set_result["bad"]))
+    set_id = cursor.lastrowid
+    conn.executemany(INSERT_REP_SQL, [
+        (set_id, i + 1, rep["timestamp"], rep["duration"], rep["min_angle"], rep.get("max_angle"), rep.get("eccentric"), rep.get("concentric"),
+         int(rep["good"]), rep["feedback"])
+        for i, rep in enumerate(set_result.get("reps", []))
+    ])
 
 def add_workout_record(exercise_type, target_reps, total_sets, rest_time, set_details_list):
-    """새로운 운동 기록을 데이터베이스에 추가합니다."""
-    conn = sqlite3.connect(DB_NAME)
-    cursor = conn.cursor()
+    """
+    새로운 운동 기록을 데이터베이스에 추가합니다.
+    set_details_list의 각 항목은 {"good", "bad", "reps": [반복 기록, ...]} 형태입니다.
+    """
+    conn = _connect()
     timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    set_details_json = json.dumps(set_details_list)
-    
-    cursor.execute('''
-        INSERT INTO records (exercise_type, timestamp, target_reps, total_sets, rest_time, set_details)
-        VALUES (?, ?, ?, ?, ?, ?)
-    ''', (exercise_type, timestamp, target_reps, total_sets, rest_time, set_details_json))
+    set_details_json = json.dumps([{"good": s["good"], "bad": s["bad"]} for s in set_details_list])
     
-    conn.commit()
-    conn.close()
+    with connection_lock(), conn:
+        cursor = conn.execute(INSERT_RECORD_SQL, (exercise_type, timestamp, target_reps, total_sets, rest_time, set_details_json))
+        for set_number, set_result in enumerate(set_details_list, start=1):
+            _insert_set(conn, cursor.lastrowid, set_number, set_result)
     print(f"기록 저장 완료: {exercise_type} at {timestamp}")
 
+def _attach_sets(conn, rows):
+    """조회한 기록 행마다 세트별 (good, bad) 목록을 붙여 (timestamp, ..., total_good, set_details, sets) 형태로 바꿉니다."""
+    sets_by_record = {row[0]: [] for row in rows}
+    ids = list(sets_by_record)
+    # SQLite 변수 개수 제한을 넘지 않도록 나눠서 조회
+    for start in range(0, len(ids), 500):
+        chunk = ids[start:start + 500]
+        for record_id, good, bad in conn.execute(SELECT_SETS_SQL.format(",".join("?" * len(chunk))), chunk):
+            sets_by_record[record_id].append((good, bad))
+    return [row[1:] + (sets_by_record[row[0]],) for row in rows]
+
 def get_records_by_exercise(exercise_type):
-    """특정 운동에 대한 모든 기록을 최신순으로 가져옵니다."""
-    conn = sqlite3.connect(DB_NAME)
-    cursor = conn.cursor()
-    cursor.execute(
-        "SELECT timestamp, exercise_type, target_reps, total_sets, rest_time, set_details FROM records WHERE exercise_type = ? ORDER BY timestamp DESC",
-        (exercise_type,)
-    )
-    records = cursor.fetchall()
-    conn.close()
-    return records
\ No newline at end of file
+    """
+    특정 운동에 대한 모든 기록을 최신순으로 가져옵니다.
+    각 행은 (timestamp, exercise_type, target_reps, total_sets, rest_time, total_good, set_details, [(good, bad), ...])입니다.
+    set_details는 records 테이블의 JSON 원본으로, sets 테이블에 행이 없는 기록(이전 버전 앱이 기록한 행 등)을 표시할 때 씁니다.
+    """
+    conn = _connect()
+    with connection_lock():
+        rows = conn.execute(SELECT_RECORDS_SQL, (exercise_type,)).fetchall()
+        return _attach_sets(conn, rows)
+
+def get_records_page(exercise_type, cursor=None, limit=50):
+    """
+    특정 운동의 기록을 최신순으로 한 페이지만 가져옵니다. 기록 수와 관계없이 인덱스에서 limit개만 읽습니다.
+    (행 목록, 다음 페이지 cursor)를 반환하며, 마지막 페이지이면 cursor는 None입니다.
+    """
+    conn = _connect()
+    last_timestamp, last_id = cursor if cursor else ("9999-12-31 23:59:59", 0)
+    with connection_lock():
+        rows = conn.execute(SELECT_RECORDS_PAGE_SQL, (exercise_type, last_timestamp, last_id, limit)).fetchall()
+        page = _attach_sets(conn, rows)
+    next_cursor = (rows[-1][1], rows[-1][0]) if len(rows) == limit else None
+    return page, next_cursor
+
+def get_exercise_summary(exercise_type, since="0000-00-00 00:00:00"):
+    """since 이후 특정 운동의 세션 수, 총 성공/실패 횟수, 반복 평균(소요 시간, 최저 각도, 성공률)을 SQL 집계로 계산합니다."""
+    conn = _connect()
+    with connection_lock():
+        sessions, total_good, total_bad = conn.execute(SELECT_SUMMARY_SQL, (exercise_type, since)).fetchone()
+        avg_duration, avg_min_angle, good_ratio = conn.execute(SELECT_REP_STATS_SQL, (exercise_type, since)).fetchone()
+    return {
+        "sessions": sessions, "total_good": total_good or 0, "total_bad": total_bad or 0,
+        "avg_rep_duration": avg_duration, "avg_min_angle": avg_min_angle, "good_ratio": good_ratio,
+    }
@@ -0,0 +1,57 @@
+# db_connection.py
+# 프로세스당 하나의 SQLite 연결을 유지하고, PRAGMA user_version으로 스키마 마이그레이션을 관리합니다.
+import atexit
+import os
+import sqlite3
+import threading
+
+STATEMENT_CACHE_SIZE = 128  # sqlite3 모듈이 준비(prepare)해 두는 SQL 문 개수
+
+_connections = {}  # 데이터베이스 경로 → (pid, 연결)
+_lock = threading.RLock()
+
+def get_connection(db_path, migrations=()):
+    """
+    db_path에 대한 프로세스 전역 연결을 반환합니다. 처음 열 때 WAL 모드를 켜고 마이그레이션을 적용합니다.
+    여러 스레드에서 쓸 수 있으며, 쓰기 작업은 connection_lock()으로 감싸야 합니다.
+    """
+    with _lock:
+        entry = _connections.get(db_path)
+        # fork된 자식 프로세스는 부모의 연결을 물려받지 않고 새로 연다
+        if entry is not None and entry[0] == os.getpid():
+            return entry[1]
+        conn = sqlite3.connect(db_path, check_same_thread=False, cached_statements=STATEMENT_CACHE_SIZE)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA foreign_keys=ON")
+        migrate(conn, migrations)
+        _connections[db_path] = (os.getpid(), conn)
+        return conn
+
+def connection_lock():
+    """연결을 여러 스레드가 함께 쓸 때 트랜잭션 단위로 잡는 잠금입니다."""
+    return _lock
+
+def migrate(conn, migrations):
+    """
+    migrations[i]는 스키마 버전 i+1로 올리는 SQL 문자열 또는 conn을 받는 함수입니다.
+    현재 user_version 이후의 단계만 순서대로, 각각 하나의 트랜잭션으로 적용합니다.
+    """
+    version = conn.execute("PRAGMA user_version").fetchone()[0]
+    for target, step in enumerate(migrations[version:], start=version + 1):
+        with conn:
+            conn.execute("BEGIN")
+            if callable(step):
+                step(conn)
+            else:
+                for statement in step.split(";"):
+                    if statement.strip(): conn.execute(statement)
+            conn.execute(f"PRAGMA user_version = {target}")
+
+def close_all():
+    with _lock:
+        for pid, conn in _connections.values():
+            if pid == os.getpid(): conn.close()
+        _connections.clear()
+
+atexit.register(close_all)
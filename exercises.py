@@ -0,0 +1,10 @@
+# exercises.py
+# 운동 이름 → 트레이너 모듈 표
+# cv2/mediapipe를 import하지 않으므로, 카메라를 쓰지 않는 도구(영상 분석, 기록 재생, 벤치마크, 세션 호스트)도 이 표만 가볍게 가져다 씁니다.
+
+# 운동 이름 → (트레이너 모듈, 반복 판정에 쓰는 주 관절 각도 키)
+EXERCISES = {
+    'pushup': ('pushup_ai_trainer', 'elbow_angle'),
+    'squat': ('squat_ai_trainer', 'knee_angle'),
+}
+TRAINER_MODULES = {name: module_name for name, (module_name, _) in EXERCISES.items()}
@@ -0,0 +1,182 @@
+# frame_bus.py
+# multiprocessing.shared_memory 위에 만든 고정 슬롯 링 버퍼로, 카메라 프레임을 여러 소비자(다른 프로세스 포함)에게 나눠 줍니다.
+# 프레임은 피클링이나 파이프 복사 없이 공유 메모리에 한 번 쓰이고, 소비자는 자기 버퍼로 한 번 복사해 갑니다.
+#
+# 메모리 배치 (리틀 엔디언)
+#   헤더 64바이트 : magic 'AIFB', 버전, 슬롯 수, 높이, 너비, 채널 수, 마지막으로 쓴 시퀀스 번호
+#   슬롯 표       : 슬롯마다 시퀀스 번호(uint64), 그다음 슬롯마다 타임스탬프(float64)
+#   프레임 영역   : (슬롯 수, 높이, 너비, 채널) uint8
+#
+# 생산자는 절대 기다리지 않습니다. 슬롯을 쓰는 동안 그 슬롯의 시퀀스를 0으로 두고, 다 쓴 뒤 새 번호를 기록합니다.
+# 소비자는 복사 전후로 시퀀스를 확인해 도중에 덮어쓰인 프레임은 버리고, 너무 뒤처지면 남아 있는 가장 오래된 프레임으로 건너뜁니다.
+#
+# 현재 소비자는 워커 모드에서 메뉴 프로세스의 카메라 미리보기(main_menu.open_preview) 하나입니다.
+# 포즈 추론은 카메라를 연 워커 프로세스 안에서 하므로 버스를 거치면 복사만 한 번 늘어나서 cap.read() 결과를 그대로 쓰고,
+# 랜드마크 기록기(landmark_recording)는 프레임이 아닌 추론 결과를 기록하므로 버스의 소비자가 아닙니다.
+# 다른 프로세스에서 프레임이 필요해지면(예: 영상 녹화) FrameBus.attach(이름) + FrameReader로 붙습니다.
+import struct
+import threading
+import time
+import numpy as np
+from multiprocessing import shared_memory
+
+MAGIC = b'AIFB'
+VERSION = 1
+HEADER_FORMAT = '<4sHHIIIIQ'  # magic, version, (예약), slots, height, width, channels, (write_seq 자리)
+HEADER_SIZE = 64
+WRITE_SEQ_OFFSET = struct.calcsize('<4sHHIIII')  # 헤더 안의 write_seq 위치
+DEFAULT_SLOTS = 4
+
+def _layout(slots, shape):
+    table_offset = HEADER_SIZE
+    data_offset = table_offset + slots * 16
+    data_offset = (data_offset + 63) // 64 * 64  # 프레임 영역은 64바이트 정렬
+    return table_offset, data_offset, data_offset + slots * int(np.prod(shape))
+
+def _attach_shm(name):
+    """
+    소비자 쪽에서 공유 메모리를 엽니다. 3.13 이상에서는 소비자가 블록을 추적하지 않게 합니다.
+    그 이전 버전에서는 spawn으로 띄운 프로세스끼리 resource_tracker를 함께 쓰므로 따로 처리하지 않습니다.
+    """
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        return shared_memory.SharedMemory(name=name)
+
+class FrameBus:
+    def __init__(self, shm, owner):
+        self.shm, self.owner, self.name = shm, owner, shm.name
+        magic, version, _, slots, height, width, channels, _ = struct.unpack_from(HEADER_FORMAT, shm.buf, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"프레임 버스 형식이 아닙니다: {shm.name}")
+        self.slots, self.shape = slots, (height, width, channels)
+        table_offset, data_offset, _ = _layout(slots, self.shape)
+        self._write_seq = np.ndarray((1,), np.uint64, shm.buf, WRITE_SEQ_OFFSET)
+        self._seqs = np.ndarray((slots,), np.uint64, shm.buf, table_offset)
+        self._times = np.ndarray((slots,), np.float64, shm.buf, table_offset + slots * 8)
+        self._frames = np.ndarray((slots,) + self.shape, np.uint8, shm.buf, data_offset)
+
+    @classmethod
+    def create(cls, shape, slots=DEFAULT_SLOTS, name=None):
+        """생산자 쪽에서 새 버스를 만듭니다. shape은 (높이, 너비, 채널)입니다."""
+        shape = tuple(int(n) for n in shape)
+        *_, size = _layout(slots, shape)
+        shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+        struct.pack_into(HEADER_FORMAT, shm.buf, 0, MAGIC, VERSION, 0, slots, *shape, 0)
+        bus = cls(shm, owner=True)
+        bus._seqs[:] = 0
+        return bus
+
+    @classmethod
+    def attach(cls, name):
+        """다른 프로세스가 만든 버스에 소비자로 붙습니다."""
+        return cls(_attach_shm(name), owner=False)
+
+    @property
+    def latest_seq(self):
+        return int(self._write_seq[0])
+
+    def publish(self, frame, timestamp=None):
+        """프레임을 다음 슬롯에 복사하고 시퀀스 번호를 반환합니다. 소비자를 기다리지 않습니다."""
+        seq = self.latest_seq + 1
+        slot = seq % self.slots
+        self._seqs[slot] = 0  # 쓰는 중
+        np.copyto(self._frames[slot], frame)
+        self._times[slot] = time.time() if timestamp is None else timestamp
+        self._seqs[slot] = seq
+        self._write_seq[0] = seq
+        return seq
+
+    def read(self, seq, out):
+        """seq 번 프레임을 out에 복사하고 타임스탬프를 반환합니다. 이미 덮어쓰였거나 쓰는 중이면 None을 반환합니다."""
+        slot = seq % self.slots
+        if self._seqs[slot] != seq: return None
+        np.copyto(out, self._frames[slot])
+        timestamp = float(self._times[slot])
+        if self._seqs[slot] != seq: return None  # 복사하는 사이에 덮어쓰임
+        return timestamp
+
+    def close(self):
+        # numpy 뷰가 버퍼를 잡고 있으면 close가 실패하므로 먼저 놓는다
+        self._write_seq = self._seqs = self._times = self._frames = None
+        self.shm.close()
+        if self.owner:
+            try:
+                self.shm.unlink()
+            except FileNotFoundError:
+                pass
+
+class FrameReader:
+    """
+    버스 하나를 읽는 소비자입니다. 소비자마다 하나씩 만들며, 반환하는 프레임은 리더의 버퍼라서 다음 호출 전까지만 유효합니다.
+    poll()은 가장 최신 프레임만, next()는 순서대로 읽되 뒤처지면 건너뛰고 건너뛴 수를 skipped에 셉니다.
+    """
+    def __init__(self, bus):
+        self.bus = bus
+        self.buffer = np.empty(bus.shape, np.uint8)
+        self.last_seq = 0
+        self.skipped = 0
+
+    def poll(self):
+        """새 프레임이 있으면 (seq, 타임스탬프, 프레임), 없으면 None을 반환합니다."""
+        seq = self.bus.latest_seq
+        if seq <= self.last_seq: return None
+        timestamp = self.bus.read(seq, self.buffer)
+        if timestamp is None: return None
+        self.skipped += seq - self.last_seq - 1 if self.last_seq else 0
+        self.last_seq = seq
+        return seq, timestamp, self.buffer
+
+    def next(self, timeout=None, interval=0.002):
+        """다음 프레임을 기다려 반환합니다. 생산자가 한 바퀴 이상 앞서 있으면 남은 가장 오래된 프레임부터 읽습니다."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            latest = self.bus.latest_seq
+            if latest > self.last_seq:
+                # 최신 슬롯의 다음 칸은 곧 덮어쓰일 수 있으므로 한 칸 여유를 둔다
+                target = max(self.last_seq + 1, latest - self.bus.slots + 2)
+                if self.last_seq: self.skipped += target - self.last_seq - 1
+                timestamp = self.bus.read(target, self.buffer)
+                self.last_seq = target
+                if timestamp is not None: return target, timestamp, self.buffer
+                continue
+            if deadline is not None and time.monotonic() >= deadline: return None
+            time.sleep(interval)
+
+    def close(self):
+        self.buffer = None
+        self.bus.close()
+
+class PublishingCapture:
+    """
+    cv2.VideoCapture를 감싸서 read()로 읽은 프레임을 버스에 함께 올립니다. 트레이너 루프는 바꾸지 않고 그대로 씁니다.
+    버스는 첫 프레임의 크기로 만들고, 해상도가 바뀌면 새로 만듭니다.
+    read()는 캡처 스레드에서 호출되므로 close_bus()와 잠금으로 순서를 맞춥니다. close_bus()는 진행 중인 read()가 끝날 때까지 기다리고,
+    그 뒤의 read()는 카메라를 읽지 않고 실패를 반환하므로, close_bus()가 돌아온 뒤에는 카메라를 놓아도 됩니다.
+    """
+    def __init__(self, cap, slots=DEFAULT_SLOTS):
+        self.cap, self.slots = cap, slots
+        self.bus = None
+        self.closed = False
+        self._lock = threading.Lock()
+
+    def read(self):
+        with self._lock:
+            if self.closed: return False, None
+            success, image = self.cap.read()
+            if success:
+                if self.bus is None or self.bus.shape != image.shape:
+                    if self.bus is not None: self.bus.close()
+                    self.bus = FrameBus.create(image.shape, self.slots)
+                self.bus.publish(image)
+            return success, image
+
+    def __getattr__(self, name):
+        return getattr(self.cap, name)  # isOpened, set, get, release 등은 원래 캡처로
+
+    def close_bus(self):
+        """버스를 닫고 이후의 read()를 멈춥니다. 닫은 뒤에는 버스를 다시 만들지 않습니다."""
+        with self._lock:
+            self.closed = True
+            if self.bus is not None: self.bus.close()
+            self.bus = None
@@ -0,0 +1,135 @@
+# frame_pipeline.py
+# 캡처 / 추론 / 렌더링을 각각 다른 스레드에서 처리하는 파이프라인 루프
+import threading
+import time
+import cv2
+
+ESC_KEY = 27
+
+# --- 최신 프레임만 유지하는 슬롯 ---
+
+class LatestSlot:
+    """크기가 1인 큐입니다. 소비자가 가져가기 전에 새 항목이 들어오면 이전 항목은 버려집니다."""
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._item = None
+        self.dropped = 0
+
+    def put(self, item):
+        with self._cond:
+            if self._item is not None:
+                self.dropped += 1
+            self._item = item
+            self._cond.notify()
+
+    def get(self, timeout=None):
+        """항목이 들어올 때까지 기다렸다가 꺼냅니다. 시간 초과 시 None을 반환합니다."""
+        with self._cond:
+            if self._item is None:
+                self._cond.wait(timeout)
+            item, self._item = self._item, None
+            return item
+
+# --- 스테이지 스레드 ---
+
+class CaptureThread(threading.Thread):
+    """카메라에서 계속 프레임을 읽어 추론 슬롯과 화면 슬롯에 최신 프레임을 넣습니다."""
+    def __init__(self, cap, infer_slot, display_slot, stop_event, flip=False, profiler=None):
+        super().__init__(daemon=True)
+        self.cap, self.flip, self.profiler = cap, flip, profiler
+        self.infer_slot, self.display_slot = infer_slot, display_slot
+        self.stop_event = stop_event
+        self.frame_count = 0
+
+    def run(self):
+        profiler = self.profiler
+        while not self.stop_event.is_set():
+            t = profiler.start() if profiler else 0
+            success, image = self.cap.read()
+            if t: profiler.stop("capture", t)
+            if not success:
+                self.stop_event.set()
+                break
+            if self.flip:
+                t = profiler.start() if profiler else 0
+                image = cv2.flip(image, 1)
+                if t: profiler.stop("flip", t)
+            self.frame_count += 1
+            # 추론은 프레임을 읽기만 하고, 화면 쪽은 그 위에 그리므로 복사본을 넘긴다
+            self.infer_slot.put((time.perf_counter(), image))
+            self.display_slot.put((time.perf_counter(), image.copy()))
+
+class InferenceThread(threading.Thread):
+    """추론 슬롯에서 최신 프레임을 꺼내 infer_fn을 실행하고, 가장 최근 결과를 보관합니다."""
+    def __init__(self, infer_slot, infer_fn, stop_event):
+        super().__init__(daemon=True)
+        self.infer_slot, self.infer_fn = infer_slot, infer_fn
+        self.stop_event = stop_event
+        self.latest_result = None
+        self.frame_count = 0
+        self.total_latency = 0.0
+
+    def run(self):
+        while not self.stop_event.is_set():
+            item = self.infer_slot.get(timeout=0.1)
+            if item is None: continue
+            captured_at, image = item
+            self.latest_result = self.infer_fn(image)
+            self.frame_count += 1
+            self.total_latency += time.perf_counter() - captured_at
+
+# --- 파이프라인 실행 ---
+
+def show_in_window(window_name, display):
+    """OpenCV 창에 표시하고, ESC를 누르면 False를 반환합니다."""
+    cv2.imshow(window_name, display)
+    return cv2.waitKey(1) & 0xFF != ESC_KEY
+
+def run_pipeline(cap, infer_fn, render_fn, window_name, flip=False, display_size=(1280, 720), profiler=None, show_frame=None):
+    """
+    캡처 스레드 → 추론 스레드 → 렌더링(메인 스레드) 순서의 파이프라인으로 루프를 실행합니다.
+    infer_fn(image)는 추론 스레드에서 호출되며 결과를 반환합니다.
+    render_fn(image, latest_result)는 메인 스레드에서 호출되며, 그린 이미지를 반환하거나 종료하려면 None을 반환합니다.
+    cv2.imshow는 메인 스레드에서만 호출합니다. profiler(FrameProfiler)를 넘기면 캡처/화면 단계 시간을 기록합니다.
+    show_frame(display)를 넘기면 OpenCV 창 대신 그 함수로 프레임을 내보내며, False를 반환하면 루프를 끝냅니다.
+    이 함수가 돌아온 뒤에는 cap.read()와 infer_fn이 더 이상 호출되지 않습니다.
+    """
+    cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)  # 드라이버 버퍼에 오래된 프레임이 쌓이지 않도록 함
+    stop_event = threading.Event()
+    infer_slot, display_slot = LatestSlot(), LatestSlot()
+    capture_thread = CaptureThread(cap, infer_slot, display_slot, stop_event, flip, profiler)
+    inference_thread = InferenceThread(infer_slot, infer_fn, stop_event)
+    capture_thread.start()
+    inference_thread.start()
+
+    start_time, displayed = time.perf_counter(), 0
+    try:
+        while not stop_event.is_set():
+            item = display_slot.get(timeout=0.1)
+            if item is None: continue
+            _, image = item
+            image = render_fn(image, inference_thread.latest_result)
+            if image is None: break
+            t = profiler.start() if profiler else 0
+            display = cv2.resize(image, display_size)
+            if t: profiler.stop("resize", t)
+            if profiler: profiler.draw_overlay(display)
+            t = profiler.start() if profiler else 0
+            keep_running = show_frame(display) if show_frame else show_in_window(window_name, display)
+            if t: profiler.stop("imshow", t)
+            if profiler: profiler.frame_done()
+            displayed += 1
+            if not keep_running: break
+    finally:
+        stop_event.set()
+        # 이 함수가 돌아오면 호출한 쪽이 카메라를 놓으므로, 읽는 도중인 cap.read()가 끝나 캡처 스레드가 완전히 멈출 때까지 기다림
+        capture_thread.join()
+        # 호출한 쪽이 추론 결과를 쓰는 객체(앱 상태, 랜드마크 기록기)를 정리하기 전에 추론 스레드가 완전히 끝나야 하므로
+        # 시간 제한 없이 기다림 (진행 중인 추론 한 번만 끝나면 stop_event를 보고 빠져나옴)
+        inference_thread.join()
+
+    elapsed = max(time.perf_counter() - start_time, 1e-6)
+    avg_latency_ms = inference_thread.total_latency / max(inference_thread.frame_count, 1) * 1000
+    print(f"파이프라인 통계: 캡처 {capture_thread.frame_count / elapsed:.1f}fps, "
+          f"추론 {inference_thread.frame_count / elapsed:.1f}fps, 화면 {displayed / elapsed:.1f}fps, "
+          f"캡처→추론 지연 {avg_latency_ms:.0f}ms, 버린 프레임 {infer_slot.dropped}")
@@ -0,0 +1,124 @@
+# frame_profiler.py
+# 트레이너 루프의 단계별 소요 시간을 perf_counter_ns로 재서 고정 크기 히스토그램에 쌓고,
+# 화면에 FPS / 단계별 p50·p95를 표시하거나 세션 종료 시 요약 파일로 저장합니다.
+#
+# 꺼져 있을 때는 start()가 0을 반환하고 stop()이 바로 반환하므로 배포 빌드에 그대로 두어도 됩니다.
+# 사용: AIHT_PROFILE=1 python squat_ai_trainer.py
+import json
+import os
+import time
+import cv2
+
+HISTOGRAM_BUCKETS = 256   # 옥타브당 8칸의 로그 눈금, 약 17초까지
+SUB_BUCKETS = 8
+OVERLAY_REFRESH_NS = 500_000_000  # 화면 표시 문자열은 0.5초마다 갱신
+
+def bucket_index(ns):
+    if ns < SUB_BUCKETS: return ns
+    bits = ns.bit_length()
+    mantissa = ns >> (bits - 4)  # 상위 4비트, 8~15
+    return min((bits - 4) * SUB_BUCKETS + mantissa, HISTOGRAM_BUCKETS - 1)
+
+def bucket_value(index):
+    """칸의 대표값(ns, 칸의 가운데)을 반환합니다."""
+    if index < SUB_BUCKETS: return index
+    octave, mantissa = divmod(index - SUB_BUCKETS, SUB_BUCKETS)
+    low = (mantissa + SUB_BUCKETS) << octave
+    return low + (1 << octave) // 2
+
+class StageHistogram:
+    """한 단계의 소요 시간 분포. 기록 횟수와 관계없이 메모리 크기가 고정되어 있습니다."""
+    def __init__(self):
+        self.counts = [0] * HISTOGRAM_BUCKETS
+        self.count = 0
+        self.total_ns = 0
+        self.max_ns = 0
+
+    def record(self, ns):
+        self.counts[bucket_index(ns)] += 1
+        self.count += 1
+        self.total_ns += ns
+        if ns > self.max_ns: self.max_ns = ns
+
+    def percentile(self, p):
+        if self.count == 0: return 0
+        target, seen = p / 100.0 * self.count, 0
+        for index, n in enumerate(self.counts):
+            seen += n
+            if seen >= target: return bucket_value(index)
+        return self.max_ns
+
+    def summary_ms(self):
+        return {
+            "count": self.count,
+            "mean_ms": round(self.total_ns / max(self.count, 1) / 1e6, 3),
+            "p50_ms": round(self.percentile(50) / 1e6, 3),
+            "p95_ms": round(self.percentile(95) / 1e6, 3),
+            "p99_ms": round(self.percentile(99) / 1e6, 3),
+            "max_ms": round(self.max_ns / 1e6, 3),
+        }
+
+class FrameProfiler:
+    def __init__(self, enabled=False, show_overlay=True):
+        self.enabled = enabled
+        self.show_overlay = show_overlay
+        self.stages = {}
+        self.frames = StageHistogram()  # 화면에 표시된 프레임 사이 간격
+        self.last_frame_ns = 0
+        self.started_ns = time.perf_counter_ns()
+        self.overlay_lines = []
+        self.overlay_updated_ns = 0
+
+    def start(self):
+        return time.perf_counter_ns() if self.enabled else 0
+
+    def stop(self, stage, start_ns):
+        if not start_ns: return
+        histogram = self.stages.get(stage)
+        if histogram is None: histogram = self.stages[stage] = StageHistogram()
+        histogram.record(time.perf_counter_ns() - start_ns)
+
+    def frame_done(self):
+        """화면에 한 프레임을 내보낼 때마다 호출합니다."""
+        if not self.enabled: return
+        now = time.perf_counter_ns()
+        if self.last_frame_ns: self.frames.record(now - self.last_frame_ns)
+        self.last_frame_ns = now
+
+    def fps(self):
+        p50 = self.frames.percentile(50)
+        return 1e9 / p50 if p50 else 0.0
+
+    def draw_overlay(self, image):
+        """FPS와 단계별 p50/p95를 화면 왼쪽 아래에 그립니다. 문자열은 0.5초마다만 다시 만듭니다."""
+        if not (self.enabled and self.show_overlay): return image
+        now = time.perf_counter_ns()
+        if now - self.overlay_updated_ns > OVERLAY_REFRESH_NS:
+            self.overlay_lines = [f"FPS {self.fps():.1f}"] + [
+                f"{name:<14} p50 {h.percentile(50) / 1e6:6.1f}  p95 {h.percentile(95) / 1e6:6.1f} ms"
+                for name, h in list(self.stages.items())
+            ]
+            self.overlay_updated_ns = now
+        y = image.shape[0] - 10 - 18 * (len(self.overlay_lines) - 1)
+        for line in self.overlay_lines:
+            cv2.putText(image, line, (10, y), cv2.FONT_HERSHEY_PLAIN, 1.0, (0, 255, 255), 1, cv2.LINE_AA)
+            y += 18
+        return image
+
+    def summary(self):
+        return {
+            "duration_s": round((time.perf_counter_ns() - self.started_ns) / 1e9, 1),
+            "fps": round(self.fps(), 1),
+            "frame_interval": self.frames.summary_ms(),
+            "stages": {name: h.summary_ms() for name, h in list(self.stages.items())},
+        }
+
+    def write_summary(self, name, directory='profiles'):
+        """세션 요약을 profiles/<name>_<시각>.json 파일로 저장하고 경로를 반환합니다."""
+        if not self.enabled: return None
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, f"{name}_{time.strftime('%Y%m%d_%H%M%S')}.json")
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.summary(), f, indent=4)
+        print(f"프로파일 요약 저장: {path}")
+        return path
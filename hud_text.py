@@ -0,0 +1,113 @@
+# hud_text.py
+# 트레이너 HUD용 텍스트 렌더러: 폰트와 글자 스프라이트를 캐시하고, 글자 영역만 프레임에 합성합니다.
+# 포즈 뼈대도 (33, 4) 랜드마크 배열에서 바로 그립니다. (mediapipe 없이, 예측한 랜드마크도 같은 방식으로)
+import os
+from functools import lru_cache
+import cv2
+import numpy as np
+from PIL import ImageFont, ImageDraw, Image
+import pose_math
+
+# FONT_PATH가 없을 때 순서대로 시도할 한글 지원 시스템 폰트
+FALLBACK_FONT_PATHS = [
+    'C:/Windows/Fonts/malgun.ttf',
+    '/usr/share/fonts/truetype/nanum/NanumGothic.ttf',
+    '/usr/share/fonts/opentype/noto/NotoSansCJK-Regular.ttc',
+    '/System/Library/Fonts/AppleSDGothicNeo.ttc',
+]
+SPRITE_CACHE_SIZE = 256
+# 뼈대 그리기 설정 (mediapipe drawing_utils.draw_landmarks 기본값과 같은 모양)
+SKELETON_COLOR = (224, 224, 224)
+JOINT_COLOR = (0, 0, 255)
+JOINT_BORDER_COLOR = (255, 255, 255)
+SKELETON_VISIBILITY = 0.5  # 이보다 잘 보이는 관절만 그림
+
+# --- 폰트 로딩 (경로/크기별로 한 번만) ---
+
+@lru_cache(maxsize=None)
+def resolve_font_path(font_path):
+    """사용할 폰트 파일 경로를 한 번만 결정합니다. 쓸 수 있는 폰트가 없으면 None을 반환합니다."""
+    for path in [font_path] + FALLBACK_FONT_PATHS:
+        if os.path.exists(path):
+            if path != font_path:
+                print(f"폰트 파일({font_path})을 찾을 수 없습니다. {path} 폰트로 대체합니다.")
+            return path
+    print(f"폰트 파일({font_path})을 찾을 수 없습니다. OpenCV 기본 폰트로 대체합니다.")
+    return None
+
+@lru_cache(maxsize=None)
+def load_font(font_path, font_size):
+    """폰트 객체를 경로/크기별로 캐시합니다. 폰트를 쓸 수 없으면 None을 반환합니다."""
+    path = resolve_font_path(font_path)
+    if path is None: return None
+    try:
+        return ImageFont.truetype(path, font_size)
+    except IOError:
+        print(f"폰트 파일({path})을 열 수 없습니다. OpenCV 기본 폰트로 대체합니다.")
+        return None
+
+# --- 글자 스프라이트 ---
+
+@lru_cache(maxsize=SPRITE_CACHE_SIZE)
+def render_sprite(text, font_path, font_size, color):
+    """
+    문자열을 글자 크기만 한 작은 BGR 스프라이트와 알파 마스크로 렌더링합니다.
+    (dx, dy, bgr, alpha)를 반환하며 (dx, dy)는 그리기 위치 기준 스프라이트의 오프셋입니다.
+    """
+    font = load_font(font_path, font_size)
+    left, top, right, bottom = font.getbbox(text)
+    width, height = max(right - left, 1), max(bottom - top, 1)
+    sprite = Image.new('RGBA', (width, height), (0, 0, 0, 0))
+    ImageDraw.Draw(sprite).text((-left, -top), text, font=font, fill=tuple(color) + (255,))
+    rgba = np.asarray(sprite)
+    bgr = np.ascontiguousarray(rgba[:, :, 2::-1], dtype=np.float32)
+    alpha = rgba[:, :, 3:4].astype(np.float32) / 255.0
+    return left, top, bgr, alpha
+
+def measure_text(text, font_path, font_size):
+    """문자열이 차지하는 (너비, 높이)를 반환합니다."""
+    font = load_font(font_path, font_size)
+    if font is None:
+        (width, height), _ = cv2.getTextSize(text, cv2.FONT_HERSHEY_SIMPLEX, font_size / 25, 2)
+        return width, height
+    left, top, right, bottom = font.getbbox(text)
+    return right - left, bottom - top
+
+def draw_text(img, text, pos, font_path, font_size, color):
+    """캐시된 스프라이트를 프레임의 해당 영역에만 알파 합성합니다. color는 RGB 순서이며, img를 직접 수정하고 반환합니다."""
+    if not text: return img
+    if load_font(font_path, font_size) is None:
+        cv2.putText(img, text, (int(pos[0]), int(pos[1] + font_size)), cv2.FONT_HERSHEY_SIMPLEX, font_size / 25, color[::-1], 2)
+        return img
+
+    dx, dy, bgr, alpha = render_sprite(text, font_path, font_size, tuple(color))
+    x, y = int(pos[0]) + dx, int(pos[1]) + dy
+    sprite_h, sprite_w = alpha.shape[:2]
+    img_h, img_w = img.shape[:2]
+
+    # 화면 밖으로 나가는 부분은 잘라냄
+    x0, y0, x1, y1 = max(x, 0), max(y, 0), min(x + sprite_w, img_w), min(y + sprite_h, img_h)
+    if x0 >= x1 or y0 >= y1: return img
+    sx, sy = x0 - x, y0 - y
+    a = alpha[sy:sy + (y1 - y0), sx:sx + (x1 - x0)]
+    s = bgr[sy:sy + (y1 - y0), sx:sx + (x1 - x0)]
+
+    roi = img[y0:y1, x0:x1]
+    roi[:] = (s * a + roi * (1.0 - a)).astype(np.uint8)
+    return img
+
+# --- 포즈 뼈대 ---
+
+def draw_skeleton(img, landmarks):
+    """(33, 4) 랜드마크 배열의 관절과 뼈대를 img에 그립니다. 잘 보이지 않거나 화면 밖에 있는 관절은 건너뜁니다."""
+    h, w = img.shape[:2]
+    xy = landmarks[:, :2]
+    shown = ((landmarks[:, 3] >= SKELETON_VISIBILITY) & np.all((xy >= 0.0) & (xy <= 1.0), axis=1)).tolist()
+    pixels = [tuple(p) for p in np.minimum(np.floor(xy * (w, h)), (w - 1, h - 1)).astype(np.int32).tolist()]
+    for a, b in pose_math.POSE_CONNECTIONS:
+        if shown[a] and shown[b]: cv2.line(img, pixels[a], pixels[b], SKELETON_COLOR, 2)
+    for point, visible in zip(pixels, shown):
+        if not visible: continue
+        cv2.circle(img, point, 3, JOINT_BORDER_COLOR, 2)
+        cv2.circle(img, point, 2, JOINT_COLOR, 2)
+    return img
@@ -0,0 +1,77 @@
+# landmark_filter.py
+# (33, 4) 랜드마크 배열 전체에 One-Euro 필터를 한 번의 벡터 연산으로 적용해 프레임마다 흔들리는 좌표를 안정시킵니다.
+# 필터 상태(이전 값, 속도)는 랜드마크마다 따로 두며, 천천히 움직이는 관절은 강하게, 빠르게 움직이는 관절은 약하게 거릅니다.
+# 좌표가 덜 흔들리므로 lite 모델(AIHT_POSE_COMPLEXITY=0)과 작은 입력 크기(AIHT_POSE_INPUT_SIZE)로도 반복 판정이 유지됩니다.
+# (정확도/CPU 비교는 landmark_filter_benchmark.py 참고)
+#
+# 참고: Casiez et al., "1€ Filter: A Simple Speed-based Low-pass Filter for Noisy Input in Interactive Systems" (CHI 2012)
+import math
+import numpy as np
+from pose_math import NUM_LANDMARKS
+
+# 정규화 좌표(0~1) 기준 기본값
+MIN_CUTOFF = 1.5   # 멈춰 있을 때의 차단 주파수(Hz), 작을수록 떨림이 줄고 지연이 늘어남
+BETA = 8.0         # 속도(화면 폭/초)에 비례해 차단 주파수를 올리는 비율, 클수록 빠른 동작의 지연이 줄어듦
+D_CUTOFF = 1.0     # 속도 추정에 쓰는 저역 통과 필터의 차단 주파수(Hz)
+FILTERED_COLUMNS = 3  # x, y, z만 거르고 visibility는 모델 값을 그대로 씀
+
+def smoothing_factor(cutoff, dt):
+    """차단 주파수 cutoff(Hz)의 1차 저역 통과 필터가 dt초 간격에서 쓰는 계수 (0~1)"""
+    return 1.0 / (1.0 + 1.0 / (2.0 * math.pi * cutoff * dt))
+
+class OneEuroLandmarkFilter:
+    """
+    apply(landmarks, timestamp)로 매 추론 결과를 넘기면 같은 배열의 x, y, z 열을 필터링한 값으로 바꿔 반환합니다.
+    계산에 쓰는 배열은 미리 만들어 두므로 프레임마다 새 배열을 할당하지 않습니다.
+    사람을 놓쳤거나 다른 영상으로 넘어가면 reset()을 불러 이전 위치에서 끌려오지 않게 합니다.
+    """
+    def __init__(self, min_cutoff=MIN_CUTOFF, beta=BETA, d_cutoff=D_CUTOFF, enabled=True):
+        self.min_cutoff, self.beta, self.d_cutoff = min_cutoff, beta, d_cutoff
+        self.enabled = enabled
+        shape = (NUM_LANDMARKS, FILTERED_COLUMNS)
+        self.value = np.zeros(shape, dtype=np.float32)     # 랜드마크별 필터링된 위치
+        self.velocity = np.zeros(shape, dtype=np.float32)  # 랜드마크별 필터링된 속도
+        self._delta = np.zeros(shape, dtype=np.float32)
+        self._speed = np.zeros((NUM_LANDMARKS, 1), dtype=np.float32)
+        self.timestamp = None
+
+    def reset(self):
+        self.timestamp = None
+
+    def apply(self, landmarks, timestamp):
+        """landmarks는 (33, 4) float32 배열이며 제자리에서 바뀝니다. timestamp는 초 단위의 단조 증가 시각입니다."""
+        if not self.enabled: return landmarks
+        raw = landmarks[:, :FILTERED_COLUMNS]
+        if self.timestamp is None or timestamp <= self.timestamp:
+            # 첫 프레임(또는 시각이 거꾸로 간 경우)은 그대로 두고 상태만 맞춘다
+            self.value[:] = raw
+            self.velocity.fill(0.0)
+            self.timestamp = timestamp
+            return landmarks
+        dt = timestamp - self.timestamp
+        self.timestamp = timestamp
+
+        # 속도: (새 값 - 이전 값) / dt 를 D_CUTOFF로 거름
+        delta, speed = self._delta, self._speed
+        np.subtract(raw, self.value, out=delta)
+        delta /= dt
+        delta -= self.velocity
+        delta *= smoothing_factor(self.d_cutoff, dt)
+        self.velocity += delta
+
+        # 랜드마크별 차단 주파수 = min_cutoff + beta * |속도| → 계수 alpha = 1 / (1 + 1 / (2π·cutoff·dt))
+        np.einsum('ij,ij->i', self.velocity, self.velocity, out=speed[:, 0])
+        np.sqrt(speed, out=speed)
+        speed *= self.beta
+        speed += self.min_cutoff
+        speed *= 2.0 * math.pi * dt
+        np.reciprocal(speed, out=speed)
+        speed += 1.0
+        np.reciprocal(speed, out=speed)
+
+        # 위치: value += alpha * (새 값 - value)
+        np.subtract(raw, self.value, out=delta)
+        delta *= speed
+        self.value += delta
+        raw[:] = self.value
+        return landmarks
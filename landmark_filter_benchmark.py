@@ -0,0 +1,154 @@
+# landmark_filter_benchmark.py
+# 녹화된 운동 영상으로 포즈 모델 크기(lite/full/heavy)와 ROI 입력 크기, 랜드마크 필터 사용 여부에 따른
+# 반복 횟수 정확도와 프레임당 CPU 시간을 비교합니다.
+#
+# 설정(모델 크기, 입력 크기)마다 영상을 한 번만 추론하고, 같은 랜드마크를 필터 없이/필터를 거쳐 각각 트레이너의
+# 반복 판정(update_state_and_counters)에 넣습니다. 따라서 필터 켜기/끄기의 차이는 추론 결과의 차이가 아닌 필터의 효과입니다.
+# 정답 횟수(--expected)를 주지 않으면 가장 무거운 설정(필터 없음)의 횟수를 기준으로 삼습니다.
+#
+# 사용 예:
+#   python landmark_filter_benchmark.py squat videos/squat_*.mp4 --expected 10 12 --complexity 0 1 --input-size 160 256
+#   python landmark_filter_benchmark.py pushup videos/pushup.mp4 -o profiles/landmark_filter.json
+import argparse
+import importlib
+import json
+import os
+import sys
+import time
+import numpy as np
+import pose_math
+import shared_pose
+from exercises import EXERCISES
+from frame_profiler import StageHistogram
+from landmark_filter import OneEuroLandmarkFilter
+
+# 각도 떨림 지표: 연속 세 프레임 각도의 2차 차분 절댓값 중앙값 (일정한 속도의 움직임은 0, 프레임마다 튀는 값만 커짐)
+JITTER_MIN_SAMPLES = 3
+
+def infer_video(video_path, pose_model, trainer):
+    """
+    영상을 끝까지 추론해 프레임별 (영상 시각, 필터링 전 (33, 4) 랜드마크 또는 None) 목록과 추론 시간 통계를 반환합니다.
+    CPU 시간은 MediaPipe 내부 스레드까지 포함한 프로세스 CPU 시간입니다.
+    """
+    import cv2
+    cap = cv2.VideoCapture(video_path)
+    if not cap.isOpened(): raise RuntimeError(f"영상을 열 수 없습니다: {video_path}")
+    video_fps = cap.get(cv2.CAP_PROP_FPS) or 30.0
+    frames, latency = [], StageHistogram()
+    cpu_start = time.process_time()
+    while True:
+        success, image = cap.read()
+        if not success: break
+        if trainer.FLIP_FRAME: image = cv2.flip(image, 1)
+        start = time.perf_counter_ns()
+        results = pose_model.process(cv2.cvtColor(image, cv2.COLOR_BGR2RGB))
+        latency.record(time.perf_counter_ns() - start)
+        landmarks = pose_math.landmarks_to_array(results.pose_landmarks) if results.pose_landmarks else None
+        frames.append((len(frames) / video_fps, landmarks))
+    cpu_s = time.process_time() - cpu_start
+    cap.release()
+    return frames, {"frames": len(frames), "cpu_ms_per_frame": round(cpu_s * 1000 / max(len(frames), 1), 2), "latency": latency.summary_ms()}
+
+def count_reps(frames, trainer, angle_key, landmark_filter):
+    """
+    저장해 둔 랜드마크를 트레이너의 반복 판정에 넣어 (반복 횟수, 나쁜 반복 수, 각도 떨림, 필터 시간 통계)를 반환합니다.
+    세트가 끝나지 않도록 세트 목표는 무한대로 둡니다.
+    """
+    app_state = trainer.new_app_state()
+    angles, filter_time = [], StageHistogram()
+    landmark_filter.reset()
+    for timestamp, landmarks in frames:
+        if landmarks is None:
+            landmark_filter.reset()
+        else:
+            landmarks = landmarks.copy()
+            start = time.perf_counter_ns()
+            landmark_filter.apply(landmarks, timestamp)
+            filter_time.record(time.perf_counter_ns() - start)
+        landmarks_data = trainer.build_landmarks_data(None, landmarks, timestamp)
+        if landmarks_data[angle_key] is not None: angles.append(landmarks_data[angle_key])
+        trainer.update_state_and_counters(app_state, landmarks_data)
+    jitter = None
+    if len(angles) >= JITTER_MIN_SAMPLES:
+        jitter = round(float(np.median(np.abs(np.diff(np.asarray(angles), n=2)))), 2)
+    return app_state["counter"], app_state["bad_counter"], jitter, filter_time.summary_ms()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="포즈 모델 크기, 입력 크기, 랜드마크 필터에 따른 반복 판정 정확도와 CPU 시간을 비교합니다.")
+    parser.add_argument("exercise", choices=sorted(EXERCISES), help="운동 종류")
+    parser.add_argument("videos", nargs="+", help="녹화된 운동 영상 경로")
+    parser.add_argument("--expected", type=int, nargs="+", help="영상별 실제 반복 횟수 (videos와 같은 순서)")
+    parser.add_argument("--complexity", type=int, nargs="+", default=[0, 1], choices=[0, 1, 2], help="비교할 모델 크기 (0=lite, 1=full, 2=heavy)")
+    parser.add_argument("--input-size", type=int, nargs="+", default=[160, 256], help="비교할 ROI 입력 크기(긴 변, px)")
+    parser.add_argument("--no-roi", action="store_true", help="ROI 추적 없이 전체 화면으로 추론 (입력 크기 비교 생략)")
+    parser.add_argument("-o", "--output", help="결과 JSON 파일")
+    args = parser.parse_args(argv)
+    if args.expected and len(args.expected) != len(args.videos):
+        parser.error("--expected는 영상 수만큼 주어야 합니다.")
+
+    os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+    from roi_tracker import PoseRoiTracker
+    module_name, angle_key = EXERCISES[args.exercise]
+    trainer = importlib.import_module(module_name)
+    trainer.SET_GOAL = float('inf')
+
+    input_sizes = [None] if args.no_roi else args.input_size
+    configs = [(complexity, size) for complexity in args.complexity for size in input_sizes]
+    rows = []
+    for video_index, video_path in enumerate(args.videos):
+        video_rows = []
+        for complexity, size in configs:
+            pose = shared_pose.create_pose(complexity)  # 설정마다 새 모델 (트레이너가 쓰는 공유 모델과 별개)
+            pose_model = pose if size is None else PoseRoiTracker(pose, input_size=size)
+            try:
+                frames, inference = infer_video(video_path, pose_model, trainer)
+            except RuntimeError as e:
+                print(e, file=sys.stderr)
+                return 2
+            finally:
+                pose.close()
+            for filtered in (False, True):
+                reps, bad, jitter, filter_time = count_reps(frames, trainer, angle_key, OneEuroLandmarkFilter(enabled=filtered))
+                video_rows.append({
+                    "video": video_path, "complexity": complexity, "input_size": size, "filter": filtered,
+                    "reps": reps, "bad_reps": bad, "angle_jitter": jitter, **inference,
+                    "filter_ms_per_frame": filter_time["mean_ms"] if filtered else 0.0,
+                })
+
+        # 정답이 없으면 가장 무거운 설정(필터 없음)을 기준으로
+        if args.expected:
+            reference = args.expected[video_index]
+        else:
+            reference = max((r for r in video_rows if not r["filter"]), key=lambda r: (r["complexity"], r["input_size"] or 0))["reps"]
+        for row in video_rows:
+            row["reference_reps"] = reference
+            row["count_error"] = row["reps"] - reference
+        rows += video_rows
+
+    print(f"{'영상':<24}{'모델':>5}{'입력':>6}{'필터':>5}{'횟수':>6}{'오차':>6}{'떨림(°)':>9}{'CPU ms/프레임':>14}{'추론 p95 ms':>12}")
+    for row in rows:
+        print(f"{os.path.basename(row['video'])[:23]:<24}{row['complexity']:>5}{str(row['input_size'] or '-'):>6}{'on' if row['filter'] else 'off':>5}"
+              f"{row['reps']:>6}{row['count_error']:>+6}{str(row['angle_jitter']):>9}{row['cpu_ms_per_frame'] + row['filter_ms_per_frame']:>14.2f}{row['latency']['p95_ms']:>12.1f}")
+
+    # 설정별로 모든 영상을 합친 요약 (정확히 센 영상 수와 평균 CPU 시간)
+    summary = {}
+    for row in rows:
+        key = f"complexity={row['complexity']} input={row['input_size'] or 'full'} filter={'on' if row['filter'] else 'off'}"
+        total = summary.setdefault(key, {"videos": 0, "exact": 0, "abs_error": 0, "cpu_ms_per_frame": 0.0})
+        total["videos"] += 1
+        total["exact"] += row["count_error"] == 0
+        total["abs_error"] += abs(row["count_error"])
+        total["cpu_ms_per_frame"] += (row["cpu_ms_per_frame"] + row["filter_ms_per_frame"]) / len(args.videos)
+    print()
+    for key, total in summary.items():
+        total["cpu_ms_per_frame"] = round(total["cpu_ms_per_frame"], 2)
+        print(f"{key:<40} 정확 {total['exact']}/{total['videos']}, 오차 합 {total['abs_error']}, CPU {total['cpu_ms_per_frame']:.2f} ms/프레임")
+
+    if args.output:
+        if os.path.dirname(args.output): os.makedirs(os.path.dirname(args.output), exist_ok=True)
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump({"exercise": args.exercise, "rows": rows, "summary": summary}, f, ensure_ascii=False, indent=2)
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,153 @@
+# landmark_recording.py
+# 세션의 프레임별 포즈 결과(시각, (33, 4) 랜드마크)를 작은 이진 파일에 이어 쓰고, numpy.memmap으로 다시 읽습니다.
+# 재생(landmark_replay.py)은 포즈 추론 없이 기록된 랜드마크를 트레이너의 반복 판정에 다시 넣어 세션을 재채점/디버깅합니다.
+#
+# 파일 구조: 64바이트 헤더 + 고정 크기 프레임 레코드의 연속 (FRAME_DTYPE, 89바이트)
+#   t          float32     기록 시작부터의 시각(초)
+#   flags      uint8       FLAG_DETECTED: 사람을 찾은 프레임 (아니면 랜드마크는 0)
+#   xyz        int16[12,3] RECORDED_LANDMARKS의 정규화 좌표 × XYZ_SCALE (±4 범위, 해상도 약 0.0001)
+#   visibility uint8[12]   visibility × 255
+# 반복 판정에 쓰는 팔다리/몸통 관절 12개(양쪽 어깨, 팔꿈치, 손목, 엉덩이, 무릎, 발목)만 기록합니다.
+# 얼굴/손/발끝 랜드마크는 판정에 쓰지 않으므로 재생할 때 0(보이지 않음)으로 채우며, 필터는 랜드마크마다 따로 동작하므로 재생 결과는 같습니다.
+# 레코드 크기가 고정이라 파일 전체를 np.memmap(..., dtype=FRAME_DTYPE, offset=HEADER_SIZE)로 바로 열 수 있습니다.
+# 기록기는 CHUNK_FRAMES개씩 모아서 한 번에 덧붙이므로, 프로그램이 비정상 종료돼도 그 전까지의 청크는 온전히 남습니다.
+# 30fps로 추론한 세션은 분당 약 0.16MB(15분 약 2.4MB, 한 시간 약 9.6MB)입니다. (추론 간격이 늘면 그만큼 줄어듦)
+# 버전 1 파일(33개 랜드마크 전체, 236바이트 레코드)도 그대로 읽습니다.
+import os
+import threading
+import time
+import numpy as np
+import pose_math
+from pose_math import NUM_LANDMARKS
+
+MAGIC = b"AIHTLMK1"
+VERSION = 2
+HEADER_SIZE = 64
+XYZ_SCALE = 8192.0
+VISIBILITY_SCALE = 255.0
+FLAG_DETECTED = 1
+CHUNK_FRAMES = 256
+RECORDING_DIR = 'recordings'
+FILE_EXTENSION = '.lmk'
+
+HEADER_DTYPE = np.dtype([
+    ("magic", "S8"), ("version", "<u2"), ("header_size", "<u2"), ("xyz_scale", "<f4"),
+    ("created", "<f8"), ("exercise", "S16"), ("reserved", "V24"),
+])
+# 기록하는 랜드마크: 양쪽 어깨 11/12, 팔꿈치 13/14, 손목 15/16, 엉덩이 23/24, 무릎 25/26, 발목 27/28
+RECORDED_LANDMARKS = (11, 12, 13, 14, 15, 16, 23, 24, 25, 26, 27, 28)
+
+def _frame_dtype(count):
+    return np.dtype([("t", "<f4"), ("flags", "u1"), ("xyz", "<i2", (count, 3)), ("visibility", "u1", (count,))])
+
+FRAME_DTYPE = _frame_dtype(len(RECORDED_LANDMARKS))
+# 버전별 (레코드 형식, 기록된 랜드마크 인덱스)
+FORMATS = {1: (_frame_dtype(NUM_LANDMARKS), tuple(range(NUM_LANDMARKS))), VERSION: (FRAME_DTYPE, RECORDED_LANDMARKS)}
+assert HEADER_DTYPE.itemsize == HEADER_SIZE
+assert set(np.ravel(list(pose_math.JOINT_ANGLES.values()))) <= set(RECORDED_LANDMARKS)  # 각도 계산에 쓰는 관절은 모두 기록
+
+class LandmarkRecorder:
+    """
+    append(timestamp, landmarks)로 추론한 프레임마다 기록합니다. landmarks가 None이면 사람을 찾지 못한 프레임으로 남깁니다.
+    양자화는 미리 만들어 둔 버퍼 안에서 하므로 프레임마다 배열을 새로 만들지 않습니다. 세션이 끝나면 close()를 불러야 합니다.
+    append()는 추론 스레드에서, close()는 세션을 정리하는 스레드에서 부를 수 있으므로 둘은 같은 잠금 안에서 실행되며,
+    닫힌 뒤에 도착한 append()는 아무것도 쓰지 않습니다.
+    """
+    def __init__(self, path, exercise=""):
+        if os.path.dirname(path): os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.path = path
+        self.file = open(path, 'wb')
+        header = np.zeros(1, dtype=HEADER_DTYPE)
+        header[0] = (MAGIC, VERSION, HEADER_SIZE, XYZ_SCALE, time.time(), exercise.encode(), b"")
+        self.file.write(header.tobytes())
+        self.buffer = np.zeros(CHUNK_FRAMES, dtype=FRAME_DTYPE)
+        self.pending = 0
+        self.frames = 0
+        self.start_time = None
+        self._lock = threading.Lock()
+        self._indices = np.asarray(RECORDED_LANDMARKS)
+        self._scaled = np.zeros((len(RECORDED_LANDMARKS), 3), dtype=np.float32)
+        self._visibility = np.zeros(len(RECORDED_LANDMARKS), dtype=np.float32)
+
+    @classmethod
+    def for_session(cls, exercise, directory=RECORDING_DIR):
+        """recordings/<운동>_<시각>.lmk 파일에 기록하는 기록기를 만듭니다."""
+        path = os.path.join(directory, f"{exercise}_{time.strftime('%Y%m%d_%H%M%S')}{FILE_EXTENSION}")
+        return cls(path, exercise)
+
+    def append(self, timestamp, landmarks):
+        with self._lock:
+            if self.file.closed: return  # 세션이 끝난 뒤 늦게 도착한 추론 결과
+            self._append(timestamp, landmarks)
+
+    def _append(self, timestamp, landmarks):
+        if self.start_time is None: self.start_time = timestamp
+        record = self.buffer[self.pending]
+        record["t"] = timestamp - self.start_time
+        if landmarks is None:
+            record["flags"] = 0
+            record["xyz"] = 0
+            record["visibility"] = 0
+        else:
+            record["flags"] = FLAG_DETECTED
+            landmarks = landmarks[self._indices]
+            np.multiply(landmarks[:, :3], XYZ_SCALE, out=self._scaled)
+            np.rint(self._scaled, out=self._scaled)
+            np.clip(self._scaled, -32767, 32767, out=self._scaled)
+            record["xyz"] = self._scaled
+            np.multiply(landmarks[:, 3], VISIBILITY_SCALE, out=self._visibility)
+            np.rint(self._visibility, out=self._visibility)
+            np.clip(self._visibility, 0, 255, out=self._visibility)
+            record["visibility"] = self._visibility
+        self.pending += 1
+        self.frames += 1
+        if self.pending == CHUNK_FRAMES: self._flush()
+
+    def flush(self):
+        """모아 둔 프레임을 파일 끝에 한 번에 덧붙입니다."""
+        with self._lock:
+            if not self.file.closed: self._flush()
+
+    def _flush(self):
+        if not self.pending: return
+        self.file.write(self.buffer[:self.pending].data)
+        self.file.flush()
+        self.pending = 0
+
+    def close(self):
+        with self._lock:
+            if self.file.closed: return
+            self._flush()
+            self.file.close()
+        print(f"랜드마크 기록 저장: {self.path} ({self.frames} 프레임, {os.path.getsize(self.path) / 1e6:.1f}MB)")
+
+def open_recording(path):
+    """
+    기록 파일을 열어 (헤더 딕셔너리, 레코드 memmap)을 반환합니다. 헤더 딕셔너리의 "landmarks"는 기록된 랜드마크 인덱스입니다.
+    마지막 레코드가 잘려 있으면(기록 중 비정상 종료) 온전한 레코드까지만 읽습니다.
+    """
+    header = np.fromfile(path, dtype=HEADER_DTYPE, count=1)
+    if len(header) != 1 or header[0]["magic"] != MAGIC:
+        raise ValueError(f"랜드마크 기록 파일이 아닙니다: {path}")
+    header = header[0]
+    if int(header["version"]) not in FORMATS:
+        raise ValueError(f"지원하지 않는 기록 파일 버전입니다: {header['version']}")
+    frame_dtype, indices = FORMATS[int(header["version"])]
+    header_size = int(header["header_size"])
+    count = (os.path.getsize(path) - header_size) // frame_dtype.itemsize
+    info = {"exercise": header["exercise"].decode(), "created": float(header["created"]), "xyz_scale": float(header["xyz_scale"]),
+            "frames": count, "landmarks": indices}
+    if count == 0: return info, np.zeros(0, dtype=frame_dtype)
+    return info, np.memmap(path, dtype=frame_dtype, mode='r', offset=header_size, shape=(count,))
+
+def decode(records, xyz_scale=XYZ_SCALE, indices=RECORDED_LANDMARKS):
+    """
+    레코드 묶음을 (시각 float64 (N,), 랜드마크 float32 (N, 33, 4), 사람 검출 여부 bool (N,))로 되돌립니다.
+    indices는 기록된 랜드마크(open_recording이 돌려준 info["landmarks"])이며, 기록되지 않은 랜드마크는 0(보이지 않음)입니다.
+    memmap을 청크 단위로 잘라 넘기면 파일 전체를 메모리에 올리지 않고 읽을 수 있습니다.
+    """
+    landmarks = np.zeros((len(records), NUM_LANDMARKS, 4), dtype=np.float32)
+    indices = list(indices)
+    landmarks[:, indices, :3] = records["xyz"] / np.float32(xyz_scale)
+    landmarks[:, indices, 3] = records["visibility"] / np.float32(VISIBILITY_SCALE)
+    return records["t"].astype(np.float64), landmarks, (records["flags"] & FLAG_DETECTED) != 0
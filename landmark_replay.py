@@ -0,0 +1,91 @@
+# landmark_replay.py
+# landmark_recording으로 기록한 세션을 포즈 추론 없이 트레이너의 필터 → 각도 → 반복 판정/피드백에 다시 넣어
+# 반복/세트 결과를 batch_analyzer와 같은 JSON Lines 형식으로 출력합니다.
+# 판정 로직이나 필터 설정을 바꾼 뒤 같은 세션을 초당 수천 프레임으로 다시 채점해 결과를 비교하는 용도입니다.
+#
+# 사용 예:
+#   AIHT_RECORD_LANDMARKS=1 python squat_ai_trainer.py        (recordings/squat_<시각>.lmk 기록)
+#   python landmark_replay.py recordings/squat_20261018_101500.lmk --reps 10 -o replay.jsonl
+#   python landmark_replay.py recordings/*.lmk --no-filter
+import argparse
+import importlib
+import json
+import os
+import sys
+import time
+from batch_analyzer import OfflineSession
+from landmark_recording import decode, open_recording
+from exercises import TRAINER_MODULES
+
+REPLAY_CHUNK = 4096  # memmap에서 한 번에 풀어 쓰는 프레임 수
+
+def replay(path, trainer):
+    """기록 파일 하나를 재생하고 기록 리스트(반복/세트/요약)를 반환합니다. 시각은 기록 시작부터의 초입니다."""
+    info, records = open_recording(path)
+    trainer.landmark_filter.reset()
+    session = OfflineSession(trainer, path)
+    replayed, finished = 0, False
+    started = time.perf_counter()
+    for start in range(0, len(records), REPLAY_CHUNK):
+        times, landmarks, detected = decode(records[start:start + REPLAY_CHUNK], info["xyz_scale"], info["landmarks"])
+        for index, timestamp in enumerate(times.tolist()):
+            if session.resting(timestamp): continue
+            frame = None
+            if detected[index]:
+                frame = landmarks[index]
+                trainer.landmark_filter.apply(frame, timestamp)
+            else:
+                trainer.landmark_filter.reset()
+            replayed += 1
+            if session.step(trainer.build_landmarks_data(None, frame, timestamp), timestamp):
+                finished = True
+                break
+        if finished: break
+    elapsed = max(time.perf_counter() - started, 1e-6)
+    session.records.append({
+        **session.summary(), "frames": info["frames"], "replayed_frames": replayed,
+        "recorded_seconds": round(float(records[-1]["t"]), 3) if len(records) else 0.0,
+        "processing_seconds": round(elapsed, 3), "fps": round(replayed / elapsed, 1),
+    })
+    return session.records
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="기록된 랜드마크로 포즈 추론 없이 반복 판정을 다시 실행합니다.")
+    parser.add_argument("recordings", nargs="+", help="랜드마크 기록 파일 (.lmk)")
+    parser.add_argument("--exercise", choices=sorted(TRAINER_MODULES), help="운동 종류 (기본값: 기록 파일에 저장된 값)")
+    parser.add_argument("--reps", type=int, help="세트당 목표 횟수 (기본값: 트레이너 기본값)")
+    parser.add_argument("--sets", type=int, help="목표 세트 수 (기본값: 트레이너 기본값)")
+    parser.add_argument("--rest", type=int, help="세트 사이 휴식 시간(초), 기록 시각 기준")
+    parser.add_argument("--no-filter", action="store_true", help="랜드마크 필터 없이 재생")
+    parser.add_argument("-o", "--output", help="결과 JSON Lines 파일 (기본값: 표준 출력)")
+    args = parser.parse_args(argv)
+
+    os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+    out = open(args.output, 'w', encoding='utf-8') if args.output else sys.stdout
+    failed = False
+    try:
+        for path in args.recordings:
+            try:
+                exercise = args.exercise or open_recording(path)[0]["exercise"]
+                if exercise not in TRAINER_MODULES: raise ValueError(f"운동 종류를 알 수 없습니다: '{exercise}' (--exercise로 지정)")
+            except (OSError, ValueError) as e:
+                out.write(json.dumps({"type": "error", "video": path, "message": str(e)}, ensure_ascii=False) + "\n")
+                failed = True
+                continue
+            trainer = importlib.import_module(TRAINER_MODULES[exercise])
+            if args.reps is not None: trainer.SET_GOAL = args.reps
+            if args.sets is not None: trainer.TOTAL_SETS_GOAL = args.sets
+            if args.rest is not None: trainer.REST_DURATION = args.rest
+            trainer.landmark_filter.enabled = not args.no_filter
+            records = replay(path, trainer)
+            for record in records:
+                out.write(json.dumps(record, ensure_ascii=False) + "\n")
+            out.flush()
+            summary = records[-1]
+            print(f"{path}: {summary['replayed_frames']} 프레임, {summary['processing_seconds']:.2f}초, {summary['fps']:.0f} fps", file=sys.stderr)
+    finally:
+        if out is not sys.stdout: out.close()
+    return 1 if failed else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,26 +1,37 @@
 # main_menu.py
+import time
+STARTUP_T0 = time.perf_counter()  # 첫 화면까지의 시간 측정 기준
 import sys
 import subprocess
 import os
 import random
-import json
-import cv2  # <<< 웹캠 확인을 위해 추가
 
-from datetime import datetime
-from style_sheet import DARK_STYLESHEET, CARD_STYLESHEET
-from database_manager import init_db, get_records_by_exercise
+# cv2 / mediapipe / QtMultimedia를 쓰는 모듈과 기록 화면은 첫 화면이 그려진 뒤나 처음 쓸 때 import한다
+# (import 시간과 첫 화면 표시 시간은 startup_benchmark.py로 측정)
+from style_sheet import DARK_STYLESHEET
 from PyQt6.QtWidgets import (
     QApplication, QMainWindow, QWidget, QVBoxLayout,
     QPushButton, QLabel, QMessageBox, QFrame, QHBoxLayout, QStackedWidget,
-    QGroupBox, QRadioButton, QCheckBox, QSlider, QLineEdit,
-    QScrollArea
+    QGroupBox, QRadioButton, QCheckBox, QSlider, QLineEdit
 )
-from PyQt6.QtGui import QFont, QIntValidator
-from PyQt6.QtCore import Qt, QUrl, QTimer
-from PyQt6.QtMultimedia import QMediaPlayer, QAudioOutput
-
-# --- 메인 메뉴 위젯 (변경 없음) ---
+from PyQt6.QtGui import QFont, QIntValidator, QImage, QPixmap
+from PyQt6.QtCore import Qt, QUrl, QTimer, pyqtSignal
+
+# 운동 세션 실행 방식 (AIHT_SESSION_MODE)
+#   inprocess  : 메뉴 프로세스 안에서 예열된 트레이너로 실행 (기본값)
+#   worker     : 메뉴와 함께 뜨는 상주 워커 프로세스에서 실행 (OpenCV 창과 Qt가 충돌하는 환경용)
+#   subprocess : 기존처럼 운동마다 트레이너 스크립트를 새 프로세스로 실행
+SESSION_MODE = os.getenv("AIHT_SESSION_MODE", "inprocess")
+# 워커 모드에서 로딩 화면에 보여주는 카메라 미리보기
+PREVIEW_INTERVAL_MS = 100
+PREVIEW_WIDTH = 400
+# AIHT_STARTUP_BENCHMARK=1 이면 첫 화면이 그려진 시각을 출력하고 바로 종료 (startup_benchmark.py에서 사용)
+STARTUP_BENCHMARK = os.getenv("AIHT_STARTUP_BENCHMARK") == "1"
+
+# --- 메인 메뉴 위젯 ---
 class MainMenuWidget(QWidget):
+    painted = pyqtSignal()  # 첫 화면이 그려진 뒤의 초기화를 시작하는 데 사용
+
     def __init__(self, parent=None):
         super().__init__(parent)
         main_layout=QVBoxLayout(self)
@@ -41,6 +52,10 @@ class MainMenuWidget(QWidget):
         main_layout.addWidget(menu_container,alignment=Qt.AlignmentFlag.AlignCenter);main_layout.addStretch(2)
         footer_label=QLabel("제작자: ghpark00  |  이메일: fkzpt345@gmail.com");footer_label.setObjectName("FooterLabel");footer_label.setAlignment(Qt.AlignmentFlag.AlignCenter);main_layout.addWidget(footer_label)
 
+    def paintEvent(self, event):
+        super().paintEvent(event)
+        self.painted.emit()
+
 # --- 운동 기록 선택 위젯 (변경 없음) ---
 class ExerciseSelectionWidget(QWidget):
     def __init__(self, parent=None):
@@ -74,90 +89,6 @@ class ExerciseSelectionWidget(QWidget):
         container_layout.addWidget(self.back_button)
         layout.addWidget(container)
 
-# --- 개별 기록 카드 위젯 (변경 없음) ---
-class RecordCardWidget(QWidget):
-    def __init__(self, record_data, parent=None):
-        super().__init__(parent)
-        self.setObjectName("RecordCard")
-        timestamp, _, reps, sets, rest, details_json = record_data
-        
-        layout = QVBoxLayout(self)
-        
-        dt_object = datetime.strptime(timestamp, "%Y-%m-%d %H:%M:%S")
-        date_label = QLabel(dt_object.strftime("%Y년 %m월 %d일 %H:%M"))
-        date_label.setObjectName("RecordDate")
-        layout.addWidget(date_label)
-
-        try:
-            details_list = json.loads(details_json)
-            total_good = sum(item['good'] for item in details_list)
-            details_str = ", ".join([f"S{i+1}: G{item['good']}/B{item['bad']}" for i, item in enumerate(details_list)])
-        except (json.JSONDecodeError, TypeError):
-            total_good = "N/A"
-            details_str = "데이터 오류"
-
-        stats_text = f"""
-        🏋️‍♂️ &nbsp;<b>설정:</b> {reps}회 / {sets}세트 / {rest}초 휴식<br>
-        ✅ &nbsp;<b>총 성공:</b> {total_good}회<br>
-        📊 &nbsp;<b>세트별:</b> {details_str}
-        """
-        stats_label = QLabel(stats_text)
-        stats_label.setObjectName("RecordStats")
-        stats_label.setWordWrap(True)
-        layout.addWidget(stats_label)
-
-# --- 내 기록 표시 위젯 (변경 없음) ---
-class RecordsWidget(QWidget):
-    def __init__(self, parent=None):
-        super().__init__(parent)
-        self.setObjectName("RecordsScreen")
-        self.setStyleSheet(CARD_STYLESHEET)
-        
-        main_layout = QVBoxLayout(self)
-        main_layout.setAlignment(Qt.AlignmentFlag.AlignCenter)
-        
-        container = QWidget()
-        container.setObjectName("MenuContainer")
-        container.setFixedWidth(500)
-        container_layout = QVBoxLayout(container)
-
-        self.title_label = QLabel("운동 기록")
-        self.title_label.setObjectName("TitleLabel")
-        self.title_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
-        container_layout.addWidget(self.title_label)
-
-        scroll_area = QScrollArea()
-        scroll_area.setWidgetResizable(True)
-        scroll_area.setHorizontalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAlwaysOff)
-        
-        self.record_list_widget = QWidget()
-        self.record_list_widget.setObjectName("RecordListWidget")
-        self.record_list_layout = QVBoxLayout(self.record_list_widget)
-        self.record_list_layout.setAlignment(Qt.AlignmentFlag.AlignTop)
-        
-        scroll_area.setWidget(self.record_list_widget)
-        container_layout.addWidget(scroll_area)
-
-        self.back_button = QPushButton("뒤로가기")
-        container_layout.addWidget(self.back_button)
-        main_layout.addWidget(container)
-
-    def load_records(self, exercise_type):
-        self.title_label.setText(f"'{exercise_type}' 운동 기록")
-        for i in reversed(range(self.record_list_layout.count())): 
-            self.record_list_layout.itemAt(i).widget().setParent(None)
-
-        records = get_records_by_exercise(exercise_type)
-        if not records:
-            no_record_label = QLabel("아직 저장된 기록이 없습니다.")
-            no_record_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
-            self.record_list_layout.addWidget(no_record_label)
-            return
-            
-        for record in records:
-            card = RecordCardWidget(record)
-            self.record_list_layout.addWidget(card)
-
 # --- 운동 설정 위젯 (변경 없음) ---
 class SquatSettingsWidget(QWidget):
     def __init__(self, parent=None):
@@ -243,22 +174,15 @@ class LoadingWidget(QWidget):
         super().__init__(parent);self.setObjectName("LoadingScreen");layout=QVBoxLayout(self);layout.setAlignment(Qt.AlignmentFlag.AlignCenter);layout.setSpacing(20)
         self.animation_label=QLabel();self.animation_label.setAlignment(Qt.AlignmentFlag.AlignCenter);self.animation_label.setObjectName("TitleLabel");self.animation_label.setStyleSheet("font-size: 40px;");layout.addWidget(self.animation_label)
         self.loading_text=QLabel("프로그램 실행중...");self.loading_text.setObjectName("SubtitleLabel");self.loading_text.setAlignment(Qt.AlignmentFlag.AlignCenter);layout.addWidget(self.loading_text)
+        self.preview_label=QLabel();self.preview_label.setAlignment(Qt.AlignmentFlag.AlignCenter);self.preview_label.hide();layout.addWidget(self.preview_label)
         self.timer=QTimer(self);self.timer.timeout.connect(self.update_animation);self.animation_chars=["◐","◓","◑","◒"];self.animation_index=0
     def set_loading_text(self, text): self.loading_text.setText(text)
+    def set_preview(self, pixmap): self.preview_label.setPixmap(pixmap);self.preview_label.show()
+    def clear_preview(self): self.preview_label.clear();self.preview_label.hide()
     def start_animation(self):self.animation_index=0;self.timer.start(150)
     def stop_animation(self):self.timer.stop()
     def update_animation(self):self.animation_label.setText(self.animation_chars[self.animation_index]);self.animation_index=(self.animation_index + 1) % len(self.animation_chars)
 
-# --- [새로운 함수] 웹캠 가용성 체크 ---
-def is_camera_available():
-    """시스템의 기본 웹캠이 사용 가능한지 확인합니다."""
-    cap = cv2.VideoCapture(0)
-    if not cap.isOpened():
-        return False
-    # 사용 가능하면 자원을 즉시 해제하여 다른 프로세스가 사용할 수 있도록 함
-    cap.release()
-    return True
-
 # --- 메인 윈도우 ---
 class MainWindow(QMainWindow):
     def __init__(self):
@@ -266,34 +190,36 @@ class MainWindow(QMainWindow):
         self.setWindowTitle("AI 홈 트레이너")
         self.setFixedSize(550, 750)
         self.setObjectName("MainWindow")
-        
-        init_db()
 
         self.stacked_widget = QStackedWidget()
         self.setCentralWidget(self.stacked_widget)
 
-        # 위젯 인스턴스 생성
+        # 첫 화면과 운동 시작에 필요한 위젯만 바로 만들고, 기록/환경설정 화면은 처음 열 때 만든다
         self.main_menu = MainMenuWidget()
         self.squat_settings = SquatSettingsWidget()
         self.pushup_settings = PushupSettingsWidget()
-        self.settings_menu = SettingsWidget()
         self.loading_screen = LoadingWidget()
-        self.exercise_selection_menu = ExerciseSelectionWidget()
-        self.records_menu = RecordsWidget()
+        self.settings_menu, self.exercise_selection_menu, self.records_menu = None, None, None
         
         # 스택 위젯에 추가
         self.stacked_widget.addWidget(self.main_menu)
         self.stacked_widget.addWidget(self.squat_settings)
         self.stacked_widget.addWidget(self.pushup_settings)
-        self.stacked_widget.addWidget(self.settings_menu)
         self.stacked_widget.addWidget(self.loading_screen)
-        self.stacked_widget.addWidget(self.exercise_selection_menu)
-        self.stacked_widget.addWidget(self.records_menu)
-        
-        self.player = QMediaPlayer();self.audio_output = QAudioOutput();self.player.setAudioOutput(self.audio_output);self.audio_output.setVolume(0.5)
+
+        # 배경음악 플레이어(QtMultimedia)는 첫 화면이 그려진 뒤에 만든다
+        self.player, self.audio_output = None, None
+        self.music_enabled, self.music_volume = True, 50
         self.playlist, self.current_track_index = [], 0
-        self.setup_playlist()
+
+        self.session, self.session_window = None, None
+        self.camera_service, self.trainer_warmup, self.trainer_worker = None, None, None
+        self.media_devices, self.preview_reader = None, None
+        self.session_services_started = False
+        self.first_paint_done = False
+
         self.connect_signals()
+        self.main_menu.painted.connect(self.on_first_paint)
 
     def connect_signals(self):
         # 메인 메뉴
@@ -315,29 +241,105 @@ class MainWindow(QMainWindow):
         self.pushup_settings.back_button.clicked.connect(self.show_main_menu_screen)
         self.pushup_settings.start_button.clicked.connect(self.start_pushup_program)
 
-        # 운동 기록 선택
-        self.exercise_selection_menu.back_button.clicked.connect(self.show_main_menu_screen)
-        self.exercise_selection_menu.squat_button.clicked.connect(lambda: self.show_records_screen('스쿼트'))
-        self.exercise_selection_menu.pushup_button.clicked.connect(lambda: self.show_records_screen('푸쉬업'))
+    # --- 첫 화면 이후 초기화 ---
+    def on_first_paint(self):
+        if self.first_paint_done: return
+        self.first_paint_done = True
+        self.main_menu.painted.disconnect(self.on_first_paint)
+        elapsed_ms = (time.perf_counter() - STARTUP_T0) * 1000
+        if STARTUP_BENCHMARK:
+            # startup_benchmark.py가 이 줄을 읽어 첫 화면까지의 시간을 기록한다
+            print(f"FIRST_PAINT_MS {elapsed_ms:.1f}", flush=True)
+            QTimer.singleShot(0, QApplication.instance().quit)
+            return
+        print(f"첫 화면 표시: {elapsed_ms:.0f}ms")
+        # 한 단계씩 이벤트 루프에 넘겨서 사이사이 입력이 처리되도록 한다
+        for step in (self.init_database, self.setup_music, self.start_session_services):
+            QTimer.singleShot(0, step)
 
-        # 기록 화면
-        self.records_menu.back_button.clicked.connect(self.show_exercise_selection_screen)
+    def init_database(self):
+        from database_manager import init_db
+        init_db()
 
-        # 환경설정 및 음악 플레이어
-        self.settings_menu.back_button.clicked.connect(self.show_main_menu_screen)
-        self.settings_menu.music_checkbox.stateChanged.connect(self.toggle_music)
-        self.settings_menu.volume_slider.valueChanged.connect(self.set_volume)
-        self.player.mediaStatusChanged.connect(self.play_next_song)
+    def start_session_services(self):
+        """카메라 조사와 트레이너 예열(또는 상주 워커)을 시작합니다. 운동 시작을 먼저 누르면 그때 바로 시작합니다."""
+        if self.session_services_started: return
+        self.session_services_started = True
+        from camera_service import CameraService
+        from session_runner import TrainerWarmup, TrainerWorkerClient
+        try:
+            from PyQt6.QtMultimedia import QMediaDevices
+            self.media_devices = QMediaDevices(self)
+        except ImportError as e:
+            print(f"카메라 연결/해제 알림을 사용할 수 없습니다: {e}")
+
+        # 카메라 장치 조사는 백그라운드에서 한 번만 하고 결과를 캐시한다 (워커 모드에서는 워커 프로세스가 카메라를 맡음)
+        if SESSION_MODE != 'worker':
+            self.camera_service = CameraService(park=SESSION_MODE == 'inprocess')
+            if self.media_devices: self.media_devices.videoInputsChanged.connect(self.camera_service.notify_hotplug)
+            self.camera_service.start()
+        if SESSION_MODE == 'inprocess':
+            # 트레이너 모듈과 포즈 모델을 백그라운드에서 불러온다
+            self.trainer_warmup = TrainerWarmup(self)
+            self.trainer_warmup.ready.connect(lambda seconds: print(f"트레이너 예열 완료: {seconds:.1f}초"))
+            self.trainer_warmup.failed.connect(print)
+            self.trainer_warmup.start()
+        elif SESSION_MODE == 'worker':
+            self.trainer_worker = TrainerWorkerClient(self)
+            self.trainer_worker.ready.connect(lambda seconds: print(f"트레이너 워커 준비 완료: {seconds:.1f}초"))
+            self.trainer_worker.first_frame.connect(lambda seconds: print(f"운동 시작 → 첫 화면: {seconds:.2f}초"))
+            self.trainer_worker.progress.connect(self.on_worker_progress)
+            self.trainer_worker.session_finished.connect(lambda result: self.return_to_main_menu())
+            self.trainer_worker.session_failed.connect(self.on_worker_session_failed)
+            if self.media_devices: self.media_devices.videoInputsChanged.connect(self.trainer_worker.notify_hotplug)
+            self.trainer_worker.frame_bus_ready.connect(self.open_preview)
+            self.preview_timer = QTimer(self)
+            self.preview_timer.timeout.connect(self.update_preview)
+            self.trainer_worker.start()
+
+    # --- 나중에 만드는 화면 ---
+    def get_settings_menu(self):
+        if self.settings_menu is None:
+            self.settings_menu = SettingsWidget()
+            self.settings_menu.music_checkbox.setChecked(self.music_enabled)
+            self.settings_menu.volume_slider.setValue(self.music_volume)
+            self.settings_menu.volume_label.setText(f"{self.music_volume}%")
+            self.stacked_widget.addWidget(self.settings_menu)
+            # 환경설정 및 음악 플레이어
+            self.settings_menu.back_button.clicked.connect(self.show_main_menu_screen)
+            self.settings_menu.music_checkbox.stateChanged.connect(self.toggle_music)
+            self.settings_menu.volume_slider.valueChanged.connect(self.set_volume)
+        return self.settings_menu
+
+    def get_exercise_selection_menu(self):
+        if self.exercise_selection_menu is None:
+            self.exercise_selection_menu = ExerciseSelectionWidget()
+            self.stacked_widget.addWidget(self.exercise_selection_menu)
+            # 운동 기록 선택
+            self.exercise_selection_menu.back_button.clicked.connect(self.show_main_menu_screen)
+            self.exercise_selection_menu.squat_button.clicked.connect(lambda: self.show_records_screen('스쿼트'))
+            self.exercise_selection_menu.pushup_button.clicked.connect(lambda: self.show_records_screen('푸쉬업'))
+        return self.exercise_selection_menu
+
+    def get_records_menu(self):
+        if self.records_menu is None:
+            from records_view import RecordsWidget
+            self.records_menu = RecordsWidget()
+            self.stacked_widget.addWidget(self.records_menu)
+            # 기록 화면
+            self.records_menu.back_button.clicked.connect(self.show_exercise_selection_screen)
+        return self.records_menu
     
-    # --- 화면 전환 메소드 (변경 없음) ---
+    # --- 화면 전환 메소드 ---
     def show_main_menu_screen(self): self.stacked_widget.setCurrentWidget(self.main_menu)
     def show_squat_settings_screen(self): self.stacked_widget.setCurrentWidget(self.squat_settings)
     def show_pushup_settings_screen(self): self.stacked_widget.setCurrentWidget(self.pushup_settings)
-    def show_settings_screen(self): self.stacked_widget.setCurrentWidget(self.settings_menu)
-    def show_exercise_selection_screen(self): self.stacked_widget.setCurrentWidget(self.exercise_selection_menu)
+    def show_settings_screen(self): self.stacked_widget.setCurrentWidget(self.get_settings_menu())
+    def show_exercise_selection_screen(self): self.stacked_widget.setCurrentWidget(self.get_exercise_selection_menu())
     def show_records_screen(self, exercise_type):
-        self.records_menu.load_records(exercise_type)
-        self.stacked_widget.setCurrentWidget(self.records_menu)
+        records_menu = self.get_records_menu()
+        records_menu.load_records(exercise_type)
+        self.stacked_widget.setCurrentWidget(records_menu)
 
     # --- [수정] 챗봇 프로그램을 별도 프로세스로 실행하는 함수 ---
     def start_chatbot_program(self):
@@ -358,7 +360,18 @@ class MainWindow(QMainWindow):
         except Exception as e:
             self.show_error_message(f"챗봇을 시작하는 중 오류 발생: {e}")
 
-    # --- 기능 메소드 (음악 관련 변경 없음) ---
+    # --- 기능 메소드 (음악) ---
+    def setup_music(self):
+        """배경음악 플레이어를 만듭니다. QtMultimedia를 불러올 수 없는 환경이면 음악 없이 계속합니다."""
+        try:
+            from PyQt6.QtMultimedia import QMediaPlayer, QAudioOutput
+        except ImportError as e:
+            print(f"배경음악을 사용할 수 없습니다: {e}")
+            return
+        self.player = QMediaPlayer();self.audio_output = QAudioOutput();self.player.setAudioOutput(self.audio_output);self.audio_output.setVolume(self.music_volume / 100.0)
+        self.player.mediaStatusChanged.connect(self.play_next_song)
+        self.setup_playlist()
+
     def setup_playlist(self):
         sound_dir = 'background_music'
         if not os.path.isdir(sound_dir): return
@@ -368,26 +381,31 @@ class MainWindow(QMainWindow):
             if not music_files: return
             self.playlist = [QUrl.fromLocalFile(os.path.join(sound_dir, f)) for f in music_files]
             random.shuffle(self.playlist); self.player.setSource(self.playlist[0])
-            if self.settings_menu.music_checkbox.isChecked(): self.player.play()
+            if self.music_enabled: self.player.play()
         except Exception as e: print(f"배경음악 재생 목록 설정 실패: {e}")
 
     def play_next_song(self, status):
+        from PyQt6.QtMultimedia import QMediaPlayer
         if status == QMediaPlayer.MediaStatus.EndOfMedia and self.playlist:
             self.current_track_index = (self.current_track_index + 1) % len(self.playlist)
             self.player.setSource(self.playlist[self.current_track_index]); self.player.play()
             
     def toggle_music(self, state):
-        if state == Qt.CheckState.Checked.value:
+        self.music_enabled = state == Qt.CheckState.Checked.value
+        if self.player is None: return
+        from PyQt6.QtMultimedia import QMediaPlayer
+        if self.music_enabled:
             if self.player.mediaStatus() != QMediaPlayer.MediaStatus.NoMedia: self.player.play()
         else: self.player.pause()
 
     def set_volume(self, value):
-        self.audio_output.setVolume(value / 100.0); self.settings_menu.volume_label.setText(f"{value}%")
+        self.music_volume = value; self.settings_menu.volume_label.setText(f"{value}%")
+        if self.audio_output is not None: self.audio_output.setVolume(value / 100.0)
     
     # --- 운동 프로그램 시작 함수 (웹캠 체크 추가) ---
     def start_squat_program(self):
         # <<< [수정] 웹캠 연결 상태 확인
-        if not is_camera_available():
+        if not self.is_camera_available():
             self.show_error_message("웹캠이 연결되어 있지 않습니다!\n웹캠을 연결한 후 다시 시도해주세요.")
             return
 
@@ -399,17 +417,14 @@ class MainWindow(QMainWindow):
             self.loading_screen.set_loading_text("스쿼트 프로그램 실행중...\n 카메라 각도를 올바른 방향으로 설정해주세요.")
             self.stacked_widget.setCurrentWidget(self.loading_screen)
             self.loading_screen.start_animation()
-            self.process = subprocess.Popen(["python", "squat_ai_trainer.py", reps, sets, rest])
-            self.check_timer = QTimer(self)
-            self.check_timer.timeout.connect(self.check_process_finished)
-            self.check_timer.start(500)
+            self.launch_workout('squat', "squat_ai_trainer.py", reps, sets, rest)
         except Exception as e:
             self.show_error_message(f"프로그램 시작 중 오류 발생: {e}")
             self.stacked_widget.setCurrentWidget(self.squat_settings)
     
     def start_pushup_program(self):
         # <<< [수정] 웹캠 연결 상태 확인
-        if not is_camera_available():
+        if not self.is_camera_available():
             self.show_error_message("웹캠이 연결되어 있지 않습니다!\n웹캠을 연결한 후 다시 시도해주세요.")
             return
             
@@ -421,14 +436,91 @@ class MainWindow(QMainWindow):
             self.loading_screen.set_loading_text("푸쉬업 프로그램 실행중...\n 카메라 각도를 올바른 방향으로 설정해주세요.")
             self.stacked_widget.setCurrentWidget(self.loading_screen)
             self.loading_screen.start_animation()
-            self.process = subprocess.Popen(["python", "pushup_ai_trainer.py", reps, sets, rest])
-            self.check_timer = QTimer(self)
-            self.check_timer.timeout.connect(self.check_process_finished)
-            self.check_timer.start(500)
+            self.launch_workout('pushup', "pushup_ai_trainer.py", reps, sets, rest)
         except Exception as e:
             self.show_error_message(f"프로그램 시작 중 오류 발생: {e}")
             self.stacked_widget.setCurrentWidget(self.pushup_settings)
 
+    def launch_workout(self, exercise, script, reps, sets, rest):
+        """SESSION_MODE에 따라 운동 세션을 이 프로세스, 상주 워커, 또는 새 프로세스에서 시작합니다."""
+        self.start_session_services()
+        if SESSION_MODE == 'worker':
+            self.trainer_worker.start_session(exercise, int(reps), int(sets), int(rest))
+            return
+        if SESSION_MODE == 'inprocess':
+            from session_runner import WorkoutSession, WorkoutWindow
+            self.session = WorkoutSession(exercise, int(reps), int(sets), int(rest), camera_service=self.camera_service, parent=self)
+            self.session_window = WorkoutWindow(self.session)
+            self.session.session_failed.connect(self.show_error_message)
+            self.session.finished.connect(self.on_session_finished)
+            self.session.start()
+            self.session_window.show()
+            return
+        if self.camera_service is not None: self.camera_service.release_parked()  # 트레이너 프로세스가 카메라를 열 수 있도록
+        self.process = subprocess.Popen(["python", script, reps, sets, rest])
+        self.check_timer = QTimer(self)
+        self.check_timer.timeout.connect(self.check_process_finished)
+        self.check_timer.start(500)
+
+    def on_session_finished(self):
+        self.session_window.close()
+        self.session_window.deleteLater()
+        self.session.deleteLater()
+        self.session, self.session_window = None, None
+        self.return_to_main_menu()
+
+    def on_worker_progress(self, progress):
+        state = {'workout': "운동중", 'rest': "휴식중", 'finished': "완료"}.get(progress["workout_state"], "")
+        self.loading_screen.set_loading_text(
+            f"{state} · {progress['set_counter']}세트\n"
+            f"총 {progress['counter']}회 (GOOD {progress['good_counter']} / BAD {progress['bad_counter']})"
+        )
+
+    def on_worker_session_failed(self, message):
+        self.show_error_message(message)
+        self.return_to_main_menu()
+
+    def open_preview(self, bus_name):
+        """워커가 올리는 카메라 프레임 버스에 붙어 로딩 화면에 미리보기를 띄웁니다."""
+        from frame_bus import FrameBus, FrameReader
+        self.close_preview()
+        try:
+            self.preview_reader = FrameReader(FrameBus.attach(bus_name))
+        except (FileNotFoundError, ValueError) as e:
+            print(f"카메라 미리보기를 열 수 없습니다: {e}")
+            return
+        self.preview_timer.start(PREVIEW_INTERVAL_MS)
+
+    def update_preview(self):
+        item = self.preview_reader.poll()
+        if item is None: return
+        _, _, frame = item
+        height, width = frame.shape[:2]
+        image = QImage(frame.data, width, height, frame.strides[0], QImage.Format.Format_BGR888)
+        self.loading_screen.set_preview(QPixmap.fromImage(image).scaledToWidth(PREVIEW_WIDTH, Qt.TransformationMode.FastTransformation))
+
+    def close_preview(self):
+        if self.preview_reader is None: return
+        self.preview_timer.stop()
+        self.preview_reader.close()
+        self.preview_reader = None
+        self.loading_screen.clear_preview()
+
+    def return_to_main_menu(self):
+        self.close_preview()
+        self.loading_screen.stop_animation()
+        self.stacked_widget.setCurrentWidget(self.main_menu)
+
+    def closeEvent(self, event):
+        # 실행 중인 세션이 있으면 카메라를 놓고 기록을 저장할 때까지 기다린다
+        if self.session is not None:
+            self.session.stop()
+            self.session.wait(3000)
+        if self.camera_service is not None: self.camera_service.close()
+        if self.trainer_warmup is not None: self.trainer_warmup.wait()
+        if self.trainer_worker is not None: self.trainer_worker.shutdown()
+        super().closeEvent(event)
+
     # --- 유틸리티 메소드 (변경 없음) ---
     def check_process_finished(self):
         if self.process.poll() is not None:
@@ -436,6 +528,13 @@ class MainWindow(QMainWindow):
             self.loading_screen.stop_animation()
             self.stacked_widget.setCurrentWidget(self.main_menu)
 
+    def is_camera_available(self):
+        """캐시된 장치 목록으로 기본 웹캠 연결 여부를 확인합니다. 아직 조사 중이면 일단 진행하고, 세션에서 열지 못하면 그때 알립니다."""
+        if self.trainer_worker is not None: available = self.trainer_worker.camera_available()
+        elif self.camera_service is not None: available = self.camera_service.is_available()
+        else: available = None
+        return available is not False
+
     def feature_coming_soon(self): QMessageBox.information(self, "알림", "🛠️ 현재 준비 중인 기능입니다. 🛠️")
     def show_error_message(self, message): QMessageBox.critical(self, "오류", message)
 
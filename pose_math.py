@@ -0,0 +1,49 @@
+# pose_math.py
+# 포즈 랜드마크를 (33, 4) float32 배열로 바꾸고, 모든 운동에 필요한 관절 각도를 한 번에 계산합니다.
+# 배열의 열 순서는 (x, y, z, visibility)이며, (N, 33, 4) 묶음도 그대로 처리할 수 있습니다.
+import numpy as np
+
+NUM_LANDMARKS = 33
+
+# MediaPipe PoseLandmark 인덱스 (mediapipe를 import하지 않고도 쓸 수 있도록 숫자로 둠)
+LEFT_SHOULDER, LEFT_ELBOW, LEFT_WRIST = 11, 13, 15
+LEFT_HIP, LEFT_KNEE, LEFT_ANKLE = 23, 25, 27
+
+# 관절 각도 정의: 이름 → (a, b, c), b가 꼭짓점
+JOINT_ANGLES = {
+    "elbow": (LEFT_SHOULDER, LEFT_ELBOW, LEFT_WRIST),  # 푸쉬업: 팔꿈치
+    "body": (LEFT_SHOULDER, LEFT_HIP, LEFT_ANKLE),     # 푸쉬업: 몸통 일직선
+    "knee": (LEFT_HIP, LEFT_KNEE, LEFT_ANKLE),         # 스쿼트: 무릎
+    "hip": (LEFT_SHOULDER, LEFT_HIP, LEFT_KNEE),       # 스쿼트: 엉덩이(상체 기울기)
+}
+ANGLE_NAMES = tuple(JOINT_ANGLES)
+# 뼈대 연결 (mediapipe.solutions.pose.POSE_CONNECTIONS와 같음)
+POSE_CONNECTIONS = (
+    (0, 1), (0, 4), (1, 2), (2, 3), (3, 7), (4, 5), (5, 6), (6, 8), (9, 10), (11, 12), (11, 13), (11, 23), (12, 14), (12, 24),
+    (13, 15), (14, 16), (15, 17), (15, 19), (15, 21), (16, 18), (16, 20), (16, 22), (17, 19), (18, 20), (23, 24), (23, 25),
+    (24, 26), (25, 27), (26, 28), (27, 29), (27, 31), (28, 30), (28, 32), (29, 31), (30, 32),
+)
+ELBOW, BODY, KNEE, HIP = (ANGLE_NAMES.index(name) for name in ("elbow", "body", "knee", "hip"))
+
+_A, _B, _C = (np.array(idx) for idx in zip(*JOINT_ANGLES.values()))
+
+def landmarks_to_array(pose_landmarks):
+    """MediaPipe의 pose_landmarks를 연속된 (33, 4) float32 배열로 변환합니다."""
+    values = (v for lm in pose_landmarks.landmark for v in (lm.x, lm.y, lm.z, lm.visibility))
+    return np.fromiter(values, dtype=np.float32, count=NUM_LANDMARKS * 4).reshape(NUM_LANDMARKS, 4)
+
+def is_visible(landmarks, indices, threshold=0.7):
+    """지정한 랜드마크들이 모두 threshold보다 잘 보이는지 확인합니다. (..., 33, 4) → (...) bool"""
+    return np.all(landmarks[..., indices, 3] > threshold, axis=-1)
+
+def joint_angles(landmarks):
+    """
+    JOINT_ANGLES의 모든 각도(도 단위, 0~180)를 한 번의 벡터 연산으로 계산합니다.
+    (33, 4) → (K,), (N, 33, 4) → (N, K). 결과 열 순서는 ANGLE_NAMES와 같습니다.
+    """
+    xy = landmarks[..., :2]
+    a, b, c = xy[..., _A, :], xy[..., _B, :], xy[..., _C, :]
+    ba, bc = a - b, c - b
+    radians = np.arctan2(bc[..., 1], bc[..., 0]) - np.arctan2(ba[..., 1], ba[..., 0])
+    angle = np.abs(np.degrees(radians))
+    return np.where(angle > 180.0, 360.0 - angle, angle)
@@ -1,11 +1,20 @@
 # pushup_ai_trainer.py
 import cv2
-import mediapipe as mp
 import numpy as np
 import time
-import pygame
 import sys
-from PIL import ImageFont, ImageDraw, Image
+import os
+import threading
+from frame_pipeline import run_pipeline
+import hud_text
+import pose_math
+from roi_tracker import PoseRoiTracker
+from adaptive_inference import AdaptiveInference
+from landmark_filter import OneEuroLandmarkFilter
+from rep_detector import RepDetector
+from landmark_recording import LandmarkRecorder
+from frame_profiler import FrameProfiler
+import shared_pose
 from database_manager import add_workout_record  # 데이터베이스 매니저 import
 
 # --- 상수 및 초기 설정 ---
@@ -15,14 +24,33 @@ ANGLE_THRESHOLD_UP = 160.0  # 팔을 모두 폈을 때
 ANGLE_THRESHOLD_DOWN = 90.0   # 팔을 굽혔을 때
 BODY_ANGLE_THRESHOLD = 150.0 # 몸이 일자를 유지하는 기준
 FINISH_DURATION = 10
+# 각도 계산 전에 충분히 보여야 하는 관절
+REQUIRED_LANDMARKS = [pose_math.LEFT_SHOULDER, pose_math.LEFT_ELBOW, pose_math.LEFT_WRIST, pose_math.LEFT_HIP, pose_math.LEFT_ANKLE]
 
 # 기본값 설정
 SET_GOAL = 5
 TOTAL_SETS_GOAL = 3
 REST_DURATION = 30
+# 캡처/추론/렌더링 파이프라인 사용 여부 (AIHT_PIPELINE=0 이면 기존 단일 루프로 실행)
+USE_PIPELINE = os.getenv("AIHT_PIPELINE", "1") != "0"
+# 이전 프레임의 사람 영역만 잘라 추론할지 여부 (AIHT_ROI_TRACKING=0 이면 매 프레임 전체 화면 추론)
+USE_ROI_TRACKING = os.getenv("AIHT_ROI_TRACKING", "1") != "0"
+# 추론 사이 프레임의 랜드마크를 예측할지 여부 (단일 루프는 일부 프레임의 추론을 예측으로 대신하고, 파이프라인은 화면에 예측 위치를 그림)
+USE_ADAPTIVE_INFERENCE = os.getenv("AIHT_ADAPTIVE_INFERENCE", "1") != "0"
+# 각도 계산 전에 랜드마크 떨림을 One-Euro 필터로 거를지 여부 (AIHT_LANDMARK_FILTER=0 이면 모델 좌표를 그대로 사용)
+USE_LANDMARK_FILTER = os.getenv("AIHT_LANDMARK_FILTER", "1") != "0"
+# 세션의 프레임별 랜드마크를 recordings/에 기록할지 여부 (AIHT_RECORD_LANDMARKS=1, 재생은 landmark_replay.py)
+RECORD_LANDMARKS = os.getenv("AIHT_RECORD_LANDMARKS") == "1"
+TARGET_FPS = 30
+# 단계별 시간 측정 (AIHT_PROFILE=1 이면 화면에 FPS/p50/p95를 표시하고 종료 시 profiles/에 요약 저장)
+PROFILE = os.getenv("AIHT_PROFILE") == "1"
+# 운동 화면 창 제목
+WINDOW_TITLE = 'AI Home Trainer - Push-up'
+# 카메라 화면 좌우 반전 여부
+FLIP_FRAME = True
 
-# 커맨드 라인 인자로부터 값 가져오기
-if len(sys.argv) == 4:
+# 커맨드 라인 인자로부터 값 가져오기 (다른 모듈에서 import할 때는 적용하지 않음)
+if __name__ == '__main__' and len(sys.argv) == 4:
     try:
         SET_GOAL = int(sys.argv[1])
         TOTAL_SETS_GOAL = int(sys.argv[2])
@@ -31,13 +59,18 @@ if len(sys.argv) == 4:
     except (ValueError, IndexError):
         print("잘못된 인자 값입니다. 기본값으로 실행합니다.")
 
-# MediaPipe Pose 모델 초기화
-mp_pose = mp.solutions.pose
-pose = mp_pose.Pose()
-mp_drawing = mp.solutions.drawing_utils
+# Pose 모델(shared_pose.get_pose())과 효과음 뱅크(sound_cues.get_bank())는 run_session이 세션을 시작할 때(또는 예열할 때) 불러옵니다.
+# 모듈 import만으로는 만들지 않으므로, 판정 함수만 쓰는 도구(기록 재생, 영상 분석, 벤치마크)는 모델과 오디오 장치 없이 실행됩니다.
 
-# 사운드 출력을 위한 Pygame mixer 초기화
-pygame.mixer.init()
+# 단계별 시간 측정기 (꺼져 있으면 거의 비용이 없음, run_session이 세션마다 새로 만듦)
+profiler = FrameProfiler(enabled=PROFILE)
+
+# 랜드마크별 상태를 가진 떨림 제거 필터 (추론한 프레임마다 한 번 적용)
+landmark_filter = OneEuroLandmarkFilter(enabled=USE_LANDMARK_FILTER)
+# 효과음 뱅크 (run_session이 설정, None이면 소리 없이 판정만 함)
+sound_bank = None
+# 세션 동안만 열려 있는 랜드마크 기록기 (RECORD_LANDMARKS일 때 run_session이 만듦)
+landmark_recorder = None
 
 # --- 유틸리티 함수 (변경 없음) ---
 
@@ -51,53 +84,56 @@ def calculate_angle(a, b, c):
     if angle > 180.0: angle = 360 - angle
     return angle
 
-def play_sound(sound_file):
-    """pygame을 사용하여 사운드 파일을 재생합니다."""
-    try:
-        pygame.mixer.Sound(sound_file).play()
-    except Exception as e:
-        print(f"사운드 재생 오류 ({sound_file}): {e}")
+def play_sound(cue):
+    """미리 디코딩해 둔 효과음을 재생합니다. 파일을 읽지 않으며, 재생 호출 시간은 'sound' 단계로 기록합니다."""
+    if sound_bank is None: return
+    t = profiler.start()
+    sound_bank.play(cue)
+    profiler.stop("sound", t)
 
 def draw_text(img, text, pos, font_path, font_size, color):
-    """Pillow 라이브러리를 사용해 한글 등 다양한 폰트를 이미지에 그립니다."""
-    try:
-        img_pil = Image.fromarray(cv2.cvtColor(img, cv2.COLOR_BGR2RGB))
-        draw = ImageDraw.Draw(img_pil)
-        font = ImageFont.truetype(font_path, font_size)
-        draw.text(pos, text, font=font, fill=color)
-        return cv2.cvtColor(np.array(img_pil), cv2.COLOR_RGB2BGR)
-    except IOError:
-        print(f"폰트 파일({font_path})을 찾을 수 없습니다. 기본 폰트로 대체합니다.")
-        cv2.putText(img, text, (int(pos[0]), int(pos[1] + font_size)), cv2.FONT_HERSHEY_SIMPLEX, font_size / 25, color, 2)
-        return img
+    """캐시된 글자 스프라이트를 이미지에 합성합니다. (폰트/스프라이트 캐시는 hud_text 참고)"""
+    return hud_text.draw_text(img, text, pos, font_path, font_size, color)
 
 # --- 핵심 로직 함수 (푸쉬업에 맞게 수정) ---
 
-def process_pose_landmarks(image, pose_model):
-    """이미지를 처리하여 포즈 랜드마크를 찾고 푸쉬업에 필요한 각도를 계산합니다."""
+def process_pose_landmarks(image, pose_model, timestamp=None):
+    """
+    이미지를 처리하여 포즈 랜드마크를 찾고 푸쉬업에 필요한 각도를 계산합니다.
+    랜드마크는 필터링한 뒤 각도를 계산합니다. timestamp(초)를 넘기지 않으면 현재 시각을 씁니다. (영상 분석에서는 영상 시간)
+    """
+    if timestamp is None: timestamp = time.perf_counter()
+    t = profiler.start()
     image_rgb = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
+    profiler.stop("cvtColor", t); t = profiler.start()
     results = pose_model.process(image_rgb)
-    
-    landmarks_data = {"results": results, "elbow_angle": None, "body_angle": None, "bar_percentage": 0.0}
+    profiler.stop("pose.process", t)
+    landmarks = None
+    if results.pose_landmarks:
+        landmarks = pose_math.landmarks_to_array(results.pose_landmarks)
+    # 필터를 거치기 전의 모델 출력을 기록 (재생할 때 필터 설정을 바꿔 볼 수 있도록)
+    if landmark_recorder is not None: landmark_recorder.append(timestamp, landmarks)
+    if landmarks is not None:
+        t = profiler.start()
+        landmark_filter.apply(landmarks, timestamp)
+        profiler.stop("filter", t)
+    else:
+        landmark_filter.reset()
+    return build_landmarks_data(results, landmarks, timestamp)
+
+def build_landmarks_data(results, landmarks, timestamp=None):
+    """(33, 4) 랜드마크 배열로부터 푸쉬업에 필요한 각도와 막대 값을 계산합니다. (추론 결과와 예측 결과 모두에 사용)"""
+    landmarks_data = {"results": results, "elbow_angle": None, "body_angle": None, "landmarks": landmarks, "bar_percentage": 0.0,
+                      "timestamp": time.perf_counter() if timestamp is None else timestamp}
 
     try:
-        landmarks = results.pose_landmarks.landmark
+        if landmarks is None: return landmarks_data
         # 푸쉬업에 필요한 관절: 어깨, 팔꿈치, 손목, 엉덩이, 발목
-        required_landmarks = [
-            mp_pose.PoseLandmark.LEFT_SHOULDER, mp_pose.PoseLandmark.LEFT_ELBOW,
-            mp_pose.PoseLandmark.LEFT_WRIST, mp_pose.PoseLandmark.LEFT_HIP,
-            mp_pose.PoseLandmark.LEFT_ANKLE
-        ]
-        if all(landmarks[lm.value].visibility > 0.7 for lm in required_landmarks):
-            shoulder = [landmarks[mp_pose.PoseLandmark.LEFT_SHOULDER.value].x, landmarks[mp_pose.PoseLandmark.LEFT_SHOULDER.value].y]
-            elbow = [landmarks[mp_pose.PoseLandmark.LEFT_ELBOW.value].x, landmarks[mp_pose.PoseLandmark.LEFT_ELBOW.value].y]
-            wrist = [landmarks[mp_pose.PoseLandmark.LEFT_WRIST.value].x, landmarks[mp_pose.PoseLandmark.LEFT_WRIST.value].y]
-            hip = [landmarks[mp_pose.PoseLandmark.LEFT_HIP.value].x, landmarks[mp_pose.PoseLandmark.LEFT_HIP.value].y]
-            ankle = [landmarks[mp_pose.PoseLandmark.LEFT_ANKLE.value].x, landmarks[mp_pose.PoseLandmark.LEFT_ANKLE.value].y]
-            
-            # 팔꿈치 각도와 몸통 각도 계산
-            elbow_angle = calculate_angle(shoulder, elbow, wrist)
-            body_angle = calculate_angle(shoulder, hip, ankle)
+        if pose_math.is_visible(landmarks, REQUIRED_LANDMARKS):
+            # 팔꿈치 각도와 몸통 각도 계산 (모든 관절 각도를 한 번에 계산)
+            angles = pose_math.joint_angles(landmarks)
+            elbow_angle = float(angles[pose_math.ELBOW])
+            body_angle = float(angles[pose_math.BODY])
             
             landmarks_data["elbow_angle"] = elbow_angle
             landmarks_data["body_angle"] = body_angle
@@ -106,6 +142,14 @@ def process_pose_landmarks(image, pose_model):
         pass
     return landmarks_data
 
+def record_rep(state, rep):
+    """
+    방금 끝난 반복 한 번의 기록(시각, 소요 시간, 최저/최고 각도, 내려가는/올라오는 시간, 성공 여부, 실패 이유)을 현재 세트에 추가합니다.
+    rep은 rep_detector가 반환한 RepRecord입니다.
+    """
+    state["last_rep"] = {"timestamp": time.time(), **rep.to_dict(), "good": not state["mistake_made_this_rep"], "feedback": state["mistake_reason"]}
+    state["set_reps"].append(state["last_rep"])
+
 def update_state_and_counters(state, landmarks_data):
     """푸쉬업 포즈 데이터를 기반으로 운동 상태, 카운터, 피드백을 업데이트합니다."""
     elbow_angle, body_angle = landmarks_data["elbow_angle"], landmarks_data["body_angle"]
@@ -113,41 +157,46 @@ def update_state_and_counters(state, landmarks_data):
 
     # 자세 피드백: 허리가 기준 각도보다 아래로 처졌는지 확인
     if body_angle < BODY_ANGLE_THRESHOLD and state["feedback"] == "":
-        state.update({"feedback": "KEEP BODY STRAIGHT", "mistake_made_this_rep": True, "feedback_start_time": time.time()})
-        play_sound('sound/허리를곧게펴세요.wav') # 사운드 파일명 변경
+        state.update({"feedback": "KEEP BODY STRAIGHT", "mistake_made_this_rep": True, "mistake_reason": "KEEP BODY STRAIGHT", "feedback_start_time": time.time()})
+        play_sound('keep_body_straight')
+
+    # 반복 구간 검출 (히스테리시스 + 극값 추적, rep_detector 참고)
+    rep = state["rep_detector"].update(landmarks_data["timestamp"], elbow_angle)
 
     # 상태 변경: 내려가는 동작
-    if elbow_angle < ANGLE_THRESHOLD_DOWN and state["stage"] == 'up':
-        state.update({"stage": 'down', "mistake_made_this_rep": False, "feedback": ""})
+    if state["rep_detector"].stage == 'down' and state["stage"] == 'up':
+        state.update({"stage": 'down', "mistake_made_this_rep": False, "mistake_reason": "", "feedback": ""})
 
     # 상태 변경: 올라오는 동작 (카운트 증가)
-    if elbow_angle > ANGLE_THRESHOLD_UP and state["stage"] == 'down':
+    if rep is not None:
         state["stage"] = 'up'
         state["counter"] += 1
+        record_rep(state, rep)
         
         if state["mistake_made_this_rep"]:
             state["bad_counter"] += 1
-            play_sound('sound/063_삐삑 (오답 -짧은).mp3')
+            play_sound('bad')
         else:
             state["good_counter"] += 1
             if state["good_counter"] == SET_GOAL:
-                state["set_results"].append({"good": state["good_counter"], "bad": state["bad_counter"]})
+                state["set_results"].append({"good": state["good_counter"], "bad": state["bad_counter"], "reps": state["set_reps"]})
+                state["set_reps"] = []
                 
                 if state["set_counter"] == TOTAL_SETS_GOAL:
                     state.update({"workout_state": 'finished', "finish_start_time": time.time()})
-                    play_sound('sound/0290-와우~~.mp3')
+                    play_sound('workout_complete')
                 else:
                     state.update({"workout_state": 'rest', "rest_start_time": time.time()})
-                    play_sound('sound/0289-예_.wav')
+                    play_sound('set_complete')
             else:
                 state.update({"feedback": "GOOD", "feedback_start_time": time.time()})
-                play_sound('sound/correct-choice-43861.mp3')
+                play_sound('good')
     return state
 
 def draw_ui(image, state, landmarks_data):
     """화면에 전체 사용자 인터페이스(UI)를 그립니다. (변경 없음)"""
-    if landmarks_data["results"].pose_landmarks:
-        mp_drawing.draw_landmarks(image, landmarks_data["results"].pose_landmarks, mp_pose.POSE_CONNECTIONS)
+    if landmarks_data["landmarks"] is not None:
+        hud_text.draw_skeleton(image, landmarks_data["landmarks"])
     
     overlay = image.copy()
     cv2.rectangle(overlay, (0, 0), (200, 145), (0, 0, 0), -1)
@@ -180,14 +229,8 @@ def draw_overlay_screen(image, text1, text2, text1_size, text2_size, text1_color
     cv2.rectangle(overlay, (0, 0), (w, h), (0, 0, 0), -1)
     image = cv2.addWeighted(overlay, 0.7, image, 0.3, 0)
     
-    try:
-        font_large, font_medium = ImageFont.truetype(FONT_PATH, text1_size), ImageFont.truetype(FONT_PATH, text2_size)
-        text1_bbox, text2_bbox = font_large.getbbox(text1), font_medium.getbbox(text2)
-        text1_width, text1_height = text1_bbox[2] - text1_bbox[0], text1_bbox[3] - text1_bbox[1]
-        text2_width = text2_bbox[2] - text2_bbox[0]
-    except IOError:
-        (text1_width, text1_height), _ = cv2.getTextSize(text1, cv2.FONT_HERSHEY_SIMPLEX, text1_size / 25, 2)
-        (text2_width, _), _ = cv2.getTextSize(text2, cv2.FONT_HERSHEY_SIMPLEX, text2_size / 25, 2)
+    text1_width, text1_height = hud_text.measure_text(text1, FONT_PATH, text1_size)
+    text2_width, _ = hud_text.measure_text(text2, FONT_PATH, text2_size)
 
     x1, y1 = int((w - text1_width) / 2), int((h / 2) - text1_height)
     x2, y2 = int((w - text2_width) / 2), int((h / 2) + 40)
@@ -197,57 +240,164 @@ def draw_overlay_screen(image, text1, text2, text1_size, text2_size, text1_color
     return image
 
 # --- 메인 프로그램 실행 ---
-def main():
-    cap = cv2.VideoCapture(0)
-    if not cap.isOpened():
-        print("카메라를 열 수 없습니다.")
-        return
+# 화면을 그리는 데 필요한 상태 값 (파이프라인에서는 잠금 안에서 이 값만 복사해 두고 잠금 밖에서 그림)
+DISPLAY_KEYS = ("workout_state", "rest_start_time", "finish_start_time", "set_counter", "counter", "good_counter", "bad_counter", "stage", "feedback")
 
-    # 프로그램 상태 변수 (변경 없음)
-    app_state = {
+def new_app_state():
+    """프로그램 상태 변수의 초기값을 만듭니다."""
+    return {
         "counter": 0, "good_counter": 0, "bad_counter": 0,
         "stage": 'up', "feedback": "", "feedback_start_time": 0,
-        "mistake_made_this_rep": False, "smoothed_bar": 0.0,
+        "mistake_made_this_rep": False, "mistake_reason": "", "smoothed_bar": 0.0,
+        "rep_detector": RepDetector(ANGLE_THRESHOLD_DOWN, ANGLE_THRESHOLD_UP), "last_rep": None,
         "workout_state": 'workout', "rest_start_time": 0,
         "set_counter": 1, "finish_start_time": 0,
-        "set_results": [],
+        "set_results": [], "set_reps": [],
         "workout_completed": False
     }
 
+def advance_workout_state(app_state, now):
+    """시간이 지나면 바뀌는 상태(휴식 끝 → 다음 세트, 피드백 지우기, 종료 화면 끝)를 반영합니다. 프로그램을 끝내야 하면 False를 반환합니다."""
+    if app_state["workout_state"] == 'rest':
+        if int(REST_DURATION - (now - app_state["rest_start_time"])) <= 0:
+            app_state.update({"workout_state": 'workout', "counter": 0, "good_counter": 0, "bad_counter": 0, "set_counter": app_state["set_counter"] + 1, "stage": 'up', "feedback": ""})
+            app_state["rep_detector"].reset()
+
+    elif app_state["workout_state"] == 'finished':
+        if int(FINISH_DURATION - (now - app_state["finish_start_time"])) <= 0:
+            app_state["workout_completed"] = True
+            return False
+
+    elif app_state["feedback"] and (now - app_state["feedback_start_time"] > 2):
+        app_state["feedback"] = ""
+    return True
+
+def draw_frame(image, view, landmarks_data, now):
+    """
+    view의 운동 상태에 따라 휴식/종료 오버레이 또는 운동 UI를 그립니다.
+    view는 앱 상태 자체이거나, 파이프라인에서 잠금 안에서 복사해 둔 DISPLAY_KEYS 값입니다. (막대 표시용 smoothed_bar는 view에 누적)
+    """
+    if view["workout_state"] == 'rest':
+        remaining_rest = int(REST_DURATION - (now - view["rest_start_time"]))
+        image = draw_overlay_screen(image, "SET COMPLETE!", f"REST: {remaining_rest}s", 50, 30, (0, 255, 0))
+
+    elif view["workout_state"] == 'finished':
+        remaining_finish = int(FINISH_DURATION - (now - view["finish_start_time"]))
+        image = draw_overlay_screen(image, "ALL SETS COMPLETE!!", f"종료까지: {remaining_finish}s", 50, 30, (0, 255, 255))
+
+    elif landmarks_data is not None:
+        t = profiler.start()
+        image = draw_ui(image, view, landmarks_data)
+        profiler.stop("draw_ui", t)
+    return image
+
+def render_frame(image, app_state, landmarks_data):
+    """운동 상태에 따라 휴식/종료 오버레이 또는 운동 UI를 그립니다. 프로그램을 끝내야 하면 None을 반환합니다."""
+    now = time.time()
+    if not advance_workout_state(app_state, now): return None
+    return draw_frame(image, app_state, landmarks_data, now)
+
+def show_frame_window(display):
+    """OpenCV 창에 프레임을 표시합니다. ESC를 누르면 False를 반환합니다."""
+    cv2.imshow(WINDOW_TITLE, display)
+    return cv2.waitKey(5) & 0xFF != 27
+
+def run_serial_loop(cap, app_state, pose_model, show_frame=show_frame_window):
+    """캡처, 추론, 렌더링을 한 스레드에서 차례로 실행하는 기존 방식의 루프입니다."""
+    adaptive = AdaptiveInference(process_pose_landmarks, build_landmarks_data, TARGET_FPS, enabled=USE_ADAPTIVE_INFERENCE)
     while cap.isOpened():
+        t = profiler.start()
         success, image = cap.read()
+        profiler.stop("capture", t)
         if not success: break
         
         # 화면 좌우 반전
-        image = cv2.flip(image, 1)
+        t = profiler.start()
+        if FLIP_FRAME: image = cv2.flip(image, 1)
+        profiler.stop("flip", t)
 
-        if app_state["workout_state"] == 'rest':
-            elapsed_rest = time.time() - app_state["rest_start_time"]
-            remaining_rest = int(REST_DURATION - elapsed_rest)
-            if remaining_rest > 0:
-                image = draw_overlay_screen(image, "SET COMPLETE!", f"REST: {remaining_rest}s", 50, 30, (0, 255, 0))
-            else:
-                app_state.update({"workout_state": 'workout', "counter": 0, "good_counter": 0, "bad_counter": 0, "set_counter": app_state["set_counter"] + 1, "stage": 'up', "feedback": ""})
-        
-        elif app_state["workout_state"] == 'finished':
-            elapsed_finish = time.time() - app_state["finish_start_time"]
-            remaining_finish = int(FINISH_DURATION - elapsed_finish)
-            if remaining_finish > 0:
-                image = draw_overlay_screen(image, "ALL SETS COMPLETE!!", f"종료까지: {remaining_finish}s", 50, 30, (0, 255, 255))
-            else:
-                app_state["workout_completed"] = True
-                break
+        landmarks_data = None
+        if app_state["workout_state"] == 'workout':
+            landmarks_data, inferred = adaptive.step(image, pose_model)
+            # 반복 판정은 실제 추론한 프레임에서만
+            if inferred:
+                t = profiler.start()
+                update_state_and_counters(app_state, landmarks_data)
+                profiler.stop("update_state", t)
+        image = render_frame(image, app_state, landmarks_data)
+        if image is None: break
         
-        elif app_state["workout_state"] == 'workout':
-            landmarks_data = process_pose_landmarks(image, pose)
-            app_state = update_state_and_counters(app_state, landmarks_data)
-            if app_state["feedback"] and (time.time() - app_state["feedback_start_time"] > 2):
-                app_state["feedback"] = ""
-            image = draw_ui(image, app_state, landmarks_data)
-        
-        cv2.imshow('AI Home Trainer - Push-up', cv2.resize(image, (1280, 720)))
-        if cv2.waitKey(5) & 0xFF == 27: break
+        t = profiler.start()
+        display = cv2.resize(image, (1280, 720))
+        profiler.stop("resize", t)
+        profiler.draw_overlay(display)
+        t = profiler.start()
+        keep_running = show_frame(display)
+        profiler.stop("imshow", t)
+        profiler.frame_done()
+        if not keep_running: break
+
+def run_pipelined_loop(cap, app_state, pose_model, show_frame=None):
+    """캡처/추론/렌더링을 별도 스레드로 나누어, 추론이 화면 표시를 기다리지 않도록 실행합니다."""
+    # 잠금은 상태를 바꾸거나 복사하는 동안만 잡고, 그리기는 잠금 밖에서 하므로 추론 스레드가 화면 그리기를 기다리지 않음
+    state_lock = threading.Lock()
+    view = {"smoothed_bar": app_state["smoothed_bar"]}  # 렌더링 스레드가 그리는 상태 복사본
+    adaptive = AdaptiveInference(process_pose_landmarks, build_landmarks_data, TARGET_FPS, enabled=USE_ADAPTIVE_INFERENCE)
+
+    def infer(image):
+        with state_lock:
+            working = app_state["workout_state"] == 'workout'
+        if not working: return None  # 휴식/종료 화면에서는 추론하지 않음 (단일 루프와 동일)
+        landmarks_data = adaptive.infer(image, pose_model)
+        with state_lock:
+            if app_state["workout_state"] == 'workout':
+                t = profiler.start()
+                update_state_and_counters(app_state, landmarks_data)
+                profiler.stop("update_state", t)
+        return landmarks_data
+
+    def render(image, landmarks_data):
+        now = time.time()
+        with state_lock:
+            if not advance_workout_state(app_state, now): return None
+            for key in DISPLAY_KEYS: view[key] = app_state[key]
+        if view["workout_state"] != 'workout': landmarks_data = None
+        elif landmarks_data is not None:
+            # 마지막 추론 이후의 움직임을 예측해 그림 (추론 결과가 화면보다 늦게 따라오는 만큼 보정, 반복 판정에는 쓰지 않음)
+            landmarks_data = adaptive.predict(time.perf_counter()) or landmarks_data
+        return draw_frame(image, view, landmarks_data, now)
+
+    run_pipeline(cap, infer, render, WINDOW_TITLE, flip=FLIP_FRAME, profiler=profiler, show_frame=show_frame)
 
+def run_session(cap, app_state, show_frame=None, session_profiler=None, pose=None):
+    """
+    열려 있는 cap으로 운동 세션 하나를 끝까지 실행합니다.
+    show_frame(display)를 넘기면 OpenCV 창 대신 그 함수로 프레임을 내보내며, False를 반환하면 세션을 멈춥니다.
+    (메인 메뉴 프로세스 안에서 세션을 실행할 때 사용, session_runner 참고)
+    단계 시간은 세션마다 새 측정기에 기록합니다. (같은 프로세스에서 세션을 여러 번 실행해도 이전 세션의 기록이 섞이지 않음)
+    session_profiler(FrameProfiler)를 넘기면 새로 만드는 대신 그 측정기를 씁니다.
+    pose를 넘기면 프로세스 공유 모델(shared_pose.get_pose()) 대신 그 Pose 모델로 추론합니다. (세션마다 추적 상태를 새로 시작할 때)
+    """
+    global landmark_recorder, sound_bank, profiler
+    profiler = session_profiler or FrameProfiler(enabled=PROFILE)
+    import sound_cues  # pygame은 실제 세션에서만 필요
+    if pose is None: pose = shared_pose.get_pose()
+    sound_bank = sound_cues.get_bank()
+    pose_model = PoseRoiTracker(pose) if USE_ROI_TRACKING else pose
+    landmark_filter.reset()
+    if RECORD_LANDMARKS: landmark_recorder = LandmarkRecorder.for_session('pushup')
+    try:
+        if USE_PIPELINE:
+            run_pipelined_loop(cap, app_state, pose_model, show_frame)
+        else:
+            run_serial_loop(cap, app_state, pose_model, show_frame or show_frame_window)
+    finally:
+        # 루프는 추론 스레드가 끝난 뒤에 돌아오므로 여기서 닫아도 늦게 쓰는 추론 결과는 없음 (기록기도 닫힌 뒤의 append는 무시)
+        recorder, landmark_recorder = landmark_recorder, None
+        if recorder is not None: recorder.close()
+
+def finish_session(app_state):
+    """세션이 끝난 뒤 기록과 프로파일 요약을 저장합니다."""
     # 모든 세트를 정상적으로 완료했을 때만 기록 저장
     if app_state["workout_completed"]:
         print("운동 완료! 기록을 저장합니다...")
@@ -259,6 +409,18 @@ def main():
             set_details_list=app_state["set_results"]
         )
 
+    if PROFILE and sound_bank is not None: print(f"효과음 지연: {sound_bank.latency_summary()}")
+    profiler.write_summary('pushup')
+
+def main():
+    cap = cv2.VideoCapture(0)
+    if not cap.isOpened():
+        print("카메라를 열 수 없습니다.")
+        return
+
+    app_state = new_app_state()
+    run_session(cap, app_state)
+    finish_session(app_state)
     cap.release()
     cv2.destroyAllWindows()
 
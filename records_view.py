@@ -0,0 +1,218 @@
+# records_view.py
+# 내 기록 화면: QListView + 모델/델리게이트로 보이는 카드만 그리고, 기록은 백그라운드에서 페이지 단위로 불러옵니다.
+import json
+from PyQt6.QtWidgets import (
+    QWidget, QVBoxLayout, QPushButton, QLabel, QListView, QStyledItemDelegate, QStyle, QAbstractItemView
+)
+from PyQt6.QtGui import QColor, QFont, QPainter
+from PyQt6.QtCore import (
+    Qt, QAbstractListModel, QModelIndex, QObject, QRunnable, QThreadPool, QRect, QSize, pyqtSignal
+)
+from style_sheet import CARD_STYLESHEET, RECORD_CARD_COLORS
+from database_manager import get_records_page
+
+PAGE_SIZE = 50
+CARD_HEIGHT = 130
+CARD_MARGIN = 10
+CARD_PADDING = 15
+
+def format_record(record):
+    """DB 행을 카드에 표시할 문자열로 미리 변환합니다. (백그라운드 스레드에서 호출)"""
+    timestamp, _, reps, sets, rest, total_good, set_details, set_list = record
+    # 'YYYY-MM-DD HH:MM:SS' 형식이므로 strptime 없이 잘라서 사용
+    date_text = f"{timestamp[0:4]}년 {timestamp[5:7]}월 {timestamp[8:10]}일 {timestamp[11:16]}"
+    if not set_list:
+        # sets 테이블에 행이 없는 기록(이전 버전 앱이 records에만 기록한 행 등)은 기록 자체의 set_details(JSON)로 표시
+        try:
+            set_list = [(item['good'], item['bad']) for item in json.loads(set_details)]
+            total_good = sum(good for good, _ in set_list)
+        except (json.JSONDecodeError, TypeError, KeyError):
+            set_list = None
+    if set_list is not None:
+        details_str = ", ".join([f"S{i+1}: G{good}/B{bad}" for i, (good, bad) in enumerate(set_list)])
+    else:
+        total_good, details_str = "N/A", "데이터 오류"
+    lines = [
+        f"🏋️‍♂️  설정: {reps}회 / {sets}세트 / {rest}초 휴식",
+        f"✅  총 성공: {total_good}회",
+        f"📊  세트별: {details_str}",
+    ]
+    return date_text, lines
+
+# --- 백그라운드 페이지 로더 ---
+
+class PageLoaderSignals(QObject):
+    page_loaded = pyqtSignal(int, list, object)  # (요청 번호, 카드 목록, 다음 cursor)
+    error_occurred = pyqtSignal(int, str)
+
+class PageLoader(QRunnable):
+    """DB에서 한 페이지를 읽고 표시용 문자열까지 만든 뒤 GUI 스레드로 넘깁니다."""
+    def __init__(self, request_id, exercise_type, cursor):
+        super().__init__()
+        self.request_id, self.exercise_type, self.cursor = request_id, exercise_type, cursor
+        self.signals = PageLoaderSignals()
+
+    def run(self):
+        try:
+            rows, next_cursor = get_records_page(self.exercise_type, self.cursor, PAGE_SIZE)
+            self.signals.page_loaded.emit(self.request_id, [format_record(row) for row in rows], next_cursor)
+        except Exception as e:
+            self.signals.error_occurred.emit(self.request_id, f"기록을 불러오는 중 오류 발생: {e}")
+
+# --- 모델 ---
+
+class RecordListModel(QAbstractListModel):
+    """
+    스크롤이 끝에 가까워지면 뷰가 fetchMore()를 호출하고, 다음 페이지를 키셋 cursor로 백그라운드에서 읽어 붙입니다.
+    운동 종류를 바꾸면 요청 번호가 바뀌어 이전에 진행 중이던 요청 결과는 버려집니다.
+    """
+    first_page_loaded = pyqtSignal(bool)  # 기록이 하나라도 있는지
+    load_failed = pyqtSignal(str)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.cards = []
+        self.exercise_type = None
+        self.cursor = None
+        self.has_more = False
+        self.loading = False
+        self.request_id = 0
+        self.thread_pool = QThreadPool.globalInstance()
+
+    def set_exercise(self, exercise_type):
+        self.beginResetModel()
+        self.cards, self.exercise_type, self.cursor = [], exercise_type, None
+        self.has_more, self.loading = True, False
+        self.request_id += 1
+        self.endResetModel()
+        self.fetchMore(QModelIndex())
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.cards)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid() or role != Qt.ItemDataRole.DisplayRole: return None
+        return self.cards[index.row()]
+
+    def canFetchMore(self, parent):
+        return not parent.isValid() and self.has_more and not self.loading
+
+    def fetchMore(self, parent):
+        if not self.canFetchMore(parent): return
+        self.loading = True
+        loader = PageLoader(self.request_id, self.exercise_type, self.cursor)
+        loader.signals.page_loaded.connect(self.on_page_loaded)
+        loader.signals.error_occurred.connect(self.on_error)
+        self.thread_pool.start(loader)
+
+    def on_page_loaded(self, request_id, cards, next_cursor):
+        if request_id != self.request_id: return
+        is_first_page = self.cursor is None
+        if cards:
+            self.beginInsertRows(QModelIndex(), len(self.cards), len(self.cards) + len(cards) - 1)
+            self.cards.extend(cards)
+            self.endInsertRows()
+        self.cursor, self.has_more, self.loading = next_cursor, next_cursor is not None, False
+        if is_first_page: self.first_page_loaded.emit(bool(cards))
+
+    def on_error(self, request_id, message):
+        if request_id != self.request_id: return
+        self.has_more, self.loading = False, False
+        self.load_failed.emit(message)
+
+# --- 델리게이트 ---
+
+class RecordCardDelegate(QStyledItemDelegate):
+    """기록 카드 하나를 위젯 없이 직접 그립니다. 모든 카드의 높이가 같아 레이아웃 계산이 필요 없습니다."""
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.date_font = QFont(); self.date_font.setPixelSize(18); self.date_font.setBold(True)
+        self.stats_font = QFont(); self.stats_font.setPixelSize(15)
+        self.colors = {key: QColor(value) for key, value in RECORD_CARD_COLORS.items()}
+
+    def sizeHint(self, option, index):
+        return QSize(option.rect.width(), CARD_HEIGHT + CARD_MARGIN)
+
+    def paint(self, painter, option, index):
+        date_text, lines = index.data()
+        painter.save()
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+        card = option.rect.adjusted(CARD_MARGIN, 0, -CARD_MARGIN, -CARD_MARGIN)
+        background = self.colors["card_hover"] if option.state & QStyle.StateFlag.State_MouseOver else self.colors["card"]
+        painter.setPen(Qt.PenStyle.NoPen)
+        painter.setBrush(background)
+        painter.drawRoundedRect(card, 8, 8)
+
+        content = card.adjusted(CARD_PADDING, CARD_PADDING, -CARD_PADDING, -CARD_PADDING)
+        painter.setFont(self.date_font)
+        painter.setPen(self.colors["date"])
+        painter.drawText(QRect(content.left(), content.top(), content.width(), 24), Qt.AlignmentFlag.AlignLeft | Qt.AlignmentFlag.AlignVCenter, date_text)
+
+        painter.setFont(self.stats_font)
+        painter.setPen(self.colors["stats"])
+        line_top = content.top() + 32
+        for line in lines:
+            painter.drawText(QRect(content.left(), line_top, content.width(), 22), Qt.AlignmentFlag.AlignLeft | Qt.AlignmentFlag.AlignVCenter, painter.fontMetrics().elidedText(line, Qt.TextElideMode.ElideRight, content.width()))
+            line_top += 22
+        painter.restore()
+
+# --- 내 기록 표시 위젯 ---
+class RecordsWidget(QWidget):
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setObjectName("RecordsScreen")
+        self.setStyleSheet(CARD_STYLESHEET)
+
+        main_layout = QVBoxLayout(self)
+        main_layout.setAlignment(Qt.AlignmentFlag.AlignCenter)
+
+        container = QWidget()
+        container.setObjectName("MenuContainer")
+        container.setFixedWidth(500)
+        container_layout = QVBoxLayout(container)
+
+        self.title_label = QLabel("운동 기록")
+        self.title_label.setObjectName("TitleLabel")
+        self.title_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        container_layout.addWidget(self.title_label)
+
+        self.model = RecordListModel(self)
+        self.list_view = QListView()
+        self.list_view.setObjectName("RecordListView")
+        self.list_view.setModel(self.model)
+        self.list_view.setItemDelegate(RecordCardDelegate(self.list_view))
+        self.list_view.setUniformItemSizes(True)
+        self.list_view.setMouseTracking(True)
+        self.list_view.setSelectionMode(QAbstractItemView.SelectionMode.NoSelection)
+        self.list_view.setVerticalScrollMode(QAbstractItemView.ScrollMode.ScrollPerPixel)
+        self.list_view.setHorizontalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAlwaysOff)
+        container_layout.addWidget(self.list_view)
+
+        self.status_label = QLabel("아직 저장된 기록이 없습니다.")
+        self.status_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        self.status_label.hide()
+        container_layout.addWidget(self.status_label)
+
+        self.back_button = QPushButton("뒤로가기")
+        container_layout.addWidget(self.back_button)
+        main_layout.addWidget(container)
+
+        self.model.first_page_loaded.connect(self.on_first_page_loaded)
+        self.model.load_failed.connect(self.on_load_failed)
+
+    def load_records(self, exercise_type):
+        """첫 페이지 요청만 보내고 바로 반환합니다. 나머지는 스크롤에 따라 불러옵니다."""
+        self.title_label.setText(f"'{exercise_type}' 운동 기록")
+        self.status_label.hide()
+        self.list_view.show()
+        self.model.set_exercise(exercise_type)
+
+    def on_first_page_loaded(self, has_records):
+        if not has_records:
+            self.list_view.hide()
+            self.status_label.setText("아직 저장된 기록이 없습니다.")
+            self.status_label.show()
+
+    def on_load_failed(self, message):
+        self.status_label.setText(message)
+        self.status_label.show()
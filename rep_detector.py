@@ -0,0 +1,96 @@
+# rep_detector.py
+# 주 관절 각도(푸쉬업: 팔꿈치, 스쿼트: 무릎)를 한 프레임씩 받아 반복 동작을 실시간으로 나누는 검출기
+# 히스테리시스(내려감/올라옴 기준 각도 두 개)로 단계를 바꾸고, 단계 안에서는 극값(위쪽 최대, 아래쪽 최소)의 시각을 추적해
+# 반복이 끝나는 프레임에 시작/끝 시각, 최저/최고 각도, 내려가는/올라오는 시간(템포)을 담은 기록 하나를 반환합니다.
+#
+# 프레임마다 하는 일은 고정 크기 링 버퍼에 (시각, 각도)를 쓰고 스칼라 몇 개를 비교하는 것뿐이라 O(1)이며 새 객체를 만들지 않습니다.
+# 링 버퍼에는 최근 capacity개의 각도 시계열이 남아 있어, 방금 끝난 반복의 각도 곡선을 trace()로 꺼내 볼 수 있습니다.
+from collections import namedtuple
+import numpy as np
+
+DEFAULT_CAPACITY = 512     # 30fps 기준 약 17초
+EXTREMUM_TOLERANCE = 3.0   # 위에서 멈춰 있을 때 이 각도(도) 안의 흔들림은 같은 극값으로 보고, 마지막으로 머문 시각을 반복 시작으로 씀
+
+UP, DOWN = 'up', 'down'
+
+class RepRecord(namedtuple("RepRecord", "start bottom end min_angle max_angle first_sample last_sample")):
+    """
+    반복 한 번의 기록입니다. start는 내려가기 시작한 시각(위쪽 극값), bottom은 가장 깊이 내려간 시각, end는 다시 올라온 시각이며
+    first_sample/last_sample은 링 버퍼의 샘플 번호입니다. (trace() 참고)
+    """
+    __slots__ = ()
+
+    @property
+    def duration(self):
+        return self.end - self.start
+
+    @property
+    def eccentric(self):
+        """내려가는 데 걸린 시간(초)"""
+        return self.bottom - self.start
+
+    @property
+    def concentric(self):
+        """올라오는 데 걸린 시간(초)"""
+        return self.end - self.bottom
+
+    def to_dict(self):
+        return {
+            "start": self.start, "end": self.end, "duration": self.duration,
+            "min_angle": self.min_angle, "max_angle": self.max_angle,
+            "eccentric": self.eccentric, "concentric": self.concentric,
+        }
+
+class RepDetector:
+    """
+    update(timestamp, angle)를 프레임마다 호출합니다. 반복이 끝난 프레임에서만 RepRecord를, 나머지는 None을 반환합니다.
+    현재 단계는 stage('up' 또는 'down')이며, angle이 threshold_down 아래로 내려가면 'down', threshold_up 위로 올라오면
+    반복 하나를 끝내고 'up'이 됩니다. 두 기준 사이의 흔들림으로는 단계가 바뀌지 않습니다.
+    """
+    def __init__(self, threshold_down, threshold_up, capacity=DEFAULT_CAPACITY):
+        self.threshold_down, self.threshold_up = threshold_down, threshold_up
+        self.capacity = capacity
+        self.times = np.zeros(capacity, dtype=np.float64)
+        self.angles = np.zeros(capacity, dtype=np.float64)
+        self.samples = 0  # 지금까지 받은 샘플 수 (다음 샘플의 번호)
+        self.reset()
+
+    def reset(self):
+        """진행 중인 반복을 버리고 'up' 단계에서 다시 시작합니다. (세트 사이 휴식 뒤 등) 링 버퍼는 그대로 둡니다."""
+        self.stage = UP
+        self.top_angle = self.top_time = self.top_sample = None
+        self.bottom_angle = self.bottom_time = None
+
+    def update(self, timestamp, angle):
+        sample = self.samples
+        slot = sample % self.capacity
+        self.times[slot] = timestamp
+        self.angles[slot] = angle
+        self.samples = sample + 1
+
+        if self.stage == UP:
+            # 위쪽 극값: 지금까지의 최대 각도 근처에 마지막으로 머문 시각 (일어선 채 쉬는 시간은 반복에 넣지 않음)
+            if self.top_angle is None or angle >= self.top_angle - EXTREMUM_TOLERANCE:
+                self.top_time, self.top_sample = timestamp, sample
+                if self.top_angle is None or angle > self.top_angle: self.top_angle = angle
+            if angle < self.threshold_down:
+                self.stage = DOWN
+                self.bottom_angle, self.bottom_time = angle, timestamp
+            return None
+
+        # 아래쪽 극값: 가장 깊이 내려간 시각
+        if angle < self.bottom_angle:
+            self.bottom_angle, self.bottom_time = angle, timestamp
+        if angle <= self.threshold_up:
+            return None
+
+        rep = RepRecord(self.top_time, self.bottom_time, timestamp, self.bottom_angle, max(self.top_angle, angle), self.top_sample, sample)
+        self.stage = UP
+        self.top_angle, self.top_time, self.top_sample = angle, timestamp, sample
+        return rep
+
+    def trace(self, rep):
+        """rep 구간의 (시각 배열, 각도 배열) 복사본을 반환합니다. 링 버퍼에서 이미 밀려난 샘플이 있으면 None입니다."""
+        if rep.first_sample < self.samples - self.capacity: return None
+        index = np.arange(rep.first_sample, rep.last_sample + 1) % self.capacity
+        return self.times[index], self.angles[index]
@@ -0,0 +1,91 @@
+# roi_tracker.py
+# 이전 프레임의 랜드마크로 사람 주변 영역(ROI)만 잘라 포즈 모델에 넣어 추론 비용을 줄입니다.
+import os
+import cv2
+import numpy as np
+
+# ROI를 줄여 넣을 긴 변 길이(px). 작을수록 추론이 빠르지만 좌표가 흔들리므로 트레이너의 랜드마크 필터와 함께 줄입니다.
+INPUT_SIZE = int(os.getenv("AIHT_POSE_INPUT_SIZE", "256"))
+# 추적 성공으로 보는 몸통 랜드마크 (좌우 어깨 11, 12 / 좌우 엉덩이 23, 24)
+TORSO_LANDMARKS = (11, 12, 23, 24)
+
+class PoseRoiTracker:
+    """
+    MediaPipe Pose를 감싸는 추적기입니다. pose.process(image_rgb)와 같은 방식으로 호출할 수 있으며,
+    반환되는 랜드마크는 항상 전체 프레임 기준의 정규화 좌표입니다.
+    몸통 랜드마크가 min_torso개 이상 보이지 않으면 추적을 놓친 것으로 보고 같은 프레임을 전체 화면에서 다시 찾습니다.
+    """
+    def __init__(self, pose_model, input_size=INPUT_SIZE, search_size=640, padding=0.3, min_visibility=0.5, min_torso=2):
+        self.pose_model = pose_model
+        self.input_size = input_size      # ROI를 줄여 넣을 긴 변 길이(px)
+        self.search_size = search_size    # 전체 화면 탐색 시 줄여 넣을 긴 변 길이(px)
+        self.padding = padding            # 랜드마크 경계 상자에 더할 여백 (상자 크기 대비 비율)
+        self.min_visibility = min_visibility
+        self.min_torso = min_torso         # 보여야 하는 몸통 랜드마크 수 (TORSO_LANDMARKS 중)
+        self.roi = None                   # (x0, y0, x1, y1), 전체 프레임 기준 정규화 좌표
+        self.lost_count = 0
+
+    def reset(self):
+        self.roi = None
+
+    def process(self, image_rgb):
+        if self.roi is not None:
+            results = self._process_region(image_rgb, self.roi, self.input_size)
+            if self._is_tracked(results):
+                self._update_roi(results.pose_landmarks)
+                return results
+            # 추적 실패: 같은 프레임에서 전체 화면으로 다시 탐색
+            self.roi = None
+            self.lost_count += 1
+        results = self._process_region(image_rgb, (0.0, 0.0, 1.0, 1.0), self.search_size)
+        if self._is_tracked(results):
+            self._update_roi(results.pose_landmarks)
+        return results
+
+    def _process_region(self, image_rgb, roi, max_side):
+        """ROI를 잘라 긴 변이 max_side가 되도록 줄여 추론하고, 랜드마크를 전체 프레임 좌표로 되돌립니다."""
+        h, w = image_rgb.shape[:2]
+        x0, y0 = int(roi[0] * w), int(roi[1] * h)
+        x1, y1 = max(int(roi[2] * w), x0 + 1), max(int(roi[3] * h), y0 + 1)
+        crop = image_rgb[y0:y1, x0:x1]
+        crop_h, crop_w = crop.shape[:2]
+        scale = max_side / max(crop_h, crop_w)
+        if scale < 1.0:
+            crop = cv2.resize(crop, (max(int(crop_w * scale), 1), max(int(crop_h * scale), 1)), interpolation=cv2.INTER_AREA)
+        else:
+            crop = np.ascontiguousarray(crop)  # 잘라낸 뷰는 행 간격이 원본 너비라서 연속 배열로 복사해 넘김
+
+        results = self.pose_model.process(crop)
+        if results.pose_landmarks and (x0, y0, x1, y1) != (0, 0, w, h):
+            # 크기를 일정 비율로 줄인 것은 정규화 좌표에 영향이 없으므로 잘라낸 위치만 보정
+            sx, sy = crop_w / w, crop_h / h
+            ox, oy = x0 / w, y0 / h
+            for lm in results.pose_landmarks.landmark:
+                lm.x = ox + lm.x * sx
+                lm.y = oy + lm.y * sy
+                lm.z = lm.z * sx
+        return results
+
+    def _is_tracked(self, results):
+        if not results.pose_landmarks: return False
+        landmarks = results.pose_landmarks.landmark
+        return sum(landmarks[i].visibility > self.min_visibility for i in TORSO_LANDMARKS) >= self.min_torso
+
+    def _update_roi(self, pose_landmarks):
+        """
+        보이는 랜드마크의 경계 상자에 여백을 더해 다음 ROI를 정합니다.
+        사람이 현재 ROI 안쪽에 충분히 머물러 있으면 ROI를 그대로 두어,
+        MediaPipe 내부 추적이 매 프레임 바뀌는 입력 좌표계 때문에 흔들리지 않도록 합니다.
+        """
+        points = [(lm.x, lm.y) for lm in pose_landmarks.landmark if lm.visibility > self.min_visibility]
+        xs, ys = [p[0] for p in points], [p[1] for p in points]
+        bx0, by0, bx1, by1 = min(xs), min(ys), max(xs), max(ys)
+
+        if self.roi is not None:
+            rx0, ry0, rx1, ry1 = self.roi
+            margin_x, margin_y = (rx1 - rx0) * self.padding / 3, (ry1 - ry0) * self.padding / 3
+            if bx0 > rx0 + margin_x and by0 > ry0 + margin_y and bx1 < rx1 - margin_x and by1 < ry1 - margin_y:
+                return
+
+        pad = self.padding * max(bx1 - bx0, by1 - by0, 0.1)
+        self.roi = (max(bx0 - pad, 0.0), max(by0 - pad, 0.0), min(bx1 + pad, 1.0), min(by1 + pad, 1.0))
@@ -0,0 +1,245 @@
+# session_host.py
+# PC 한 대에서 여러 사람의 운동 세션(카메라 또는 영상 하나씩)을 동시에 실행하는 세션 호스트
+# 세션마다 워커 프로세스 하나를 쓰며, 워커 수는 코어 수에 맞추고 워커마다 전용 CPU 코어를 묶어(affinity) 줍니다.
+# 워커는 spawn으로 새로 띄우고 cv2/numpy를 import하기 전에 스레드 수를 제한하므로, 세션끼리 코어를 두고 다투지 않습니다.
+# 워커 프로세스는 트레이너 모듈을 한 번 import하고, Pose 모델은 세션마다 새로 만듭니다. (한 워커가 영상 여러 개를 차례로 실행해도 추적 상태가 넘어가지 않음)
+# 실행 중에는 세션별 화면/추론 fps를 주기적으로 출력하고, 끝나면 세션별 요약을 JSON으로 저장할 수 있습니다.
+#
+# 세션 지정: <운동>:<카메라 번호 또는 영상 경로>
+# 사용 예:
+#   python session_host.py squat:0 pushup:1 --duration 120
+#   python session_host.py squat:videos/a.mp4 squat:videos/b.mp4 pushup:videos/c.mp4 --realtime -o profiles/host.json
+import argparse
+import importlib
+import json
+import multiprocessing
+import os
+import queue
+import signal
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from multiprocessing.managers import SyncManager
+from exercises import TRAINER_MODULES
+
+REPORT_INTERVAL = 2.0      # 워커가 진행 상황을 보내는 간격(초)
+DEFAULT_TARGET_FPS = 15.0  # 세션이 버티는지 판단하는 추론 fps 기준
+# 워커에서 import 전에 설정하는 스레드 수 환경 변수 (numpy/OpenCV가 쓰는 BLAS, OpenMP 스레드 풀)
+THREAD_ENV_VARS = ("OMP_NUM_THREADS", "OPENBLAS_NUM_THREADS", "MKL_NUM_THREADS", "NUMEXPR_NUM_THREADS")
+
+def available_cpus():
+    """이 프로세스가 쓸 수 있는 CPU 번호 목록입니다. (affinity를 지원하지 않는 OS에서는 0..cpu_count-1)"""
+    if hasattr(os, "sched_getaffinity"): return sorted(os.sched_getaffinity(0))
+    return list(range(os.cpu_count() or 1))
+
+def parse_session(spec):
+    """'squat:0' → ('squat', 0), 'pushup:videos/a.mp4' → ('pushup', 'videos/a.mp4')"""
+    exercise, _, source = spec.partition(":")
+    if not source: raise argparse.ArgumentTypeError(f"세션은 <운동>:<카메라 번호 또는 영상 경로> 형식이어야 합니다: {spec}")
+    return exercise, int(source) if source.isdigit() else source
+
+# --- 워커 프로세스 ---
+
+def ignore_interrupt():
+    """Ctrl+C는 호스트만 받아 stop_event로 세션을 멈추게 하고, 워커/매니저 프로세스는 중간에 끊기지 않도록 무시합니다."""
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+def init_worker(threads):
+    """워커 프로세스를 초기화합니다. cv2/mediapipe/numpy를 import하기 전에 스레드 수를 제한하고 오디오는 끕니다."""
+    ignore_interrupt()
+    for name in THREAD_ENV_VARS: os.environ[name] = str(threads)
+    os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+    import cv2
+    cv2.setNumThreads(threads)
+
+class PacedCapture:
+    """영상 파일을 원래 fps에 맞춰 읽습니다. (--realtime, 카메라처럼 실제 속도로 들어오는 입력을 흉내)"""
+    def __init__(self, cap, fps):
+        self.cap, self.interval = cap, 1.0 / (fps or 30.0)
+        self.next_frame = None
+
+    def read(self):
+        now = time.perf_counter()
+        if self.next_frame is None: self.next_frame = now
+        elif self.next_frame > now: time.sleep(self.next_frame - now)
+        self.next_frame += self.interval
+        return self.cap.read()
+
+    def __getattr__(self, name):
+        return getattr(self.cap, name)
+
+def open_source(source, realtime):
+    import cv2
+    cap = cv2.VideoCapture(source)
+    if not cap.isOpened(): return None
+    if realtime and not isinstance(source, int): return PacedCapture(cap, cap.get(cv2.CAP_PROP_FPS))
+    return cap
+
+def session_stats(profiler, app_state, elapsed):
+    inference = profiler.stages.get("pose.process")
+    elapsed = max(elapsed, 1e-6)
+    return {
+        "seconds": round(elapsed, 1),
+        "fps": round(profiler.frames.count / elapsed, 1),
+        "infer_fps": round(inference.count / elapsed, 1) if inference else 0.0,
+        "inference_ms": inference.summary_ms() if inference else None,
+        "reps": sum(len(result["reps"]) for result in app_state["set_results"]) + len(app_state["set_reps"]),
+        "workout_state": app_state["workout_state"],
+    }
+
+def run_hosted_session(session_id, exercise, source, options, cpu_slots, reports, stop_event):
+    """
+    세션 하나를 끝까지(영상 끝, 운동 완료, --duration, 또는 호스트 중지) 실행하고 요약을 반환합니다.
+    cpu_slots에서 CPU 묶음 하나를 빌려 이 프로세스를 그 코어에 묶고, 끝나면 돌려줍니다.
+    """
+    from frame_profiler import FrameProfiler
+    import shared_pose
+    cpus, pose = None, None
+    try:
+        cpus = cpu_slots.get()
+        if hasattr(os, "sched_setaffinity"): os.sched_setaffinity(0, cpus)
+        trainer = importlib.import_module(TRAINER_MODULES[exercise])
+        if options["reps"] is not None: trainer.SET_GOAL = options["reps"]
+        if options["sets"] is not None: trainer.TOTAL_SETS_GOAL = options["sets"]
+        if options["rest"] is not None: trainer.REST_DURATION = options["rest"]
+        # 세션마다 새 측정기를 넘겨 단계 시간을 기록 (화면 표시는 하지 않음)
+        profiler = FrameProfiler(enabled=True, show_overlay=False)
+
+        cap = open_source(source, options["realtime"])
+        if cap is None:
+            return {"session": session_id, "exercise": exercise, "source": source, "error": "입력을 열 수 없습니다."}
+        # 앞 세션의 추적 상태가 이 세션의 첫 프레임에 섞이지 않도록 세션마다 새 모델 (batch_analyzer.analyze_video와 같음)
+        pose = shared_pose.create_pose()
+        app_state = trainer.new_app_state()
+        started = time.perf_counter()
+        control = {"last_report": started}
+
+        def show_frame(display):
+            keep_running = True
+            if options["show"]:
+                import cv2
+                cv2.imshow(f"{trainer.WINDOW_TITLE} #{session_id}", display)
+                keep_running = cv2.waitKey(1) & 0xFF != 27
+            now = time.perf_counter()
+            if now - control["last_report"] >= REPORT_INTERVAL:
+                reports.put((session_id, session_stats(profiler, app_state, now - started)))
+                control["last_report"] = now
+            if options["duration"] and now - started >= options["duration"]: keep_running = False
+            return keep_running and not stop_event.is_set()
+
+        try:
+            trainer.run_session(cap, app_state, show_frame, session_profiler=profiler, pose=pose)
+        finally:
+            cap.release()
+        stats = session_stats(profiler, app_state, time.perf_counter() - started)
+        stats.update({"session": session_id, "exercise": exercise, "source": source, "pid": os.getpid(), "cpus": sorted(cpus),
+                      "stages": {name: h.summary_ms() for name, h in profiler.stages.items()}})
+        return stats
+    finally:
+        if pose is not None: pose.close()
+        if cpus is not None: cpu_slots.put(cpus)
+
+# --- 명령줄 진입점 ---
+
+def print_progress(sessions, latest):
+    line = "  ".join(f"#{i} {sessions[i][0]}:{sessions[i][1]} {s['fps']:.1f}/{s['infer_fps']:.1f}fps {s['reps']}회"
+                     for i, s in sorted(latest.items()))
+    print(f"[화면/추론] {line}", flush=True)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="여러 운동 세션을 코어별 워커 프로세스에서 동시에 실행하고 세션별 fps를 보고합니다.")
+    parser.add_argument("sessions", nargs="+", type=parse_session, help="<운동>:<카메라 번호 또는 영상 경로>")
+    parser.add_argument("--threads", type=int, default=2, help="세션 하나가 쓰는 CPU 코어/스레드 수")
+    parser.add_argument("-j", "--workers", type=int, help="워커 프로세스 수 (기본값: 코어 수 / --threads, 세션 수 이하)")
+    parser.add_argument("--duration", type=float, help="세션마다 최대 실행 시간(초)")
+    parser.add_argument("--reps", type=int, help="세트당 목표 횟수 (기본값: 트레이너 기본값)")
+    parser.add_argument("--sets", type=int, help="목표 세트 수")
+    parser.add_argument("--rest", type=int, help="세트 사이 휴식 시간(초)")
+    parser.add_argument("--realtime", action="store_true", help="영상 파일을 원래 fps로 읽기 (카메라 흉내)")
+    parser.add_argument("--show", action="store_true", help="세션마다 OpenCV 창으로 화면 표시")
+    parser.add_argument("--target-fps", type=float, default=DEFAULT_TARGET_FPS, help="세션이 버티는지 판단하는 추론 fps")
+    parser.add_argument("-o", "--output", help="세션별 요약 JSON 파일")
+    args = parser.parse_args(argv)
+
+    for exercise, _ in args.sessions:
+        if exercise not in TRAINER_MODULES: parser.error(f"알 수 없는 운동입니다: {exercise} (가능: {', '.join(TRAINER_MODULES)})")
+
+    cpus = available_cpus()
+    threads = max(1, min(args.threads, len(cpus)))
+    workers = max(1, min(args.workers or len(cpus) // threads, len(args.sessions)))
+    if len(args.sessions) > workers:
+        print(f"세션 {len(args.sessions)}개 중 {workers}개만 동시에 실행하고 나머지는 앞 세션이 끝나면 시작합니다.", file=sys.stderr)
+    print(f"CPU {len(cpus)}개, 워커 {workers}개, 세션당 {threads}코어", file=sys.stderr)
+
+    context = multiprocessing.get_context("spawn")  # mediapipe/OpenCV 상태를 물려받지 않도록 워커는 새로 띄움
+    manager = SyncManager(ctx=context)
+    manager.start(ignore_interrupt)
+    cpu_slots, reports, stop_event = manager.Queue(), manager.Queue(), manager.Event()
+    # 코어를 겹치지 않게 workers개 묶음으로 나눔 (코어가 모자라면 묶음끼리 돌려 씀)
+    for slot in range(workers):
+        cpu_slots.put({cpus[(slot * threads + k) % len(cpus)] for k in range(threads)})
+    options = {"reps": args.reps, "sets": args.sets, "rest": args.rest, "duration": args.duration,
+               "realtime": args.realtime, "show": args.show}
+
+    results, latest = [], {}
+    try:
+        with ProcessPoolExecutor(max_workers=workers, mp_context=context, initializer=init_worker, initargs=(threads,)) as executor:
+            futures = {executor.submit(run_hosted_session, i, exercise, source, options, cpu_slots, reports, stop_event): i
+                       for i, (exercise, source) in enumerate(args.sessions)}
+            pending = set(futures)
+
+            def collect(future):
+                """끝난 future의 결과를 모읍니다. 워커에서 올라온 예외(KeyboardInterrupt 포함)나 취소도 오류 결과로 남깁니다."""
+                try:
+                    results.append(future.result())
+                except BaseException as e:
+                    exercise, source = args.sessions[futures[future]]
+                    message = "시작하기 전에 취소되었습니다." if future.cancelled() else f"세션 실행 중 오류 발생: {e!r}"
+                    results.append({"session": futures[future], "exercise": exercise, "source": source, "error": message})
+
+            try:
+                while pending:
+                    done, _ = wait(pending, timeout=REPORT_INTERVAL, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        pending.discard(future)
+                        collect(future)
+                    while True:
+                        try:
+                            session_id, stats = reports.get_nowait()
+                        except queue.Empty:
+                            break
+                        latest[session_id] = stats
+                    for result in results: latest.pop(result["session"], None)
+                    if latest: print_progress(args.sessions, latest)
+            except KeyboardInterrupt:
+                print("세션을 멈추는 중...", file=sys.stderr)
+                stop_event.set()
+                # 아직 시작하지 않은 세션은 취소하고, 실행 중인 세션은 stop_event를 보고 끝날 때까지 기다림
+                for future in pending: future.cancel()
+                wait(pending)
+                for future in pending: collect(future)
+    finally:
+        manager.shutdown()
+
+    results.sort(key=lambda result: result["session"])
+    print(f"{'세션':<6}{'운동':<8}{'입력':<24}{'화면 fps':>9}{'추론 fps':>9}{'추론 p95 ms':>12}{'반복':>6}  CPU")
+    sustained = 0
+    for result in results:
+        label = f"#{result['session']:<5}{result['exercise']:<8}{str(result['source'])[-23:]:<24}"
+        if "error" in result:
+            print(f"{label}{result['error']}")
+            continue
+        p95 = result["inference_ms"]["p95_ms"] if result["inference_ms"] else 0.0
+        print(f"{label}{result['fps']:>9.1f}{result['infer_fps']:>9.1f}{p95:>12.1f}{result['reps']:>6}  {','.join(map(str, result['cpus']))}")
+        sustained += result["infer_fps"] >= args.target_fps
+    print(f"추론 {args.target_fps:.0f}fps 이상 유지한 세션: {sustained}/{len(results)} (동시 실행 {workers}개)")
+
+    if args.output:
+        if os.path.dirname(args.output): os.makedirs(os.path.dirname(args.output), exist_ok=True)
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump({"cpus": len(cpus), "workers": workers, "threads_per_session": threads, "target_fps": args.target_fps,
+                       "sustained": sustained, "sessions": results}, f, ensure_ascii=False, indent=2)
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
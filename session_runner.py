@@ -0,0 +1,240 @@
+# session_runner.py
+# 운동 세션을 별도 프로세스 대신 메인 메뉴 프로세스 안에서 실행합니다.
+# 트레이너 모듈(cv2, mediapipe, pygame)과 Pose 모델은 메뉴가 뜬 뒤 백그라운드에서 한 번만 불러오므로,
+# '운동 시작'을 누르면 카메라만 열고 바로 화면이 나옵니다. 운동 로직과 UI는 각 트레이너 모듈의 것을 그대로 사용합니다.
+#
+# OpenCV 창과 Qt가 한 프로세스에서 충돌하는 환경에서는 상주 워커 프로세스(trainer_worker)에 세션을 맡기는
+# TrainerWorkerClient를 사용합니다. 워커도 예열을 한 번만 하므로 두 번째 운동부터는 카메라만 열면 됩니다.
+import importlib
+import multiprocessing
+import threading
+import time
+import cv2
+from PyQt6.QtWidgets import QWidget, QVBoxLayout, QLabel, QSizePolicy
+from PyQt6.QtGui import QImage, QPixmap
+from PyQt6.QtCore import Qt, QObject, QThread, QTimer, pyqtSignal
+from exercises import TRAINER_MODULES
+from trainer_worker import worker_main
+
+WINDOW_SIZE = (1280, 720)
+WORKER_POLL_MS = 50
+MAX_WORKER_RESTARTS = 3   # 이 시간 안에 이만큼 연달아 죽으면 더 이상 다시 띄우지 않음
+WORKER_RESTART_WINDOW = 60.0
+
+# --- 백그라운드 예열 ---
+
+class TrainerWarmup(QThread):
+    """트레이너 모듈을 미리 import하고, 공용 Pose 모델 로딩과 첫 추론, 효과음 디코딩(mixer 초기화)을 끝내 둡니다."""
+    ready = pyqtSignal(float)  # 걸린 시간(초)
+    failed = pyqtSignal(str)
+
+    def run(self):
+        start = time.perf_counter()
+        try:
+            for module_name in TRAINER_MODULES.values():
+                importlib.import_module(module_name)
+            import shared_pose, sound_cues
+            shared_pose.get_pose()
+            sound_cues.get_bank()
+        except Exception as e:
+            self.failed.emit(f"트레이너 예열 실패: {e}")
+            return
+        self.ready.emit(time.perf_counter() - start)
+
+# --- 세션 스레드 ---
+
+class WorkoutSession(QThread):
+    """
+    트레이너 모듈의 run_session()을 이 스레드에서 실행하고, 그려진 프레임을 GUI 스레드로 넘깁니다.
+    GUI가 이전 프레임을 아직 가져가지 않았으면 새 프레임으로 덮어써서 화면이 밀리지 않게 합니다.
+    """
+    frame_ready = pyqtSignal()
+    session_failed = pyqtSignal(str)
+
+    def __init__(self, exercise, reps, sets, rest, camera_index=0, camera_service=None, parent=None):
+        """camera_service(CameraService)를 넘기면 이미 열려 있는 캡처를 빌려 쓰고, 끝나면 돌려줍니다."""
+        super().__init__(parent)
+        self.exercise, self.reps, self.sets, self.rest = exercise, reps, sets, rest
+        self.camera_index, self.camera_service = camera_index, camera_service
+        self.window_title = "AI Home Trainer"
+        self.completed = False
+        self.stop_event = threading.Event()
+        self.frame_lock = threading.Lock()
+        self.latest_frame = None
+
+    def stop(self):
+        self.stop_event.set()
+
+    def show_frame(self, display):
+        """트레이너 루프에서 호출됩니다. False를 반환하면 루프가 끝납니다."""
+        height, width = display.shape[:2]
+        image = QImage(display.data, width, height, display.strides[0], QImage.Format.Format_BGR888).copy()
+        with self.frame_lock:
+            pending = self.latest_frame is not None
+            self.latest_frame = image
+        if not pending: self.frame_ready.emit()
+        return not self.stop_event.is_set()
+
+    def open_camera(self):
+        if self.camera_service is not None: return self.camera_service.acquire(self.camera_index)
+        cap = cv2.VideoCapture(self.camera_index)
+        return cap if cap.isOpened() else None
+
+    def close_camera(self, cap, failed):
+        if self.camera_service is not None: self.camera_service.release(cap, self.camera_index, failed)
+        else: cap.release()
+
+    def take_frame(self):
+        with self.frame_lock:
+            image, self.latest_frame = self.latest_frame, None
+        return image
+
+    def run(self):
+        try:
+            # 예열이 끝나지 않았으면 import가 끝날 때까지 여기서 기다린다
+            trainer = importlib.import_module(TRAINER_MODULES[self.exercise])
+            trainer.SET_GOAL, trainer.TOTAL_SETS_GOAL, trainer.REST_DURATION = self.reps, self.sets, self.rest
+            self.window_title = trainer.WINDOW_TITLE
+            cap = self.open_camera()
+            if cap is None:
+                self.session_failed.emit("카메라를 열 수 없습니다.")
+                return
+            app_state = trainer.new_app_state()
+            try:
+                trainer.run_session(cap, app_state, self.show_frame)
+            finally:
+                # 완료하지도, 멈추지도 않았는데 루프가 끝났다면 프레임을 읽지 못한 것
+                capture_failed = not app_state["workout_completed"] and not self.stop_event.is_set()
+                self.close_camera(cap, capture_failed)
+            trainer.finish_session(app_state)
+            self.completed = app_state["workout_completed"]
+        except Exception as e:
+            self.session_failed.emit(f"운동 세션 실행 중 오류 발생: {e}")
+
+# --- 세션 화면 ---
+
+class WorkoutWindow(QWidget):
+    """세션 프레임을 표시하는 최상위 창입니다. ESC를 누르거나 창을 닫으면 세션을 멈춥니다."""
+    def __init__(self, session):
+        super().__init__()
+        self.session = session
+        self.setWindowTitle(session.window_title)
+        self.resize(*WINDOW_SIZE)
+        self.setStyleSheet("background-color: black; color: white; font-size: 20px;")
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+        self.video_label = QLabel("카메라 준비중...")
+        self.video_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        self.video_label.setSizePolicy(QSizePolicy.Policy.Ignored, QSizePolicy.Policy.Ignored)
+        layout.addWidget(self.video_label)
+        session.frame_ready.connect(self.update_frame)
+
+    def update_frame(self):
+        image = self.session.take_frame()
+        if image is None: return
+        if self.windowTitle() != self.session.window_title: self.setWindowTitle(self.session.window_title)
+        pixmap = QPixmap.fromImage(image)
+        if pixmap.size() != self.video_label.size():
+            pixmap = pixmap.scaled(self.video_label.size(), Qt.AspectRatioMode.KeepAspectRatio, Qt.TransformationMode.FastTransformation)
+        self.video_label.setPixmap(pixmap)
+
+    def keyPressEvent(self, event):
+        if event.key() == Qt.Key.Key_Escape: self.session.stop()
+        else: super().keyPressEvent(event)
+
+    def closeEvent(self, event):
+        self.session.stop()
+        super().closeEvent(event)
+
+# --- 상주 워커 프로세스 클라이언트 ---
+
+class TrainerWorkerClient(QObject):
+    """
+    trainer_worker 프로세스를 띄우고 파이프로 명령을 보냅니다. 워커가 보낸 메시지는 GUI 스레드에서 주기적으로 읽어 시그널로 알립니다.
+    워커가 비정상 종료되면 진행 중이던 세션을 실패로 알리고 새 워커를 띄웁니다.
+    """
+    ready = pyqtSignal(float)
+    first_frame = pyqtSignal(float)
+    frame_bus_ready = pyqtSignal(str)  # 워커가 카메라 프레임을 올리는 공유 메모리 이름
+    progress = pyqtSignal(dict)
+    session_finished = pyqtSignal(dict)
+    session_failed = pyqtSignal(str)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.context = multiprocessing.get_context("spawn")  # Qt 상태를 물려받지 않도록 fork 대신 spawn
+        self.process, self.conn = None, None
+        self.busy = False
+        self.cameras = None  # 워커의 CameraService가 조사한 장치 목록
+        self.restart_times = []
+        self.poll_timer = QTimer(self)
+        self.poll_timer.timeout.connect(self.poll)
+
+    def start(self):
+        self.conn, child_conn = self.context.Pipe()
+        self.process = self.context.Process(target=worker_main, args=(child_conn,), daemon=True)
+        self.process.start()
+        child_conn.close()
+        self.poll_timer.start(WORKER_POLL_MS)
+
+    def camera_available(self):
+        """워커가 보내온 장치 목록으로 기본 카메라 여부를 반환합니다. 아직 모르면 None입니다."""
+        if self.cameras is None: return None
+        return any(device["index"] == 0 for device in self.cameras)
+
+    def start_session(self, exercise, reps, sets, rest):
+        """워커가 아직 예열 중이면 명령은 파이프에 쌓였다가 예열이 끝난 뒤 실행됩니다."""
+        if self.process is None or not self.process.is_alive(): self.start()
+        self.busy = True
+        self.conn.send(("start", {"exercise": exercise, "reps": reps, "sets": sets, "rest": rest}))
+
+    def notify_hotplug(self):
+        if self.process is not None and self.process.is_alive(): self.conn.send(("hotplug", None))
+
+    def stop_session(self):
+        if self.busy: self.conn.send(("stop", None))
+
+    def poll(self):
+        try:
+            while self.conn.poll():
+                kind, payload = self.conn.recv()
+                if kind == "ready": self.ready.emit(payload)
+                elif kind == "first_frame": self.first_frame.emit(payload)
+                elif kind == "progress": self.progress.emit(payload)
+                elif kind == "cameras": self.cameras = payload
+                elif kind == "frame_bus": self.frame_bus_ready.emit(payload)
+                elif kind == "finished":
+                    self.busy = False
+                    self.session_finished.emit(payload)
+                elif kind == "failed":
+                    self.busy = False
+                    self.session_failed.emit(payload)
+        except (EOFError, OSError):
+            pass  # 워커가 죽은 경우, 아래에서 처리
+        if not self.process.is_alive(): self.handle_crash()
+
+    def handle_crash(self):
+        self.poll_timer.stop()
+        self.conn.close()
+        print(f"트레이너 워커가 종료되었습니다. (exit code {self.process.exitcode})")
+        if self.busy:
+            self.busy = False
+            self.session_failed.emit("트레이너 프로세스가 비정상 종료되었습니다.")
+        now = time.monotonic()
+        self.restart_times = [t for t in self.restart_times if now - t < WORKER_RESTART_WINDOW] + [now]
+        if len(self.restart_times) > MAX_WORKER_RESTARTS:
+            print("트레이너 워커가 계속 종료되어 자동 재시작을 중단합니다.")
+            self.process = None
+            return
+        self.start()
+
+    def shutdown(self, timeout=3.0):
+        if self.process is None: return
+        self.poll_timer.stop()
+        try:
+            self.conn.send(("shutdown", None))
+        except (BrokenPipeError, OSError):
+            pass
+        self.process.join(timeout)
+        if self.process.is_alive(): self.process.terminate()
+        self.process = None
@@ -0,0 +1,36 @@
+# shared_pose.py
+# 한 프로세스 안의 모든 트레이너가 함께 쓰는 MediaPipe Pose 모델
+# 모델은 get_pose()를 처음 부를 때(세션 시작 또는 예열) 한 번만 만들어지고, 만들 때 빈 프레임으로 한 번 추론해 둡니다.
+# 트레이너 모듈을 import하는 것만으로는 mediapipe를 불러오지 않으므로, 기록 재생처럼 추론이 필요 없는 도구는 모델 없이 씁니다.
+import os
+import threading
+import numpy as np
+
+WARMUP_FRAME_SHAPE = (480, 640, 3)
+# 모델 크기 (AIHT_POSE_COMPLEXITY): 0=lite, 1=full(기본값), 2=heavy
+# lite 모델은 좌표가 더 흔들리므로 트레이너의 랜드마크 필터(landmark_filter)와 함께 씁니다.
+MODEL_COMPLEXITY = int(os.getenv("AIHT_POSE_COMPLEXITY", "1"))
+
+_pose = None
+_lock = threading.Lock()
+
+def create_pose(model_complexity=None):
+    """
+    새 Pose 모델을 만듭니다. 영상 분석처럼 입력마다 추적 상태를 새로 시작해야 할 때 씁니다. (다 쓰면 close()로 닫음)
+    model_complexity를 넘기지 않으면 MODEL_COMPLEXITY를 씁니다.
+    """
+    import mediapipe as mp
+    return mp.solutions.pose.Pose(model_complexity=MODEL_COMPLEXITY if model_complexity is None else model_complexity)
+
+def get_pose():
+    """
+    프로세스 전역 Pose 모델을 반환합니다. 처음 호출할 때 모델을 불러오고 첫 추론(그래프 초기화)까지 끝냅니다.
+    여러 스레드에서 동시에 불러도 모델은 하나만 만들어집니다.
+    """
+    global _pose
+    with _lock:
+        if _pose is None:
+            pose = create_pose()
+            pose.process(np.zeros(WARMUP_FRAME_SHAPE, dtype=np.uint8))
+            _pose = pose
+        return _pose
@@ -0,0 +1,114 @@
+# sound_cues.py
+# sound/ 폴더의 효과음을 시작할 때 한 번 모두 디코딩해 메모리에 올려 두고, 고정된 채널 풀에서 우선순위에 따라 재생합니다.
+# 프레임 루프에서는 파일을 읽지 않으며, play()는 이미 디코딩된 소리를 채널에 넘기기만 합니다.
+import os
+import threading
+import time
+import pygame
+from frame_profiler import StageHistogram
+
+SOUND_DIR = 'sound'
+SUPPORTED_EXTENSIONS = ('.wav', '.mp3', '.ogg')
+MIXER_FREQUENCY = 44100
+MIXER_BUFFER = 512   # 출력 버퍼(샘플 수)가 작을수록 재생 지연이 짧음
+CHANNEL_COUNT = 4
+
+# 트레이너가 쓰는 신호 이름 → 파일 이름
+CUE_FILES = {
+    "good": "correct-choice-43861.mp3",
+    "bad": "063_삐삑 (오답 -짧은).mp3",
+    "set_complete": "0289-예_.wav",
+    "workout_complete": "0290-와우~~.mp3",
+    "keep_body_straight": "허리를곧게펴세요.wav",
+    "too_deep": "무릎이너무깊어요.wav",
+    "straighten_back": "등을곧게펴세요.wav",
+}
+# 숫자가 클수록 우선. 자세 교정 이상은 재생 중인 낮은 우선순위 소리(지난 GOOD 등)를 끊고 재생
+CUE_PRIORITIES = {"good": 1, "bad": 2, "keep_body_straight": 3, "too_deep": 3, "straighten_back": 3, "set_complete": 4, "workout_complete": 4}
+DEFAULT_PRIORITY = 1
+PREEMPT_PRIORITY = 3
+
+def init_mixer():
+    """mixer를 짧은 출력 버퍼로 초기화합니다. 오디오 장치가 없으면 False를 반환합니다."""
+    if pygame.mixer.get_init(): return True
+    try:
+        pygame.mixer.pre_init(MIXER_FREQUENCY, -16, 2, MIXER_BUFFER)
+        pygame.mixer.init()
+        return True
+    except pygame.error as e:
+        print(f"사운드 장치를 초기화할 수 없습니다: {e}")
+        return False
+
+class SoundCueBank:
+    def __init__(self, sound_dir=SOUND_DIR, channel_count=CHANNEL_COUNT):
+        self.sounds = {}
+        self.play_latency = StageHistogram()  # play() 호출에 걸린 시간
+        self._lock = threading.Lock()
+        self.enabled = init_mixer()
+        if not self.enabled: return
+
+        # sound/ 안의 모든 파일을 파일 이름(확장자 제외)으로, 트레이너 신호는 CUE_FILES의 이름으로도 찾을 수 있게 한다
+        by_file = {}
+        for file_name in sorted(os.listdir(sound_dir)) if os.path.isdir(sound_dir) else []:
+            if not file_name.lower().endswith(SUPPORTED_EXTENSIONS): continue
+            try:
+                by_file[file_name] = pygame.mixer.Sound(os.path.join(sound_dir, file_name))
+            except pygame.error as e:
+                print(f"사운드 로드 오류 ({file_name}): {e}")
+        self.sounds = {os.path.splitext(file_name)[0]: sound for file_name, sound in by_file.items()}
+        for cue, file_name in CUE_FILES.items():
+            if file_name in by_file: self.sounds[cue] = by_file[file_name]
+            else: print(f"효과음 파일이 없습니다: {cue} ({file_name})")
+
+        pygame.mixer.set_num_channels(max(pygame.mixer.get_num_channels(), channel_count))
+        pygame.mixer.set_reserved(channel_count)  # 풀의 채널은 다른 곳에서 자동으로 가져가지 않도록
+        self.channels = [pygame.mixer.Channel(i) for i in range(channel_count)]
+        self.playing = [(0, None)] * channel_count  # 채널별 (우선순위, 신호 이름)
+        print(f"효과음 {len(by_file)}개 로드, 출력 버퍼 {self.output_latency_ms():.1f}ms")
+
+    def output_latency_ms(self):
+        frequency, _, _ = pygame.mixer.get_init() or (MIXER_FREQUENCY, 0, 0)
+        return MIXER_BUFFER / frequency * 1000
+
+    def latency_summary(self):
+        """play() 호출 시간 분포와 mixer 출력 버퍼 지연을 반환합니다. 반복 판정부터 소리가 나기까지는 대략 두 값의 합입니다."""
+        return {"play_call": self.play_latency.summary_ms(), "output_buffer_ms": round(self.output_latency_ms(), 1) if self.enabled else None}
+
+    def play(self, cue):
+        """
+        cue를 재생합니다. 빈 채널이 없으면 우선순위가 같거나 낮은 채널을 빼앗고, 그것도 없으면 재생하지 않습니다.
+        자세 교정처럼 우선순위가 PREEMPT_PRIORITY 이상이면 재생 중인 낮은 우선순위 소리를 먼저 끊습니다.
+        """
+        if not self.enabled: return False
+        sound = self.sounds.get(cue)
+        if sound is None: return False
+        start = time.perf_counter_ns()
+        priority = CUE_PRIORITIES.get(cue, DEFAULT_PRIORITY)
+        with self._lock:
+            target, lowest = None, None
+            for index, channel in enumerate(self.channels):
+                busy_priority, _ = self.playing[index]
+                busy = channel.get_busy()
+                if busy and priority >= PREEMPT_PRIORITY and busy_priority < priority:
+                    channel.stop()
+                    busy = False
+                if not busy:
+                    if target is None: target = index
+                elif busy_priority <= priority and (lowest is None or busy_priority < self.playing[lowest][0]):
+                    lowest = index
+            if target is None: target = lowest
+            if target is None: return False
+            self.channels[target].play(sound)
+            self.playing[target] = (priority, cue)
+        self.play_latency.record(time.perf_counter_ns() - start)
+        return True
+
+_bank = None
+_bank_lock = threading.Lock()
+
+def get_bank():
+    """프로세스 전역 효과음 뱅크를 반환합니다. 처음 호출할 때 sound/ 폴더를 모두 디코딩합니다."""
+    global _bank
+    with _bank_lock:
+        if _bank is None: _bank = SoundCueBank()
+        return _bank
@@ -0,0 +1,134 @@
+# startup_benchmark.py
+# main_menu.py를 여러 번 새로 실행해서 첫 화면이 그려지기까지의 시간과 모듈별 import 시간을 측정합니다.
+# 결과는 JSON으로 저장하고, 기준 결과(baseline)와 비교해 느려진 항목이 있으면 종료 코드 1을 반환합니다.
+#
+# 사용 예:
+#   python startup_benchmark.py --offscreen -n 10 --save-baseline profiles/startup_baseline.json
+#   python startup_benchmark.py --offscreen -n 10 --baseline profiles/startup_baseline.json -o profiles/startup.json
+import argparse
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+import time
+
+FIRST_PAINT_MARKER = "FIRST_PAINT_MS"
+DEFAULT_RUNS = 5
+DEFAULT_TOLERANCE = 0.2      # 기준보다 20% 넘게 느려지면 회귀로 판단
+MIN_REGRESSION_MS = 5.0      # 이보다 작은 차이는 측정 잡음으로 보고 무시
+FIRST_PAINT_BUDGET_MS = 1000.0  # main_menu 시작부터 첫 화면까지의 목표 시간
+TOP_MODULES = 15
+# "import time:       123 |        456 | package.module" (들여쓰기 깊이 = import 중첩 깊이)
+IMPORTTIME_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+
+def parse_importtime(stderr):
+    """-X importtime 출력에서 main_menu가 직접 import한 모듈(들여쓰기 없는 줄)의 (self, 누적) 시간을 ms로 반환합니다."""
+    modules = {}
+    for line in stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if not match or len(match.group(3)) != 1: continue
+        self_us, cumulative_us, name = int(match.group(1)), int(match.group(2)), match.group(4)
+        modules[name] = {"self_ms": self_us / 1000, "cumulative_ms": cumulative_us / 1000}
+    return modules
+
+def run_once(script, env, timeout):
+    """main_menu를 벤치마크 모드로 한 번 실행합니다. (프로세스 실행~종료 ms, main_menu 안에서 잰 첫 화면까지 ms, 모듈별 import 시간)"""
+    started = time.perf_counter()
+    result = subprocess.run([sys.executable, "-X", "importtime", script], env=env, capture_output=True, text=True, timeout=timeout)
+    wall_ms = (time.perf_counter() - started) * 1000
+    in_process_ms = None
+    for line in result.stdout.splitlines():
+        if line.startswith(FIRST_PAINT_MARKER): in_process_ms = float(line.split()[1])
+    if in_process_ms is None:
+        raise RuntimeError(f"첫 화면 표시를 확인하지 못했습니다. (exit code {result.returncode})\n{result.stderr[-2000:]}")
+    return wall_ms, in_process_ms, parse_importtime(result.stderr)
+
+def benchmark(script, runs, offscreen, timeout):
+    env = dict(os.environ, AIHT_STARTUP_BENCHMARK="1")
+    if offscreen: env["QT_QPA_PLATFORM"] = "offscreen"
+    walls, in_process, imports = [], [], {}
+    run_once(script, env, timeout)  # 첫 실행은 .pyc 생성과 디스크 캐시 때문에 느리므로 버린다
+    for _ in range(runs):
+        wall_ms, in_process_ms, modules = run_once(script, env, timeout)
+        walls.append(wall_ms)
+        in_process.append(in_process_ms)
+        for name, times in modules.items():
+            imports.setdefault(name, []).append(times)
+
+    # 프로세스 실행 시간은 인터프리터 시작과 종료까지 포함하므로, 첫 화면까지의 시간은 main_menu 안에서 잰 값을 쓴다
+    return {
+        "runs": runs,
+        "python": sys.version.split()[0],
+        "process_ms": round(statistics.median(walls), 1),
+        "first_paint_ms": round(statistics.median(in_process), 1),
+        "imports": {
+            name: {key: round(statistics.median(t[key] for t in times), 2) for key in ("self_ms", "cumulative_ms")}
+            for name, times in sorted(imports.items(), key=lambda item: -statistics.median(t["cumulative_ms"] for t in item[1]))
+        },
+    }
+
+def find_regressions(result, baseline, tolerance):
+    """기준보다 tolerance 비율과 MIN_REGRESSION_MS를 모두 넘게 느려진 항목을 (이름, 기준, 현재) 목록으로 반환합니다."""
+    def slower(current, previous):
+        return current - previous > MIN_REGRESSION_MS and current > previous * (1 + tolerance)
+
+    regressions = []
+    if slower(result["first_paint_ms"], baseline["first_paint_ms"]):
+        regressions.append(("first_paint_ms", baseline["first_paint_ms"], result["first_paint_ms"]))
+    for name, times in result["imports"].items():
+        previous = baseline["imports"].get(name, {"cumulative_ms": 0.0})["cumulative_ms"]
+        if slower(times["cumulative_ms"], previous):
+            regressions.append((f"import {name}", previous, times["cumulative_ms"]))
+    return regressions
+
+def print_report(result):
+    print(f"main_menu 시작부터 첫 화면까지: {result['first_paint_ms']:.1f}ms (중앙값, {result['runs']}회 / 예산 {FIRST_PAINT_BUDGET_MS:.0f}ms)")
+    print(f"프로세스 실행~종료: {result['process_ms']:.1f}ms")
+    print(f"{'모듈':<32}{'누적(ms)':>10}{'자체(ms)':>10}")
+    for name, times in list(result["imports"].items())[:TOP_MODULES]:
+        print(f"{name:<32}{times['cumulative_ms']:>10.1f}{times['self_ms']:>10.1f}")
+
+def write_json(path, data):
+    if os.path.dirname(path): os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="메인 메뉴의 첫 화면 표시 시간과 모듈별 import 시간을 측정합니다.")
+    parser.add_argument("-n", "--runs", type=int, default=DEFAULT_RUNS, help="측정 횟수 (중앙값 사용)")
+    parser.add_argument("--script", default="main_menu.py", help="측정할 스크립트")
+    parser.add_argument("--offscreen", action="store_true", help="화면 없이 실행 (QT_QPA_PLATFORM=offscreen)")
+    parser.add_argument("--timeout", type=float, default=60.0, help="한 번 실행의 제한 시간(초)")
+    parser.add_argument("-o", "--output", help="결과 JSON 파일")
+    parser.add_argument("--baseline", help="비교할 기준 결과 JSON 파일")
+    parser.add_argument("--save-baseline", help="이번 결과를 기준 결과로 저장할 파일")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE, help="회귀로 보는 비율 (0.2 = 20%% 느려짐)")
+    args = parser.parse_args(argv)
+
+    try:
+        result = benchmark(args.script, args.runs, args.offscreen, args.timeout)
+    except (RuntimeError, subprocess.TimeoutExpired) as e:
+        print(f"측정 실패: {e}", file=sys.stderr)
+        return 2
+    print_report(result)
+    if args.output: write_json(args.output, result)
+    if args.save_baseline: write_json(args.save_baseline, result)
+
+    failed = False
+    if result["first_paint_ms"] > FIRST_PAINT_BUDGET_MS:
+        print(f"첫 화면 표시가 예산({FIRST_PAINT_BUDGET_MS:.0f}ms)을 넘었습니다.")
+        failed = True
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)
+        regressions = find_regressions(result, baseline, args.tolerance)
+        for name, previous, current in regressions:
+            print(f"회귀: {name} {previous:.1f}ms → {current:.1f}ms")
+        if not regressions: print("기준 대비 회귀 없음")
+        failed = failed or bool(regressions)
+    return 1 if failed else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
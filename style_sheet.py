@@ -110,6 +110,12 @@ QWidget#RecordListWidget {
     background-color: #2c313a;
     border-radius: 10px;
 }
+QListView#RecordListView {
+    background-color: #2c313a;
+    border: none;
+    border-radius: 10px;
+    padding-top: 10px;
+}
 QWidget#RecordCard {
     background-color: #3a404c;
     border-radius: 8px;
@@ -127,4 +133,12 @@ QLabel#RecordStats {
     color: #e6e6e6;
     line-height: 1.5;
 }
-"""
\ No newline at end of file
+"""
+
+# 기록 카드는 델리게이트가 직접 그리므로 QSS 대신 색상 값을 사용
+RECORD_CARD_COLORS = {
+    "card": "#3a404c",
+    "card_hover": "#424957",
+    "date": "#61afef",
+    "stats": "#e6e6e6",
+}
@@ -0,0 +1,287 @@
+# trainer_benchmark.py
+# 트레이너의 프레임 처리 경로를 함수 단위와 프레임 한 번 단위로 측정합니다. 카메라와 화면 없이 CPU만으로 실행됩니다.
+#   calculate_angle / joint_angles      : 각도 계산
+#   process_pose_landmarks             : 색 변환 + 포즈 추론 + 랜드마크 필터 + 각도
+#   update_state_and_counters          : 반복 판정과 피드백
+#   draw_ui / draw_overlay_screen      : 화면 그리기
+#   full_frame                         : 추론 → 판정 → 그리기 → 화면 크기 변환 (단일 루프의 한 프레임, 캡처/표시 제외)
+# 추론 입력은 저장소의 사람 이미지(images/AIhtImage01.png)를 천천히 좌우로 훑어 만든 짧은 영상이며, --video로 녹화한 영상의 앞부분을 대신 쓸 수 있습니다.
+# 추론은 트레이너와 같은 경로(USE_ROI_TRACKING이면 PoseRoiTracker)로 하고, 프레임은 앞뒤로 오가며 끊기지 않게, 시각은 계속 늘어나게 넣습니다.
+# 사람이 검출된 프레임 비율이 MIN_DETECTED_RATIO보다 낮으면 추론 시간이 실제와 다르므로 측정 실패(종료 코드 2)로 봅니다.
+# 판정/그리기 측정에는 운동 동작을 흉내 낸 합성 랜드마크를 씁니다.
+# 결과는 JSON(p50/p95/평균 ms)으로 저장하고, 저장소의 기준 결과(trainer_benchmark_baseline.json)보다 느려진 항목이 있으면 종료 코드 1을 반환합니다.
+#
+# 사용 예:
+#   python trainer_benchmark.py                        (기준 결과와 비교)
+#   python trainer_benchmark.py --save-baseline        (기준 결과 갱신, 같은 PC에서 측정해 커밋)
+#   python trainer_benchmark.py --no-baseline -o profiles/trainer.json
+#   python trainer_benchmark.py --exercise squat --video videos/squat.mp4 -n 300 --baseline profiles/squat_video.json
+import argparse
+import importlib
+import itertools
+import json
+import os
+import sys
+import time
+import numpy as np
+from exercises import TRAINER_MODULES
+
+DEFAULT_ITERATIONS = 200
+WARMUP_ITERATIONS = 20
+DEFAULT_TOLERANCE = 0.2    # 기준보다 20% 넘게 느려지면 회귀로 판단
+MIN_REGRESSION_MS = 0.005  # 이보다 작은 차이는 측정 잡음으로 보고 무시
+FRAME_SIZE = (640, 480)    # 합성 영상 크기 (일반 웹캠 해상도)
+SYNTHETIC_FRAMES = 90      # 합성 영상 길이 (30fps 기준 3초, 반복 한 번)
+DISPLAY_SIZE = (1280, 720)
+MIN_DETECTED_RATIO = 0.9   # 추론 입력에서 사람이 검출되어야 하는 프레임 비율
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_IMAGE = os.path.join("images", "AIhtImage01.png")  # 기본 추론 입력 (저장소 기준 경로)
+DEFAULT_BASELINE = os.path.join(BASE_DIR, "trainer_benchmark_baseline.json")
+
+# --- 합성 입력 ---
+
+def synthetic_landmarks(exercise, frames=SYNTHETIC_FRAMES):
+    """
+    주 관절 각도가 175°→80°→175°로 한 번 움직이는 (frames, 33, 4) 랜드마크를 만듭니다.
+    스쿼트는 무릎(엉덩이-무릎-발목), 푸쉬업은 팔꿈치(어깨-팔꿈치-손목)를 움직이고 나머지 관절은 몸통 주변에 고정합니다.
+    """
+    import pose_math
+    phase = np.linspace(0.0, 2.0 * np.pi, frames, endpoint=False)
+    angles = np.radians(127.5 + 47.5 * np.cos(phase))
+    landmarks = np.zeros((frames, pose_math.NUM_LANDMARKS, 4), dtype=np.float32)
+    landmarks[:, :, 3] = 0.99
+    # 얼굴/반대쪽 관절은 몸통 근처에 둠 (뼈대 그리기에 쓰임)
+    landmarks[:, :, 0] = 0.45 + 0.1 * (np.arange(pose_math.NUM_LANDMARKS) % 4) / 3
+    landmarks[:, :, 1] = 0.2 + 0.6 * np.arange(pose_math.NUM_LANDMARKS) / pose_math.NUM_LANDMARKS
+    if exercise == 'squat':
+        knee, length = np.array([0.5, 0.7]), 0.2
+        landmarks[:, pose_math.LEFT_ANKLE, :2] = knee + [0.0, length]
+        landmarks[:, pose_math.LEFT_KNEE, :2] = knee
+        hip = knee + length * np.stack([-np.sin(angles), np.cos(angles)], axis=1)
+        landmarks[:, pose_math.LEFT_HIP, :2] = hip
+        landmarks[:, pose_math.LEFT_SHOULDER, :2] = hip + [0.02, -0.25]
+    else:
+        shoulder, length = np.array([0.3, 0.45]), 0.15
+        landmarks[:, pose_math.LEFT_SHOULDER, :2] = shoulder
+        landmarks[:, pose_math.LEFT_HIP, :2] = shoulder + [0.3, 0.0]
+        landmarks[:, pose_math.LEFT_ANKLE, :2] = shoulder + [0.6, 0.0]
+        elbow = shoulder + [0.0, length]
+        landmarks[:, pose_math.LEFT_ELBOW, :2] = elbow
+        landmarks[:, pose_math.LEFT_WRIST, :2] = elbow + length * np.stack([np.sin(angles), -np.cos(angles)], axis=1)
+    return landmarks
+
+def panned_frames(path, frames=SYNTHETIC_FRAMES, size=FRAME_SIZE):
+    """
+    사람이 있는 이미지를 카메라가 좌우로 한 번 천천히 훑는 것처럼 잘라 frames장의 BGR 프레임을 만듭니다.
+    한 바퀴 돌아 처음 위치로 돌아오므로 이어 붙여도 끊기지 않습니다.
+    """
+    import cv2
+    image = cv2.imread(os.path.join(BASE_DIR, path))
+    if image is None: raise RuntimeError(f"이미지를 읽을 수 없습니다: {path}")
+    width, height = size
+    scale = min(image.shape[1] / width, image.shape[0] / height) * 0.9  # 이미지 안에서 움직일 여유를 둠
+    crop_w, crop_h = int(width * scale), int(height * scale)
+    travel_x, top = image.shape[1] - crop_w, image.shape[0] - crop_h
+    result = []
+    for phase in np.linspace(0.0, 2.0 * np.pi, frames, endpoint=False):
+        x = int(travel_x * (0.5 - 0.5 * np.cos(phase)))
+        result.append(cv2.resize(image[top:top + crop_h, x:x + crop_w], size, interpolation=cv2.INTER_AREA))
+    return result
+
+def read_video_frames(path, limit):
+    import cv2
+    cap = cv2.VideoCapture(path)
+    frames = []
+    while len(frames) < limit:
+        success, frame = cap.read()
+        if not success: break
+        frames.append(frame)
+    cap.release()
+    if not frames: raise RuntimeError(f"영상을 읽을 수 없습니다: {path}")
+    return frames
+
+# --- 측정 ---
+
+def measure(fn, iterations):
+    """fn(i)를 WARMUP_ITERATIONS번 실행한 뒤 iterations번 재서 {"count", "mean_ms", "p50_ms", "p95_ms", "max_ms"}를 반환합니다."""
+    for i in range(WARMUP_ITERATIONS): fn(i)
+    samples = np.empty(iterations, dtype=np.float64)
+    for i in range(iterations):
+        start = time.perf_counter_ns()
+        fn(i)
+        samples[i] = time.perf_counter_ns() - start
+    samples /= 1e6
+    return {
+        "count": iterations, "mean_ms": round(float(samples.mean()), 4),
+        "p50_ms": round(float(np.percentile(samples, 50)), 4), "p95_ms": round(float(np.percentile(samples, 95)), 4),
+        "max_ms": round(float(samples.max()), 4),
+    }
+
+def benchmark_exercise(exercise, frames, iterations):
+    """트레이너 하나의 항목별 측정 결과를 반환합니다. 상태가 '휴식/종료'로 넘어가지 않도록 세트 목표는 무한대로 둡니다."""
+    import cv2
+    import pose_math
+    import shared_pose
+    import sound_cues
+    from roi_tracker import PoseRoiTracker
+    trainer = importlib.import_module(TRAINER_MODULES[exercise])
+    trainer.SET_GOAL = float('inf')
+    trainer.sound_bank = sound_cues.get_bank()  # 세션에서처럼 판정 시간에 효과음 재생 호출을 포함
+    pose = shared_pose.get_pose()
+    pose_model = PoseRoiTracker(pose) if trainer.USE_ROI_TRACKING else pose
+    landmarks = synthetic_landmarks(exercise)
+    data = [trainer.build_landmarks_data(None, landmarks[i].copy(), i / 30.0) for i in range(len(landmarks))]
+    a, b, c = pose_math.JOINT_ANGLES["knee" if exercise == 'squat' else "elbow"]
+    points = [(p[a, :2].tolist(), p[b, :2].tolist(), p[c, :2].tolist()) for p in landmarks]
+    n_landmarks = len(landmarks)
+    # 영상 프레임은 0 → 끝 → 0으로 오가며 넣어 되감길 때도 이웃한 프레임이 이어지게 함 (합성 랜드마크는 한 바퀴 동작이라 그대로 반복)
+    frame_order = list(range(len(frames))) + list(range(len(frames) - 2, 0, -1))
+    # 필터와 반복 판정이 보는 시각은 측정(예열 포함) 전체에서 30fps 간격으로 계속 늘어남
+    ticks = itertools.count()
+    state = trainer.new_app_state()
+    serial_state = trainer.new_app_state()
+    detected = []
+
+    def next_frame():
+        tick = next(ticks)
+        return frames[frame_order[tick % len(frame_order)]], tick / 30.0
+
+    def reset_tracking():
+        trainer.landmark_filter.reset()
+        if pose_model is not pose: pose_model.reset()
+
+    def process(i):
+        image, timestamp = next_frame()
+        detected.append(trainer.process_pose_landmarks(image, pose_model, timestamp)["landmarks"] is not None)
+
+    def update(i):
+        tick = next(ticks)
+        landmarks_data = data[tick % n_landmarks]
+        landmarks_data["timestamp"] = tick / 30.0
+        trainer.update_state_and_counters(state, landmarks_data)
+
+    def draw_ui(i):
+        trainer.draw_ui(frames[i % len(frames)].copy(), state, data[i % n_landmarks])
+
+    def full_frame(i):
+        # 단일 루프(run_serial_loop)의 한 프레임에서 캡처와 화면 표시를 뺀 부분
+        image, timestamp = next_frame()
+        image = image.copy()
+        landmarks_data = trainer.process_pose_landmarks(image, pose_model, timestamp)
+        trainer.update_state_and_counters(serial_state, landmarks_data)
+        image = trainer.render_frame(image, serial_state, landmarks_data)
+        cv2.resize(image, DISPLAY_SIZE)
+
+    reset_tracking()
+    report = {
+        "calculate_angle": measure(lambda i: trainer.calculate_angle(*points[i % n_landmarks]), iterations),
+        "joint_angles": measure(lambda i: pose_math.joint_angles(landmarks[i % n_landmarks]), iterations),
+        "process_pose_landmarks": measure(process, iterations),
+        "update_state_and_counters": measure(update, iterations),
+        "draw_ui": measure(draw_ui, iterations),
+        "draw_overlay_screen": measure(lambda i: trainer.draw_overlay_screen(frames[i % len(frames)].copy(), "SET COMPLETE!", f"REST: {30 - i % 30}s", 50, 30, (0, 255, 0)), iterations),
+    }
+    reset_tracking()
+    report["full_frame"] = measure(full_frame, iterations)
+    report["process_pose_landmarks"]["detected_ratio"] = round(sum(detected) / max(len(detected), 1), 3)
+    return report
+
+def find_regressions(result, baseline, tolerance):
+    """기준보다 p50 또는 p95가 tolerance 비율과 MIN_REGRESSION_MS를 모두 넘게 느려진 항목을 (이름, 기준, 현재) 목록으로 반환합니다."""
+    regressions = []
+    for exercise, items in result["benchmarks"].items():
+        for name, current in items.items():
+            previous = baseline.get("benchmarks", {}).get(exercise, {}).get(name)
+            if previous is None: continue
+            for key in ("p50_ms", "p95_ms"):
+                if current[key] - previous[key] > MIN_REGRESSION_MS and current[key] > previous[key] * (1 + tolerance):
+                    regressions.append((f"{exercise}.{name}.{key}", previous[key], current[key]))
+    return regressions
+
+def print_report(result):
+    print(f"입력: {result['input']} ({result['frame_size'][0]}x{result['frame_size'][1]}, {result['iterations']}회 측정, ROI 추적 {'on' if result['roi_tracking'] else 'off'})")
+    print(f"{'항목':<36}{'p50(ms)':>10}{'p95(ms)':>10}{'평균(ms)':>10}")
+    for exercise, items in result["benchmarks"].items():
+        for name, stats in items.items():
+            print(f"{exercise + '.' + name:<36}{stats['p50_ms']:>10.3f}{stats['p95_ms']:>10.3f}{stats['mean_ms']:>10.3f}")
+        print(f"{exercise}: 사람 검출 {items['process_pose_landmarks']['detected_ratio']:.0%}")
+
+def write_json(path, data):
+    if os.path.dirname(path): os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+
+def find_detection_failures(result):
+    """사람이 검출된 프레임 비율이 MIN_DETECTED_RATIO보다 낮은 트레이너를 (이름, 비율) 목록으로 반환합니다."""
+    failures = []
+    for exercise, items in result["benchmarks"].items():
+        ratio = items["process_pose_landmarks"]["detected_ratio"]
+        if ratio < MIN_DETECTED_RATIO: failures.append((exercise, ratio))
+    return failures
+
+# 기준 결과와 같아야 비교할 수 있는 측정 조건. 라이브러리 버전이 다르면 마이크로초 단위 항목(joint_angles 등)이 버전 차이만으로 크게 바뀜
+COMPARED_CONDITIONS = ("input", "frame_size", "roi_tracking", "python", "numpy", "opencv", "mediapipe")
+
+def condition_differences(result, baseline):
+    """기준 결과와 다른 측정 조건을 (이름, 기준 값, 현재 값) 목록으로 반환합니다."""
+    return [(key, baseline.get(key), result.get(key)) for key in COMPARED_CONDITIONS if result.get(key) != baseline.get(key)]
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="트레이너의 각도 계산, 추론, 판정, 그리기, 프레임 한 번의 시간을 측정합니다.")
+    parser.add_argument("--exercise", nargs="+", choices=sorted(TRAINER_MODULES), default=sorted(TRAINER_MODULES), help="측정할 트레이너")
+    parser.add_argument("-n", "--iterations", type=int, default=DEFAULT_ITERATIONS, help="항목별 측정 횟수")
+    parser.add_argument("--video", help=f"기본 입력({DEFAULT_IMAGE}) 대신 쓸 녹화 영상 (앞부분 프레임만 사용)")
+    parser.add_argument("-o", "--output", help="결과 JSON 파일")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="비교할 기준 결과 JSON 파일 (기본값: 저장소의 trainer_benchmark_baseline.json)")
+    parser.add_argument("--no-baseline", action="store_true", help="기준 결과와 비교하지 않음")
+    parser.add_argument("--save-baseline", nargs="?", const=DEFAULT_BASELINE, help="이번 결과를 기준 결과로 저장할 파일 (파일을 생략하면 저장소의 기준 결과)")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE, help="회귀로 보는 비율 (0.2 = 20%% 느려짐)")
+    args = parser.parse_args(argv)
+
+    os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+    try:
+        frames = read_video_frames(args.video, SYNTHETIC_FRAMES) if args.video else panned_frames(DEFAULT_IMAGE)
+    except RuntimeError as e:
+        print(f"측정 실패: {e}", file=sys.stderr)
+        return 2
+    benchmarks = {exercise: benchmark_exercise(exercise, frames, args.iterations) for exercise in args.exercise}
+    import cv2
+    import mediapipe
+    height, width = frames[0].shape[:2]
+    result = {
+        "python": sys.version.split()[0], "numpy": np.__version__, "opencv": cv2.__version__, "mediapipe": mediapipe.__version__,
+        "input": args.video or DEFAULT_IMAGE,
+        "frame_size": [width, height], "iterations": args.iterations,
+        "roi_tracking": all(importlib.import_module(TRAINER_MODULES[exercise]).USE_ROI_TRACKING for exercise in args.exercise),
+        "benchmarks": benchmarks,
+    }
+    print_report(result)
+    if args.output: write_json(args.output, result)
+
+    # 사람을 찾지 못한 입력에서는 추론 시간이 검출기만의 시간이라 실제 세션과 다르므로, 기준 결과로 저장하거나 비교하지 않음
+    failures = find_detection_failures(result)
+    for exercise, ratio in failures:
+        print(f"측정 실패: {exercise} 입력에서 사람이 검출된 프레임이 {ratio:.0%}입니다. (기준 {MIN_DETECTED_RATIO:.0%}, 사람이 보이는 --video를 사용)", file=sys.stderr)
+    if failures: return 2
+    if args.save_baseline: write_json(args.save_baseline, result)
+
+    if args.no_baseline or args.save_baseline: return 0
+    if not os.path.exists(args.baseline):
+        print(f"기준 결과가 없어 비교하지 않습니다: {args.baseline} (--save-baseline으로 저장)")
+        return 0
+    with open(args.baseline, encoding='utf-8') as f:
+        baseline = json.load(f)
+    differences = condition_differences(result, baseline)
+    if differences:
+        print(f"기준 결과와 측정 조건이 달라 비교하지 않습니다: {args.baseline} (이 환경에서 --save-baseline으로 다시 저장)")
+        for key, previous, current in differences:
+            print(f"  {key}: 기준 {previous} / 현재 {current}")
+        return 0
+    regressions = find_regressions(result, baseline, args.tolerance)
+    for name, previous, current in regressions:
+        print(f"회귀: {name} {previous:.3f}ms → {current:.3f}ms")
+    if not regressions: print("기준 대비 회귀 없음")
+    return 1 if regressions else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
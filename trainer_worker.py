@@ -0,0 +1,108 @@
+# trainer_worker.py
+# 메인 메뉴가 시작할 때 함께 띄우는 상주 트레이너 프로세스
+# cv2 / mediapipe / pygame import와 Pose 모델 로딩은 프로세스가 뜰 때 한 번만 하고,
+# 이후에는 파이프로 받은 명령에 따라 운동 세션을 실행하면서 진행 상황과 결과를 돌려보냅니다.
+#
+# 메뉴 → 워커: ("start", {"exercise", "reps", "sets", "rest"}) / ("stop", None) / ("shutdown", None)
+#              ("hotplug", None) - 카메라 연결/해제가 감지되어 장치를 다시 조사해야 할 때 (세션 중에도 처리)
+# 워커 → 메뉴: ("ready", 예열 시간) / ("first_frame", 명령부터 첫 화면까지 걸린 시간)
+#              ("progress", 진행 상황) / ("finished", {"completed", "set_results"}) / ("failed", 메시지)
+#              ("cameras", 장치 목록) - 워커의 CameraService가 장치를 다시 조사할 때마다
+#              ("frame_bus", 공유 메모리 이름) - 세션의 카메라 프레임을 올리는 frame_bus (메뉴의 카메라 미리보기용)
+# Qt 쪽 클라이언트는 session_runner.TrainerWorkerClient 참고
+import importlib
+import time
+import cv2
+from camera_service import CameraService
+from exercises import TRAINER_MODULES
+from frame_bus import PublishingCapture
+import shared_pose
+import sound_cues
+
+PROGRESS_INTERVAL = 0.25  # 진행 상황을 보내는 최소 간격(초)
+PROGRESS_KEYS = ("workout_state", "set_counter", "counter", "good_counter", "bad_counter")
+IDLE_POLL_INTERVAL = 0.5  # 세션이 없을 때 명령을 기다리면서 장치 목록 변화를 확인하는 간격(초)
+
+def progress_snapshot(app_state):
+    return {key: app_state[key] for key in PROGRESS_KEYS}
+
+def run_worker_session(conn, cameras, trainer, reps, sets, rest):
+    """
+    세션 하나를 실행합니다. 화면은 이 프로세스의 OpenCV 창에 표시하고, 프레임마다 파이프에 들어온 명령을 확인합니다.
+    캡처는 cameras(CameraService)에서 빌려 쓰므로 두 번째 운동부터는 카메라를 다시 열지 않습니다.
+    세션 도중 shutdown 명령을 받았으면 True를 반환합니다.
+    """
+    requested = time.perf_counter()
+    trainer.SET_GOAL, trainer.TOTAL_SETS_GOAL, trainer.REST_DURATION = reps, sets, rest
+    cap = cameras.acquire()
+    if cap is None:
+        conn.send(("failed", "카메라를 열 수 없습니다."))
+        return False
+
+    # 읽은 카메라 프레임은 공유 메모리 버스에도 올려서 다른 프로세스(메뉴 미리보기 등)가 복사 없이 가져가게 한다
+    capture = PublishingCapture(cap)
+    app_state = trainer.new_app_state()
+    control = {"first_frame": True, "last_progress": 0.0, "stop": False, "shutdown": False}
+
+    def show_frame(display):
+        keep_running = trainer.show_frame_window(display)
+        now = time.perf_counter()
+        if control["first_frame"]:
+            conn.send(("first_frame", now - requested))
+            if capture.bus is not None: conn.send(("frame_bus", capture.bus.name))
+            control["first_frame"] = False
+        if now - control["last_progress"] >= PROGRESS_INTERVAL:
+            conn.send(("progress", progress_snapshot(app_state)))
+            control["last_progress"] = now
+        while conn.poll():
+            command, _ = conn.recv()
+            if command in ("stop", "shutdown"): control["stop"] = True
+            if command == "shutdown": control["shutdown"] = True
+            # 세션 중의 연결/해제도 바로 다시 조사 (쓰는 중인 카메라는 건드리지 않음, 바뀐 목록은 세션이 끝난 뒤 보냄)
+            if command == "hotplug": cameras.notify_hotplug()
+        return keep_running and not control["stop"]
+
+    try:
+        trainer.run_session(capture, app_state, show_frame)
+    finally:
+        # close_bus()는 진행 중인 read()를 기다리고 이후의 read()를 막으므로, 그 뒤에 카메라를 돌려줌
+        capture.close_bus()
+        capture_failed = not app_state["workout_completed"] and not control["stop"]
+        cameras.release(cap, failed=capture_failed)
+        cv2.destroyAllWindows()
+        cv2.waitKey(1)  # 일부 플랫폼에서는 이벤트를 한 번 처리해야 창이 실제로 닫힘
+    trainer.finish_session(app_state)
+    conn.send(("finished", {"completed": app_state["workout_completed"], "set_results": app_state["set_results"]}))
+    return control["shutdown"]
+
+def worker_main(conn):
+    """워커 프로세스의 진입점입니다. 트레이너를 모두 불러온 뒤 명령을 기다립니다."""
+    start = time.perf_counter()
+    cameras = CameraService()
+    cameras.start()
+    trainers = {name: importlib.import_module(module_name) for name, module_name in TRAINER_MODULES.items()}
+    # 모델과 효과음은 트레이너 import로는 만들어지지 않으므로 첫 세션 전에 여기서 미리 불러옴
+    shared_pose.get_pose()
+    sound_cues.get_bank()
+    conn.send(("ready", time.perf_counter() - start))
+
+    camera_version = 0
+    try:
+        while True:
+            if cameras.version != camera_version:
+                camera_version = cameras.version
+                conn.send(("cameras", cameras.devices()))
+            try:
+                if not conn.poll(IDLE_POLL_INTERVAL): continue
+                command, args = conn.recv()
+            except EOFError:
+                break  # 메뉴 프로세스가 종료됨
+            if command == "shutdown": break
+            if command == "hotplug": cameras.notify_hotplug()
+            if command != "start": continue
+            try:
+                if run_worker_session(conn, cameras, trainers[args["exercise"]], args["reps"], args["sets"], args["rest"]): break
+            except Exception as e:
+                conn.send(("failed", f"운동 세션 실행 중 오류 발생: {e}"))
+    finally:
+        cameras.close()